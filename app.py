@@ -1,15 +1,24 @@
 import streamlit as st
-import pandas as pd
 import json
 import os
 import datetime
-import pytz
+import time
 import sys
 import hashlib
+import logging
 import secrets
-from dateutil import parser
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from google_news_searcher import GoogleNewsSearcher
+
+# Apenas o Streamlit e a biblioteca padrão são importados aqui: a tela de login
+# não depende de pandas, feedparser ou do buscador, que são carregados após o login
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KEYWORDS_FILE = os.path.join(BASE_DIR, "keywords.json")
+sys.path.append(BASE_DIR)
+
+# O histórico e a gravação de arquivos só usam a biblioteca padrão e são necessários já no login
+from history_store import get_store as get_history_store
+from safe_io import write_json
+
+logger = logging.getLogger("GoogleNewsSearcher")
 
 # Configuração da página
 st.set_page_config(
@@ -85,26 +94,73 @@ def update_relevance_state(consulta_id, indice):
     # Atualizar o estado de relevância
     st.session_state[f"edit_state_{consulta_id}"][str(indice)] = is_relevant
 
-# Inicializar o searcher
-@st.cache_resource
-def get_searcher():
-    return GoogleNewsSearcher()
+# Usuários com acesso ao painel de desempenho (lista separada por vírgulas)
+USUARIOS_ADMIN = {u.strip().lower() for u in os.environ.get('RADAR_ADMIN_USERS', '').split(',') if u.strip()}
 
-searcher = get_searcher()
+def exibir_painel_desempenho():
+    """Resumo das métricas do processo para administradores."""
+    requisicoes = sum(valor for _, valor in metrics.FEED_REQUESTS.values())
+    taxa_acerto = metrics.cache_hit_ratio()
+    col_a, col_b = st.columns(2)
+    col_a.metric("Requisições", requisicoes)
+    col_b.metric("Acerto do cache", f"{taxa_acerto:.0%}" if taxa_acerto is not None else "-")
+    col_a.metric("MB recebidos", f"{metrics.FEED_BYTES.value() / (1024 * 1024):.1f}")
+    col_b.metric("Novas tentativas", metrics.FETCH_RETRIES.value())
+    vistas = sum(valor for _, valor in metrics.ENTRIES_SEEN.values())
+    mantidas = sum(valor for _, valor in metrics.ENTRIES_KEPT.values())
+    compartilhadas = sum(valor for _, valor in metrics.COALESCED_CALLS.values())
+    st.caption(
+        f"Entradas recebidas: {vistas} | mantidas após filtro de datas: {mantidas} | "
+        f"chamadas compartilhadas: {compartilhadas} | "
+        f"disjuntor: {searcher.circuit_breaker.state} ({metrics.CIRCUIT_REJECTIONS.value()} bloqueios)"
+    )
+    
+    # Durações por etapa (quantis aproximados pelos limites dos histogramas)
+    linhas = []
+    for histograma in (metrics.SEARCH_SECONDS, metrics.SEARCH_STAGE_SECONDS, metrics.FETCH_SECONDS, metrics.FEED_PARSE_SECONDS):
+        for rotulos, contagem, soma, p50, p95 in histograma.summaries():
+            linhas.append({
+                'Métrica': histograma.name + (f" ({', '.join(rotulos.values())})" if rotulos else ""),
+                'Contagem': contagem,
+                'Média (s)': round(soma / contagem, 3) if contagem else 0,
+                'p50 ≤ (s)': p50,
+                'p95 ≤ (s)': p95
+            })
+    if linhas:
+        st.dataframe(pd.DataFrame(linhas), hide_index=True, use_container_width=True)
+    
+    # Resultado das consultas ao cache por idioma
+    por_idioma = {}
+    for rotulos, valor in metrics.CACHE_LOOKUPS.values():
+        por_idioma.setdefault(rotulos['language'], {'hit': 0, 'miss': 0, 'expired': 0})[rotulos['result']] += valor
+    if por_idioma:
+        st.dataframe(pd.DataFrame([
+            {'Idioma': l, 'Acertos': v['hit'], 'Ausentes': v['miss'], 'Expirados': v['expired']}
+            for l, v in sorted(por_idioma.items())
+        ]), hide_index=True, use_container_width=True)
+    
+    st.download_button(
+        "⬇️ Métricas (Prometheus)",
+        data=metrics.REGISTRY.render(),
+        file_name="metrics.txt",
+        mime="text/plain"
+    )
 
 # Função para limpar o cache de notícias
 def clear_news_cache():
-    cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
-    if os.path.exists(cache_dir):
-        try:
-            files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.pkl')]
-            for file in files:
-                os.remove(file)
-            return len(files), True
-        except Exception as e:
-            st.error(f"Erro ao limpar cache: {e}")
-            return 0, False
-    return 0, False
+    try:
+        return searcher.clear_cache(), True
+    except Exception as e:
+        st.error(f"Erro ao limpar cache: {e}")
+        return 0, False
+
+# Função para remover apenas as entradas expiradas do cache
+def clear_expired_news_cache():
+    try:
+        return searcher.clear_expired_cache(), True
+    except Exception as e:
+        st.error(f"Erro ao limpar cache expirado: {e}")
+        return 0, False
 
 # Função para garantir que os links tenham o formato correto
 def format_link(link):
@@ -123,6 +179,10 @@ if 'all_results' not in st.session_state:
     
 if 'relevante_state' not in st.session_state:
     st.session_state.relevante_state = {}
+
+# Versão dos resultados exibidos (muda a cada busca ou salvamento, reiniciando a grade)
+if 'resultados_versao' not in st.session_state:
+    st.session_state.resultados_versao = 0
     
 # Variáveis para controle de feedback
 if 'mostrar_feedback' not in st.session_state:
@@ -146,9 +206,9 @@ if 'historico_consultas' not in st.session_state:
 def load_keywords(username=None):
     # Se não for especificado um usuário, carrega as palavras-chave globais
     if username is None or not username.strip():
-        if os.path.exists(searcher.config_file):
+        if os.path.exists(KEYWORDS_FILE):
             try:
-                with open(searcher.config_file, 'r', encoding='utf-8') as f:
+                with open(KEYWORDS_FILE, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     keywords = data.get('keywords', [])
                     # Verificar se keywords é realmente uma lista
@@ -185,9 +245,7 @@ def load_keywords(username=None):
     else:
         # Criar o diretório e arquivo se não existir
         try:
-            os.makedirs(os.path.dirname(user_keywords_file), exist_ok=True)
-            with open(user_keywords_file, 'w', encoding='utf-8') as f:
-                json.dump({'keywords': []}, f, ensure_ascii=False, indent=2)
+            write_json(user_keywords_file, {'keywords': []}, indent=2)
             return []
         except Exception as e:
             st.error(f"Erro ao criar arquivo de palavras-chave para o usuário {username}: {e}")
@@ -204,8 +262,8 @@ def save_keywords(keywords, username=None):
     # Se não for especificado um usuário, salva as palavras-chave globais
     if username is None or not username.strip():
         try:
-            with open(searcher.config_file, 'w', encoding='utf-8') as f:
-                json.dump({'keywords': keywords}, f, ensure_ascii=False, indent=2)
+            # Gravação atômica e com bloqueio: sessões simultâneas não corrompem o arquivo
+            write_json(KEYWORDS_FILE, {'keywords': keywords}, indent=2)
             st.success("Palavras-chave salvas com sucesso!")
             return True
         except PermissionError as e:
@@ -218,9 +276,7 @@ def save_keywords(keywords, username=None):
     # Se for especificado um usuário, salva as palavras-chave específicas do usuário
     try:
         user_keywords_file = get_user_keywords_file(username)
-        os.makedirs(os.path.dirname(user_keywords_file), exist_ok=True)
-        with open(user_keywords_file, 'w', encoding='utf-8') as f:
-            json.dump({'keywords': keywords}, f, ensure_ascii=False, indent=2)
+        write_json(user_keywords_file, {'keywords': keywords}, indent=2)
         st.success(f"Palavras-chave do usuário {username} salvas com sucesso!")
         return True
     except PermissionError as e:
@@ -231,14 +287,18 @@ def save_keywords(keywords, username=None):
         return False
         
 # Funções para gerenciar o histórico de consultas por usuário
-def get_user_history_file(username):
+def get_user_history_file(username, extensao="jsonl"):
     # Verificar se o nome de usuário não está vazio
     if not username or not username.strip():
         raise ValueError("Nome de usuário não pode ser vazio")
         
     # Criar um nome de arquivo seguro baseado no nome do usuário
     safe_username = ''.join(c if c.isalnum() else '_' for c in username.lower().strip())
-    return os.path.join(os.path.dirname(searcher.config_file), f"historico_{safe_username}.json")
+    return os.path.join(BASE_DIR, f"historico_{safe_username}.{extensao}")
+
+# O histórico em JSON Lines substitui o antigo historico_<usuário>.json, migrado na primeira leitura
+def get_user_history_store(username):
+    return get_history_store(get_user_history_file(username), get_user_history_file(username, "json"))
 
 # Função para obter o arquivo de palavras-chave do usuário
 def get_user_keywords_file(username):
@@ -248,99 +308,63 @@ def get_user_keywords_file(username):
         
     # Criar um nome de arquivo seguro baseado no nome do usuário
     safe_username = ''.join(c if c.isalnum() else '_' for c in username.lower().strip())
-    return os.path.join(os.path.dirname(searcher.config_file), f"keywords_{safe_username}.json")
+    return os.path.join(BASE_DIR, f"keywords_{safe_username}.json")
 
-def save_user_history(username, historico):
+# Acrescenta ao histórico as consultas cujas notícias ainda não foram salvas e as retorna (None em caso de erro)
+def append_user_history(username, consultas):
     try:
         if not username or not username.strip():
             st.error("Erro: Nome de usuário vazio. Histórico não será salvo.")
-            print("Tentativa de salvar histórico com nome de usuário vazio.")
-            return False
-            
-        if not isinstance(historico, (list, dict)):
-            st.error("Erro: Histórico deve ser uma lista ou dicionário.")
-            print(f"Histórico inválido para {username}: {type(historico)}")
-            return False
-            
-        if not historico:
-            print(f"Nenhum histórico para salvar para o usuário {username}")
-            return True
+            logger.warning("Tentativa de salvar histórico com nome de usuário vazio")
+            return None
             
-        history_file = get_user_history_file(username)
-        if not isinstance(history_file, str) or not history_file.strip():
-            st.error("Erro: Caminho do arquivo de histórico inválido.")
-            print(f"Caminho inválido para {username}: {history_file}")
-            return False
-        
-        os.makedirs(os.path.dirname(history_file), exist_ok=True)
+        if not consultas:
+            return []
         
-        def json_serializable(obj):
-            if isinstance(obj, datetime.datetime):
-                return obj.isoformat()
-            return str(obj)
-
-        # Verificar se o histórico contém dados válidos antes de salvar
-        historico_validado = []
-        for consulta in historico:
-            if not isinstance(consulta, dict) or 'resultados' not in consulta or 'relevante_state' not in consulta:
-                print(f"Ignorando consulta inválida ao salvar histórico")
-                continue
-            historico_validado.append(consulta)
-            
-        print(f"Salvando {len(historico_validado)} consultas válidas para o usuário {username}")
-            
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(historico_validado, f, ensure_ascii=False, indent=2, default=json_serializable)
-            
-        print(f"Histórico salvo com sucesso para o usuário {username} em {history_file}")
-        return True
+        # Apenas as notícias ainda não salvas são acrescentadas ao arquivo
+        novas = get_user_history_store(username).append_new(consultas)
+        logger.debug(f"{len(novas)} notícias acrescentadas ao histórico do usuário {username}")
+        return novas
     except PermissionError as e:
         st.error(f"Erro de permissão ao salvar histórico: {e}")
-        print(f"Erro de permissão para {username}: {e}")
-        return False
+        logger.error(f"Erro de permissão ao salvar histórico de {username}: {e}")
+        return None
     except (TypeError, ValueError) as e:
         st.error(f"Erro ao serializar histórico em JSON: {e}")
-        print(f"Erro de serialização para {username}: {e}")
-        return False
+        logger.error(f"Erro de serialização no histórico de {username}: {e}")
+        return None
     except Exception as e:
         st.error(f"Erro inesperado ao salvar histórico: {e}")
-        print(f"Erro inesperado para {username}: {e}")
-        return False
+        logger.exception(f"Erro inesperado ao salvar histórico de {username}")
+        return None
 
 # Função para limpar o histórico de notícias do usuário
 def clear_user_history(username):
     try:
         if not username or not username.strip():
             st.error("Erro: Nome de usuário vazio. Não é possível limpar o histórico.")
-            print("Tentativa de limpar histórico com nome de usuário vazio.")
+            logger.warning("Tentativa de limpar histórico com nome de usuário vazio")
             return False
             
-        # Obter o caminho do arquivo de histórico
+        # Obter o armazenamento do histórico
         try:
-            history_file = get_user_history_file(username)
+            store = get_user_history_store(username)
         except Exception as e:
             st.error("Erro: Caminho do arquivo de histórico inválido.")
-            print(f"Erro ao obter caminho do arquivo para limpar histórico: {e}")
+            logger.error(f"Erro ao obter caminho do arquivo para limpar histórico: {e}")
             return False
             
-        # Verificar se o arquivo existe
-        if os.path.exists(history_file):
-            try:
-                # Salvar um histórico vazio (lista vazia)
-                with open(history_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f, ensure_ascii=False, indent=2)
-                print(f"Histórico limpo com sucesso para o usuário {username}")
-                return True
-            except PermissionError as e:
-                st.error(f"Erro de permissão ao limpar histórico: {e}")
-                return False
-            except Exception as e:
-                st.error(f"Erro inesperado ao limpar histórico: {e}")
-                return False
-        else:
-            # Se o arquivo não existe, consideramos que o histórico já está limpo
-            print(f"Arquivo de histórico não encontrado para o usuário {username}. Nada a limpar.")
+        try:
+            # Um arquivo vazio também impede que o histórico antigo seja migrado de novo
+            store.clear()
+            logger.info(f"Histórico limpo para o usuário {username}")
             return True
+        except PermissionError as e:
+            st.error(f"Erro de permissão ao limpar histórico: {e}")
+            return False
+        except Exception as e:
+            st.error(f"Erro inesperado ao limpar histórico: {e}")
+            return False
     except Exception as e:
         st.error(f"Erro ao limpar histórico: {e}")
         return False
@@ -348,45 +372,16 @@ def clear_user_history(username):
 def load_user_history(username):
     try:
         if not username or not username.strip():
-            print(f"Tentativa de carregar histórico com nome de usuário vazio.")
+            logger.warning("Tentativa de carregar histórico com nome de usuário vazio")
             return []
             
-        history_file = get_user_history_file(username)
-        print(f"Tentando carregar histórico de: {history_file}")
-        
-        if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                try:
-                    historico = json.load(f)
-                    print(f"Histórico carregado com {len(historico)} consultas")
-                    
-                    # Garantir que todas as consultas tenham a estrutura correta
-                    historico_validado = []
-                    for consulta in historico:
-                        # Verificar se todos os campos necessários existem
-                        if not isinstance(consulta, dict) or 'resultados' not in consulta or 'relevante_state' not in consulta:
-                            print(f"Consulta inválida encontrada e ignorada")
-                            continue
-                            
-                        # Garantir que o usuário está correto
-                        consulta['usuario'] = username
-                        
-                        # Garantir que relevante_state use chaves como strings
-                        if consulta['relevante_state'] and not isinstance(next(iter(consulta['relevante_state'])), str):
-                            consulta['relevante_state'] = {str(k): v for k, v in consulta['relevante_state'].items()}
-                            
-                        historico_validado.append(consulta)
-                    
-                    print(f"Histórico validado com {len(historico_validado)} consultas")
-                    return historico_validado
-                except json.JSONDecodeError as e:
-                    print(f"Erro ao decodificar JSON do histórico: {e}")
-                    return []
-        else:
-            print(f"Arquivo de histórico não encontrado: {history_file}")
-            return []
+        store = get_user_history_store(username)
+        # Linhas corrompidas ou repetidas são ignoradas pelo armazenamento
+        historico = store.load(username)
+        logger.debug(f"Histórico carregado de {store.path} com {len(historico)} consultas")
+        return historico
     except Exception as e:
-        print(f"Erro ao carregar histórico: {e}")
+        logger.exception("Erro ao carregar histórico")
         st.error(f"Erro ao carregar histórico: {e}")
         return []
 
@@ -481,11 +476,52 @@ if not st.session_state.autenticado:
         st.markdown("*Este é um aplicativo restrito. Apenas usuários autorizados podem acessar.*")
         st.stop()
 
+# Módulos pesados, carregados apenas depois do login
+import pandas as pd
+import pytz
+from google_news_searcher import GoogleNewsSearcher, merge_duplicate_news
+from news_items import format_keywords, format_languages, published_timestamp, published_datetime, format_published
+from cache_prewarmer import CachePrewarmer
+from csv_export import content_hash, results_csv, history_csv
+import metrics
+
+# Inicializar o searcher
+@st.cache_resource
+def get_searcher():
+    return GoogleNewsSearcher()
+
+searcher = get_searcher()
+
+# Pré-aquecimento do cache em segundo plano (ativado com RADAR_PREWARM_INTERVAL, em segundos)
+@st.cache_resource
+def get_prewarmer():
+    interval = int(os.environ.get('RADAR_PREWARM_INTERVAL', '0') or 0)
+    if interval <= 0:
+        return None
+    prewarmer = CachePrewarmer(get_searcher(), interval=interval)
+    prewarmer.start()
+    return prewarmer
+
+get_prewarmer()
+
+# Exportações memorizadas pelo hash do conteúdo (compartilhadas entre sessões);
+# argumentos com "_" não entram na chave do cache do Streamlit
+@st.cache_data(max_entries=16, show_spinner=False)
+def gerar_csv_resultados(chave, _resultados, _relevancia):
+    return results_csv(_resultados, _relevancia)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def gerar_csv_historico(chave, _historico):
+    return history_csv(_historico)
+
+# Endpoint de métricas no formato Prometheus (ativado com RADAR_METRICS_PORT)
+metrics.start_http_server_from_env()
+
 # Título principal (visível apenas após login)
 st.title("📰 Radar de Mercado")
 
 # Criação de abas (disponíveis para todos, mas conteúdo protegido)
-tab1, tab2, tab3, tab4 = st.tabs(["Buscar Notícias", "Histórico de Consultas", "Gerenciar Palavras-chave", "Estatísticas"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Buscar Notícias", "Histórico de Consultas", "Gerenciar Palavras-chave", "Estatísticas", "Pesquisar no Acervo"])
 
 # Conteúdo principal do aplicativo (exibido apenas se estiver autenticado)
 if st.session_state.autenticado:
@@ -496,12 +532,32 @@ if st.session_state.autenticado:
     
     # Opções de otimização no sidebar
     with st.sidebar.expander("Opções de Otimização"):
-        if st.button("🔄 Limpar Cache de Notícias", help="Remove arquivos de cache para liberar espaço e forçar novas consultas"):
+        if st.button("🔄 Limpar Cache de Notícias", help="Remove as notícias em cache para liberar espaço e forçar novas consultas"):
             num_files, success = clear_news_cache()
             if success:
-                st.success(f"Cache limpo com sucesso! {num_files} arquivos removidos.")
+                st.success(f"Cache limpo com sucesso! {num_files} entradas removidas.")
             else:
                 st.error("Não foi possível limpar o cache.")
+        if st.button("🧹 Limpar Cache Expirado", help="Remove apenas as notícias não consultadas há muito tempo, mantendo o cache recente"):
+            num_files, success = clear_expired_news_cache()
+            if success:
+                st.success(f"{num_files} entradas expiradas removidas.")
+            else:
+                st.error("Não foi possível limpar o cache expirado.")
+        try:
+            stats_cache = searcher.cache_stats()
+            st.caption(
+                f"Cache: {stats_cache['disk_articles']} notícias em disco "
+                f"({stats_cache['disk_bytes'] / (1024 * 1024):.1f} MB), "
+                f"{stats_cache['memory_entries']} consultas em memória"
+            )
+        except Exception:
+            pass
+    
+    # Painel de desempenho, apenas para administradores
+    if st.session_state.username.strip().lower() in USUARIOS_ADMIN:
+        with st.sidebar.expander("📊 Painel de Desempenho"):
+            exibir_painel_desempenho()
     
     # Seção Sobre no sidebar
     with st.sidebar.expander("Sobre o Radar de Mercado"):
@@ -538,16 +594,10 @@ if st.session_state.autenticado:
             if not username:
                 st.sidebar.error("Erro: Nome de usuário não encontrado na sessão.")
             else:
-                # Salvar o histórico do usuário antes de fazer logout
-                if st.session_state.get('historico_consultas', []):
-                    if save_user_history(username, st.session_state.historico_consultas):
-                        st.sidebar.success(f"Histórico de {username} salvo com sucesso!")
-                        print(f"Histórico salvo com sucesso para {username} durante logout")
-                    else:
-                        st.sidebar.error(f"Não foi possível salvar o histórico de {username}.")
-                        print(f"Falha ao salvar histórico para {username} durante logout")
+                # O histórico já é gravado a cada notícia salva: não há nada a regravar no logout
+                print(f"Logout de {username} com {len(st.session_state.get('historico_consultas', []))} consultas no histórico")
         except Exception as e:
-            st.sidebar.error(f"Erro ao salvar histórico durante logout: {e}")
+            st.sidebar.error(f"Erro durante logout: {e}")
             print(f"Erro durante logout: {e}")
         finally:
             # Limpar todas as variáveis de sessão
@@ -606,6 +656,13 @@ with tab1:
             
             selected_languages = language_map[language_option]
             
+            # Agrupamento de notícias semelhantes publicadas por veículos diferentes
+            agrupar_historias = st.checkbox(
+                "Agrupar notícias semelhantes de veículos diferentes",
+                value=True,
+                help="Reúne em uma única linha a mesma história publicada por vários veículos"
+            )
+            
             # Seleção de período
             st.subheader("Selecione o período de busca")
             period_option = st.radio(
@@ -645,63 +702,82 @@ with tab1:
             def realizar_busca():
                 # Removido o spinner duplicado
                 all_results = []
+                inicio_busca = time.perf_counter()
                 
                 # Mostrar mensagem de carregamento
                 with st.spinner('Buscando notícias... Por favor, aguarde...'):
-                    # Buscar para cada palavra-chave e idioma sequencialmente
-                    # Isso é mais seguro com o Streamlit que não suporta bem atualizações de threads paralelas
+                    # As requisições rodam em paralelo no searcher; a interface é
+                    # atualizada apenas nesta thread, à medida que os feeds chegam
                     progress_bar = st.progress(0)
                     status_text = st.empty()
-                    
-                    # Calcular o total de consultas a serem feitas
-                    total_queries = len(selected_keywords) * len(selected_languages)
-                    completed = 0
+                    tabela_parcial = st.empty()
                     
                     # Criar lista de tarefas (pares keyword-language)
                     tasks = [(k, l) for k in selected_keywords for l in selected_languages]
                     
-                    # Processar cada tarefa sequencialmente, mas com feedback visual
-                    for idx, (keyword, language) in enumerate(tasks):
-                        # Atualizar texto de status
-                        status_text.text(f"Buscando: '{keyword}' em {language}... ({idx+1}/{total_queries})")
-                        
-                        # As datas já foram convertidas e validadas anteriormente
-                        
-                        try:
-                            # Buscar notícias
-                            results = searcher._fetch_news(
-                                keyword, 
-                                start_date_obj, 
-                                end_date_obj, 
-                                language
-                            )
-                            
-                            if results:
-                                all_results.extend(results)
-                        except Exception as e:
-                            st.error(f"Erro ao buscar notícias para '{keyword}' em {language}: {e}")
-                        
-                        # Atualizar barra de progresso
-                        progress_bar.progress((idx + 1) / total_queries)
+                    def atualizar_progresso(keyword, language, concluidas, total):
+                        # Atualizar texto de status e barra de progresso
+                        status_text.text(f"Concluído: '{keyword}' em {language}... ({concluidas}/{total})")
+                        progress_bar.progress(concluidas / total)
+                    
+                    def exibir_resultados_parciais():
+                        parciais = sorted(all_results, key=published_timestamp, reverse=True)
+                        tabela_parcial.dataframe(
+                            pd.DataFrame({
+                                'Data/Hora': [format_published(r) for r in parciais],
+                                'Palavra-chave': [format_keywords(r) for r in parciais],
+                                'Título': [r['title'] for r in parciais],
+                                'Fonte': [r['source'] for r in parciais],
+                                'Link': [format_link(r['link']) for r in parciais]
+                            }),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={'Link': st.column_config.LinkColumn(display_text="Abrir")}
+                        )
+                    
+                    # As datas já foram convertidas e validadas anteriormente
+                    try:
+                        ultima_atualizacao = 0.0
+                        with metrics.SEARCH_STAGE_SECONDS.time(stage='fetch'):
+                            for lote in searcher.iter_news(tasks, start_date_obj, end_date_obj, on_task_done=atualizar_progresso):
+                                all_results.extend(lote)
+                                # Limitar a frequência de redesenho da tabela parcial
+                                if time.monotonic() - ultima_atualizacao > 0.5:
+                                    with metrics.SEARCH_STAGE_SECONDS.time(stage='partial_render'):
+                                        exibir_resultados_parciais()
+                                    ultima_atualizacao = time.monotonic()
+                    except Exception as e:
+                        st.error(f"Erro ao buscar notícias: {e}")
                     
                     # Limpar elementos temporários
                     status_text.empty()
+                    tabela_parcial.empty()
+                
+                # Remover duplicatas entre palavras-chave e idiomas, mantendo todas as correspondências
+                with metrics.SEARCH_STAGE_SECONDS.time(stage='merge'):
+                    all_results = merge_duplicate_news(all_results)
+                if agrupar_historias:
+                    from story_clustering import cluster_stories
+                    with metrics.SEARCH_STAGE_SECONDS.time(stage='cluster'):
+                        all_results = cluster_stories(all_results)
+                metrics.SEARCH_SECONDS.observe(time.perf_counter() - inicio_busca, source='app')
+                metrics.SEARCH_RESULTS.inc(len(all_results), source='app')
                 
                 # Ordenar por data (mais recentes primeiro) se houver resultados
                 if all_results:
-                    all_results.sort(key=lambda x: parser.parse(x['published']), reverse=True)
+                    with metrics.SEARCH_STAGE_SECONDS.time(stage='sort'):
+                        all_results.sort(key=published_timestamp, reverse=True)
                     
                     # Armazenar resultados na session_state
                     st.session_state.all_results = all_results
-                    
-                    # Inicializar checkboxes para novos resultados
-                    for i in range(len(all_results)):
-                        if i not in st.session_state.relevante_state:
-                            st.session_state.relevante_state[i] = False
+                    st.session_state.resultados_versao += 1
                 else:
                     # Limpar resultados anteriores se a nova busca não retornou nada
                     st.session_state.all_results = []
                     st.warning("Nenhuma notícia encontrada para os critérios selecionados.")
+                
+                # As marcações anteriores se referem às posições dos resultados antigos
+                st.session_state.relevante_state = {}
             # Botão para buscar usando formulário para evitar problemas com Enter
             with st.form(key="search_form"):
                 submit_button = st.form_submit_button("🔍 Buscar Notícias", type="primary", help="Clique para buscar notícias com os filtros selecionados")
@@ -724,11 +800,99 @@ with tab1:
                         except Exception as e:
                             st.error(f"Erro ao processar datas: {e}")
             
-            # Função de callback para atualizar o estado do checkbox
-            def update_checkbox_state(i):
-                checkbox_key = f"relevante_{i}_{hash(st.session_state.all_results[i]['title'])}"
-                st.session_state.relevante_state[i] = st.session_state[checkbox_key]
-                print(f"Checkbox {i} atualizado para {st.session_state.relevante_state[i]}")
+            # Grade de resultados: uma única tabela AgGrid com paginação e ordenação
+            # feitas no servidor; apenas a página atual é enviada ao navegador
+            def exibir_grade_resultados():
+                from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode, JsCode
+                
+                resultados = st.session_state.all_results
+                df = pd.DataFrame({
+                    'Relevante': [st.session_state.relevante_state.get(i, False) for i in range(len(resultados))],
+                    'Índice': range(len(resultados)),
+                    'Palavra-chave': [format_keywords(r) for r in resultados],
+                    'Título': [
+                        f"{r['title']} (+{r['story_size'] - 1} similar(es): {', '.join(r['sources'][1:])})"
+                        if r.get('story_size', 1) > 1 else r['title']
+                        for r in resultados
+                    ],
+                    'Fonte': [r['source'] for r in resultados],
+                    'Data/Hora': [format_published(r) for r in resultados],
+                    'Link': [format_link(r['link']) for r in resultados],
+                    '_ts': [published_timestamp(r) for r in resultados]
+                })
+                
+                col_ordem, col_tamanho, col_pagina = st.columns([2, 1, 1])
+                ordens = {
+                    'Mais recentes': ('_ts', False),
+                    'Mais antigas': ('_ts', True),
+                    'Título': ('Título', True),
+                    'Fonte': ('Fonte', True),
+                    'Palavra-chave': ('Palavra-chave', True)
+                }
+                ordem = col_ordem.selectbox("Ordenar por", list(ordens), key="grade_ordem")
+                tamanho = col_tamanho.selectbox("Notícias por página", [50, 100, 200], key="grade_tamanho")
+                total_paginas = max(1, -(-len(df) // tamanho))
+                pagina = col_pagina.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1, key="grade_pagina")
+                st.caption(f"Página {pagina} de {total_paginas}")
+                
+                coluna, crescente = ordens[ordem]
+                pagina_df = df.sort_values(coluna, ascending=crescente, kind='stable') \
+                    .iloc[(pagina - 1) * tamanho:pagina * tamanho].reset_index(drop=True)
+                
+                gb = GridOptionsBuilder.from_dataframe(pagina_df)
+                gb.configure_default_column(sortable=False, resizable=True, wrapText=True, autoHeight=True)
+                gb.configure_column('Relevante', width=100, cellRenderer=JsCode("""
+                    class CheckboxRenderer {
+                        init(params) {
+                            this.eGui = document.createElement('input');
+                            this.eGui.type = 'checkbox';
+                            this.eGui.checked = params.value === true;
+                            this.eGui.addEventListener('change', (event) => {
+                                params.node.setDataValue(params.colDef.field, event.target.checked);
+                            });
+                        }
+                        getGui() { return this.eGui; }
+                        refresh(params) {
+                            this.eGui.checked = params.value === true;
+                            return true;
+                        }
+                    }
+                """))
+                gb.configure_column('Índice', width=80)
+                gb.configure_column('Título', flex=3)
+                gb.configure_column('Palavra-chave', flex=1)
+                gb.configure_column('_ts', hide=True)
+                gb.configure_column('Link', width=90, cellRenderer=JsCode("""
+                    class LinkRenderer {
+                        init(params) {
+                            this.eGui = document.createElement('a');
+                            this.eGui.innerText = 'Abrir';
+                            this.eGui.href = params.value;
+                            this.eGui.target = '_blank';
+                            this.eGui.rel = 'noopener noreferrer';
+                        }
+                        getGui() { return this.eGui; }
+                    }
+                """))
+                
+                # Cada marcação na grade volta ao servidor assim que é feita
+                grade = AgGrid(
+                    pagina_df,
+                    gridOptions=gb.build(),
+                    update_mode=GridUpdateMode.VALUE_CHANGED,
+                    data_return_mode=DataReturnMode.AS_INPUT,
+                    allow_unsafe_jscode=True,
+                    height=min(600, 80 + 42 * len(pagina_df)),
+                    key=f"grade_{st.session_state.resultados_versao}_{ordem}_{tamanho}_{pagina}"
+                )
+                
+                # Aplicar apenas as linhas cuja marcação difere da enviada à grade
+                retorno = grade['data']
+                if retorno is not None and len(retorno):
+                    enviadas = dict(zip(pagina_df['Índice'], pagina_df['Relevante']))
+                    for indice, relevante in zip(retorno['Índice'], retorno['Relevante']):
+                        if enviadas.get(indice) != bool(relevante):
+                            st.session_state.relevante_state[int(indice)] = bool(relevante)
                 
             # Função para salvar notícias relevantes marcadas
             def salvar_noticias_relevantes():
@@ -758,11 +922,12 @@ with tab1:
                         print(f"Processando notícia {i}: {noticia_atual['title']}")
                         noticias_para_salvar.append(noticia_atual)
                 
-                # Processar cada notícia marcada como relevante
+                # Montar uma consulta por notícia marcada como relevante
+                consultas = []
                 for noticia_atual in noticias_para_salvar:
                     consulta_id = datetime.datetime.now(fuso_brasil).strftime('%Y%m%d_%H%M%S')
                     relevante_state = {"0": True}  # Sempre usar índice 0 para a notícia única
-                    consulta = {
+                    consultas.append({
                         'id': consulta_id,
                         'data_hora': datetime.datetime.now(fuso_brasil).strftime('%d/%m/%Y %H:%M'),
                         'usuario': st.session_state.username,
@@ -774,27 +939,21 @@ with tab1:
                         },
                         'resultados': [noticia_atual],
                         'relevante_state': relevante_state
-                    }
-                    
-                    # Verificar se a notícia já existe no histórico
-                    noticia_existente = False
-                    for c in st.session_state.historico_consultas:
-                        if 'resultados' in c and len(c['resultados']) > 0:
-                            if noticia_atual['title'] == c['resultados'][0]['title']:
-                                noticia_existente = True
-                                noticias_ja_existentes += 1
-                                print(f"Notícia já existe no histórico: {noticia_atual['title']}")
-                                break
-                    
-                    if not noticia_existente:
-                        st.session_state.historico_consultas.append(consulta)
-                        noticias_salvas += 1
-                        print(f"Notícia '{noticia_atual['title']}' adicionada para salvar no histórico.")
+                    })
                 
-                # Salvar o histórico atualizado se houver notícias novas
-                if noticias_salvas > 0:
-                    save_user_history(st.session_state.username, st.session_state.historico_consultas)
-                    print(f"Histórico salvo com {noticias_salvas} novas notícias.")
+                # O armazenamento descarta as notícias já salvas (mesmo link canônico ou
+                # mesmo título normalizado) consultando um índice em memória
+                novas = append_user_history(st.session_state.username, consultas)
+                if novas is not None:
+                    st.session_state.historico_consultas.extend(novas)
+                    # Alimentar o índice de texto da pesquisa local
+                    try:
+                        searcher.index_saved_news(st.session_state.username, [c['resultados'][0] for c in novas])
+                    except Exception as e:
+                        print(f"Erro ao indexar notícias salvas: {e}")
+                    noticias_salvas = len(novas)
+                    noticias_ja_existentes = len(consultas) - noticias_salvas
+                    print(f"Histórico salvo com {noticias_salvas} novas notícias ({noticias_ja_existentes} já existentes).")
                 
                 # Definir variáveis de feedback para exibir na próxima renderização
                 st.session_state.noticias_salvas = noticias_salvas
@@ -803,6 +962,7 @@ with tab1:
                 
                 # Limpar os checkboxes após salvar
                 st.session_state.relevante_state = {}
+                st.session_state.resultados_versao += 1
 
             # Botão para salvar notícias relevantes será exibido após os resultados
             
@@ -832,64 +992,7 @@ with tab1:
                 st.markdown("---")
                 col1, col2 = st.columns(2)
                 
-                # Criar cabeçalho da tabela
-                header_cols = st.columns([0.05, 0.15, 0.35, 0.2, 0.1, 0.15])
-                header_cols[0].write("**Índice**")
-                header_cols[1].write("**Palavra-chave**")
-                header_cols[2].write("**Título**")
-                header_cols[3].write("**Data/Hora**")
-                header_cols[4].write("**Link**")
-                header_cols[5].write("**Relevante**")
-                
-                # Exibir cada linha da tabela
-                for i, result in enumerate(st.session_state.all_results):
-                    # Criar colunas para cada linha
-                    row_cols = st.columns([0.05, 0.15, 0.35, 0.2, 0.1, 0.15])
-                    
-                    # Formatar a data para exibição
-                    data_publicacao = parser.parse(result['published'])
-                    data_formatada = data_publicacao.strftime('%d/%m/%Y %H:%M')
-                    
-                    # Dados da notícia
-                    row_cols[0].write(str(i))
-                    row_cols[1].write(result['keyword'])
-                    row_cols[2].write(result['title'])
-                    row_cols[3].write(data_formatada)
-                                        # Formatar o link usando a função auxiliar
-                    link = format_link(result['link'])
-                    # Usar o componente de link do Streamlit para melhor compatibilidade
-                    row_cols[4].markdown(f"<a href='{link}' target='_blank' style='display: inline-block; padding: 5px 10px; background-color: #4CAF50; color: white; text-decoration: none; border-radius: 4px;'>Abrir</a>", unsafe_allow_html=True)
-                    
-                    # Checkbox para marcar como relevante
-                    checkbox_key = f"relevante_{i}_{hash(result['title'])}"
-                    row_cols[5].checkbox(
-                        "", 
-                        key=checkbox_key,
-                        value=st.session_state.relevante_state.get(i, False),
-                        on_change=update_checkbox_state,
-                        args=(i,)
-                    )
-                
-                # Preparar CSV para download incluindo a coluna de relevância
-                # Formatar as datas para o padrão brasileiro
-                datas_formatadas = []
-                for i, result in enumerate(st.session_state.all_results):
-                    data_publicacao = parser.parse(result['published'])
-                    datas_formatadas.append(data_publicacao.strftime('%d/%m/%Y %H:%M'))
-                
-                csv_data = pd.DataFrame({
-                    'Relevante': [st.session_state.relevante_state.get(i, False) for i in range(len(st.session_state.all_results))],
-                    'Índice': list(range(len(st.session_state.all_results))),
-                    'Palavra-chave': [result['keyword'] for result in st.session_state.all_results],
-                    'Título': [result['title'] for result in st.session_state.all_results],
-                    'Fonte': [result['source'] for result in st.session_state.all_results],
-                    'Data/Hora': datas_formatadas,
-                    'Idioma': [result['language'] for result in st.session_state.all_results],
-                    'Link': [result['link'] for result in st.session_state.all_results]
-                })
-                
-                # Converter para CSV
-                csv = csv_data.to_csv(index=False)
+                exibir_grade_resultados()
                 
                 # Adicionar botão para salvar notícias relevantes após a tabela
                 st.markdown("---")
@@ -901,14 +1004,31 @@ with tab1:
                         salvar_noticias_relevantes()
                 
                 with col1:
-                    # Botão para download direto em CSV
-                    st.download_button(
-                        label="⬇️ Baixar Resultados (CSV)",
-                        data=csv,
-                        file_name=f"noticias_{datetime.datetime.now(fuso_brasil).strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        help="Baixe os resultados da busca em formato CSV para abrir em Excel ou outro programa de planilhas"
+                    # O CSV só é gerado quando solicitado e vale enquanto resultados e marcações não mudarem
+                    assinatura = (
+                        st.session_state.resultados_versao,
+                        tuple(sorted(i for i, marcado in st.session_state.relevante_state.items() if marcado))
                     )
+                    preparado = st.session_state.get('csv_resultados')
+                    if preparado is None or preparado[0] != assinatura:
+                        if st.button("📄 Gerar CSV dos Resultados", help="Prepara o arquivo CSV com os resultados e as marcações atuais"):
+                            inicio_csv = time.perf_counter()
+                            relevancia = dict(st.session_state.relevante_state)
+                            csv = gerar_csv_resultados(
+                                content_hash(st.session_state.all_results, sorted(relevancia.items())),
+                                st.session_state.all_results,
+                                relevancia
+                            )
+                            metrics.SEARCH_STAGE_SECONDS.observe(time.perf_counter() - inicio_csv, stage='csv_export')
+                            st.session_state.csv_resultados = preparado = (assinatura, csv)
+                    if preparado is not None and preparado[0] == assinatura:
+                        st.download_button(
+                            label="⬇️ Baixar Resultados (CSV)",
+                            data=preparado[1],
+                            file_name=f"noticias_{datetime.datetime.now(fuso_brasil).strftime('%Y%m%d_%H%M%S')}.csv",
+                            mime="text/csv",
+                            help="Baixe os resultados da busca em formato CSV para abrir em Excel ou outro programa de planilhas"
+                        )
             else:
                 if st.session_state.get('_button_clicked', False):
                     st.error("Nenhuma notícia encontrada para os critérios selecionados.")
@@ -916,40 +1036,57 @@ with tab1:
             if not selected_keywords:
                 st.error("Selecione pelo menos uma palavra-chave para buscar.")
 
-def export_all_history_to_csv(historico_consultas):
-    if not historico_consultas:
-        return None
-        
-    # Lista para armazenar todas as notícias relevantes
-    todas_noticias = []
+COLUNAS_HISTORICO = ['Data da Consulta', 'Palavra-chave', 'Título', 'Fonte', 'Data de Publicação', 'Idioma', 'Link']
+
+# Visão em colunas das notícias relevantes do histórico, montada uma vez por versão do arquivo
+# (a versão muda a cada gravação, inclusive de outras sessões ou processos)
+@st.cache_data(max_entries=32, show_spinner=False)
+def visao_historico(username, versao):
+    historico = get_user_history_store(username).load(username)
+    linhas = [
+        (consulta.get('data_hora', 'N/A'), result)
+        for consulta in historico
+        for j, result in enumerate(consulta['resultados'])
+        if consulta['relevante_state'].get(str(j), False)
+        and isinstance(result, dict) and 'title' in result and 'link' in result
+    ]
+    if not linhas:
+        return pd.DataFrame(columns=COLUNAS_HISTORICO + ['Palavras-chave'])
     
-    # Processar cada consulta
-    for consulta in historico_consultas:
-        # Filtrar notícias relevantes
-        noticias_relevantes = [result for j, result in enumerate(consulta['resultados']) 
-                              if consulta['relevante_state'].get(str(j), False)]
-        
-        # Adicionar informações da consulta para cada notícia
-        for noticia in noticias_relevantes:
-            data_publicacao = parser.parse(noticia['published'])
-            data_formatada = data_publicacao.strftime('%d/%m/%Y %H:%M')
-            
-            todas_noticias.append({
-                'Data da Consulta': consulta.get('data_hora', ''),
-                'ID da Consulta': consulta.get('id', ''),
-                'Palavra-chave': noticia['keyword'],
-                'Título': noticia['title'],
-                'Fonte': noticia['source'],
-                'Data de Publicação': data_formatada,
-                'Idioma': noticia['language'],
-                'Link': noticia['link']
-            })
+    itens = pd.DataFrame.from_records(
+        [result for _, result in linhas],
+        columns=['title', 'link', 'source', 'published', 'published_ts']
+    )
     
-    if not todas_noticias:
-        return None
-        
-    # Criar DataFrame
-    return pd.DataFrame(todas_noticias)
+    # Data de publicação: published_ts quando existe, senão a string '%d/%m/%Y %H:%M' (UTC);
+    # só formatos antigos caem na conversão item a item
+    data_publicacao = pd.to_datetime(pd.to_numeric(itens['published_ts'], errors='coerce'), unit='s')
+    faltando = data_publicacao.isna()
+    data_publicacao[faltando] = pd.to_datetime(itens.loc[faltando, 'published'], format='%d/%m/%Y %H:%M', errors='coerce')
+    faltando = data_publicacao.isna() & itens['published'].notna()
+    if faltando.any():
+        data_publicacao[faltando] = [published_datetime(linhas[i][1]) for i in faltando[faltando].index]
+    
+    return pd.DataFrame({
+        'Data da Consulta': [data_hora for data_hora, _ in linhas],
+        'Palavra-chave': [format_keywords(result) or 'N/A' for _, result in linhas],
+        'Título': itens['title'].fillna('N/A'),
+        'Fonte': itens['source'].fillna('N/A'),
+        'Data de Publicação': data_publicacao,
+        'Idioma': [format_languages(result) or 'N/A' for _, result in linhas],
+        'Link': itens['link'].fillna('').map(format_link),
+        # Notícias mescladas contam para cada palavra-chave correspondente
+        'Palavras-chave': [result.get('keywords') or [result.get('keyword')] for _, result in linhas]
+    })
+
+def visao_historico_usuario():
+    return visao_historico(st.session_state.username, get_user_history_store(st.session_state.username).version())
+
+def contagem_por_palavra_chave(visao):
+    """Quantidade de notícias relevantes por palavra-chave, da mais frequente para a menos."""
+    palavras = visao['Palavras-chave'].explode()
+    # Empates ficam na ordem em que a palavra-chave aparece no histórico
+    return palavras.groupby(palavras, sort=False, dropna=False).size().sort_values(ascending=False, kind='stable')
 
 # Aba 2: Histórico de Consultas
 with tab2:
@@ -963,13 +1100,7 @@ with tab2:
             st.write(f"Total de consultas: **{len(st.session_state.historico_consultas)}**")
             
             # Contar o total de notícias relevantes em todas as consultas
-            total_noticias_relevantes = 0
-            for consulta in st.session_state.historico_consultas:
-                noticias_relevantes = [result for j, result in enumerate(consulta['resultados']) 
-                                      if consulta['relevante_state'].get(str(j), False)]
-                total_noticias_relevantes += len(noticias_relevantes)
-            
-            st.write(f"Total de notícias relevantes: **{total_noticias_relevantes}**")
+            st.write(f"Total de notícias relevantes: **{len(visao_historico_usuario())}**")
             
             # Seção de botões de exportação e gerenciamento
             st.subheader("Opções de Exportação e Gerenciamento")
@@ -978,19 +1109,28 @@ with tab2:
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                # Botão para exportar todo o histórico
-                df_historico = export_all_history_to_csv(st.session_state.historico_consultas)
-                if df_historico is not None:
-                    csv = df_historico.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Exportar Todo o Histórico (CSV)",
-                        data=csv,
-                        file_name=f"historico_completo_{st.session_state.username}_{datetime.datetime.now(fuso_brasil).strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        help="Baixe todas as notícias relevantes em um único arquivo CSV"
-                    )
-                else:
-                    st.info("Não há notícias relevantes no histórico para exportar.")
+                # Exportação do histórico gerada apenas sob demanda; vale enquanto o arquivo do histórico
+                # não mudar (salvar, limpar ou gravações de outra sessão mudam a versão)
+                versao_historico = get_user_history_store(st.session_state.username).version()
+                preparado = st.session_state.get('csv_historico')
+                if preparado is None or preparado[0] != versao_historico:
+                    if st.button("📄 Gerar CSV do Histórico", help="Prepara o arquivo CSV com todas as notícias relevantes"):
+                        csv = gerar_csv_historico(
+                            content_hash(st.session_state.historico_consultas),
+                            st.session_state.historico_consultas
+                        )
+                        st.session_state.csv_historico = preparado = (versao_historico, csv)
+                if preparado is not None and preparado[0] == versao_historico:
+                    if preparado[1] is not None:
+                        st.download_button(
+                            label="📥 Exportar Todo o Histórico (CSV)",
+                            data=preparado[1],
+                            file_name=f"historico_completo_{st.session_state.username}_{datetime.datetime.now(fuso_brasil).strftime('%Y%m%d_%H%M%S')}.csv",
+                            mime="text/csv",
+                            help="Baixe todas as notícias relevantes em um único arquivo CSV"
+                        )
+                    else:
+                        st.info("Não há notícias relevantes no histórico para exportar.")
 
             with col3:
                 # Botão para limpar o histórico
@@ -999,6 +1139,7 @@ with tab2:
                     if st.session_state.get('confirmar_exclusao', False):
                         # Limpar o histórico
                         if clear_user_history(st.session_state.username):
+                            searcher.clear_saved_news(st.session_state.username)
                             # Limpar o histórico na sessão
                             st.session_state.historico_consultas = []
                             st.session_state.confirmar_exclusao = False
@@ -1029,10 +1170,6 @@ with tab2:
                     
                 # Verificar se é necessário recarregar o histórico
                 if st.session_state.recarregar_historico:
-                    # Limpar o cache de notícias adicionadas
-                    if 'noticias_adicionadas' in st.session_state:
-                        del st.session_state.noticias_adicionadas
-                    
                     # Recarregar o histórico do usuário
                     st.session_state.historico_consultas = load_user_history(st.session_state.username)
                     print(f"Histórico recarregado via botão de atualização: {len(st.session_state.historico_consultas)} consultas")
@@ -1041,123 +1178,30 @@ with tab2:
                     # Limpar a flag
                     st.session_state.recarregar_historico = False
             
-            # Preparar dados para a tabela de notícias
-            todas_noticias = []
-            # Dicionário para rastrear notícias já adicionadas e evitar duplicação
-            if 'noticias_adicionadas' not in st.session_state:
-                st.session_state.noticias_adicionadas = {}
-            noticias_adicionadas = st.session_state.noticias_adicionadas.copy()  # Usar uma cópia para evitar modificações durante a iteração
-            
-            # Limpar o dicionário de notícias adicionadas se estiver muito grande
-            if len(noticias_adicionadas) > 1000:
-                st.session_state.noticias_adicionadas = {}
-                noticias_adicionadas = {}
-            
-            # Garantir que o histórico está carregado
-            if 'historico_consultas' not in st.session_state or not st.session_state.historico_consultas:
-                st.session_state.historico_consultas = load_user_history(st.session_state.username)
-                print(f"Recarregado histórico com {len(st.session_state.historico_consultas)} consultas")
-                
-            # Exibir informações de debug sobre o histórico
-            print(f"Processando {len(st.session_state.historico_consultas)} consultas no histórico")
+            # Tabela montada a partir da visão em cache do histórico
+            df_todas_noticias = visao_historico_usuario()
+            total_noticias = len(df_todas_noticias)
             
-            for i, consulta in enumerate(st.session_state.historico_consultas):
-                # Verificar se a consulta tem a estrutura correta
-                if not isinstance(consulta, dict) or 'resultados' not in consulta or 'relevante_state' not in consulta:
-                    continue
-                    
-                # Filtrar apenas notícias relevantes
-                noticias_relevantes = []
-                for j, result in enumerate(consulta['resultados']):
-                    # Verificar se a notícia é relevante
-                    if consulta['relevante_state'].get(str(j), False):
-                        # Adicionar informações de debug
-                        print(f"Notícia relevante encontrada: {result.get('title', 'Sem título')}")
-                        # Verificar se a notícia tem os campos necessários antes de adicionar
-                        if isinstance(result, dict) and 'title' in result and 'link' in result:
-                            noticias_relevantes.append(result)
-                
-                # Adicionar cada notícia relevante à lista
-                for result in noticias_relevantes:
-                    # Verificar se a notícia tem os campos necessários
-                    if not isinstance(result, dict) or 'title' not in result or 'link' not in result:
-                        print(f"Notícia ignorada por falta de campos obrigatórios")
-                        continue
-                        
-                    print(f"Processando notícia: {result.get('title', 'Sem título')}")
-                    try:
-                        # Formatar a data para exibição
-                        if 'published' in result:
-                            data_publicacao = parser.parse(result['published'])
-                            data_formatada = data_publicacao.strftime('%d/%m/%Y %H:%M')
-                        else:
-                            data_formatada = "N/A"
-                        
-                        # Adicionar dados da notícia
-                        todas_noticias.append({
-                            'Data da Consulta': consulta.get('data_hora', 'N/A'),
-                            'Palavra-chave': result.get('keyword', 'N/A'),
-                            'Título': result.get('title', 'N/A'),
-                            'Fonte': result.get('source', 'N/A'),
-                            'Data de Publicação': data_formatada,
-                            'Idioma': result.get('language', 'N/A'),
-                            'Link': result.get('link', '')
-                        })
-                        
-                        print(f"Notícia adicionada à tabela: {result.get('title', 'Sem título')}")
-                    except Exception as e:
-                        print(f"Erro ao processar notícia: {e}")
-            
-            if not todas_noticias:
+            if total_noticias == 0:
                 st.info("Nenhuma notícia foi marcada como relevante em suas consultas.")
+                st.session_state.tem_noticias_filtradas = False
             else:
-                # Criar DataFrame para a tabela de notícias
-                # Verificar se há notícias para exibir
-                print(f"Total de notícias relevantes encontradas: {len(todas_noticias)}")
+                st.write(f"Exibindo **{total_noticias}** notícias relevantes")
                 
-                # Formatar os links antes de criar o DataFrame
-                for noticia in todas_noticias:
-                    if 'Link' in noticia and noticia['Link']:
-                        noticia['Link'] = format_link(noticia['Link'])
-                
-                # Criar DataFrame apenas se houver notícias
-                df_todas_noticias = pd.DataFrame(todas_noticias) if todas_noticias else pd.DataFrame(columns=[
-                    'Data da Consulta', 'Palavra-chave', 'Título', 'Fonte', 
-                    'Data de Publicação', 'Idioma', 'Link'
-                ])
+                # Exibir tabela de notícias
+                st.dataframe(
+                    df_todas_noticias[COLUNAS_HISTORICO],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'Link': st.column_config.LinkColumn(display_text="Abrir"),
+                        'Data de Publicação': st.column_config.DatetimeColumn("Data de Publicação", format="DD/MM/YYYY HH:mm")
+                    }
+                )
                 
-                # Exibir resultados
-                total_noticias = len(todas_noticias)
-
-                if total_noticias > 0:
-                    st.write(f"Exibindo **{total_noticias}** notícias relevantes")
-                    
-                    # Exibir tabela de notícias
-                    st.dataframe(
-                        df_todas_noticias,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            'Link': st.column_config.LinkColumn(display_text="Abrir"),
-                            'Data de Publicação': st.column_config.DatetimeColumn("Data de Publicação", format="DD/MM/YYYY HH:mm")
-                        }
-                    )
-                else:
-                    st.info("Nenhuma notícia foi marcada como relevante em suas consultas.")
-
                 # Atualizar dados para exportação
-                if not df_todas_noticias.empty:
-                    st.session_state.tem_noticias_filtradas = True
-                    st.session_state.csv_filtrado = df_todas_noticias.to_csv(index=False)
-                    st.session_state.total_noticias_filtradas = len(df_todas_noticias)
-                else:
-                    st.session_state.tem_noticias_filtradas = False
-
-                # Verificar se já temos notícias filtradas no session_state
-                if not st.session_state.get('tem_noticias_filtradas', False):
-                    st.info("Nenhuma notícia foi marcada como relevante em suas consultas.")
-                
-            # Removido o expander "Detalhes das Consultas" conforme solicitado
+                st.session_state.tem_noticias_filtradas = True
+                st.session_state.total_noticias_filtradas = total_noticias
                     
 
 
@@ -1229,36 +1273,12 @@ with tab4:
         if not st.session_state.historico_consultas:
             st.info("Nenhuma consulta salva no histórico. Realize buscas na aba 'Buscar Notícias' para gerar estatísticas.")
         else:
-            # Função para processar os dados do histórico e gerar estatísticas
-            def gerar_estatisticas_por_palavra_chave():
-                # Dicionário para armazenar a contagem de notícias por palavra-chave
-                contagem_por_palavra = {}
-                total_noticias = 0
-                
-                # Processar cada consulta no histórico
-                for consulta in st.session_state.historico_consultas:
-                    # Filtrar apenas notícias relevantes
-                    noticias_relevantes = [result for j, result in enumerate(consulta['resultados']) 
-                                          if consulta['relevante_state'].get(str(j), False)]
-                    
-                    # Contar notícias por palavra-chave
-                    for noticia in noticias_relevantes:
-                        keyword = noticia['keyword']
-                        if keyword in contagem_por_palavra:
-                            contagem_por_palavra[keyword] += 1
-                        else:
-                            contagem_por_palavra[keyword] = 1
-                        total_noticias += 1
-                
-                # Ordenar por contagem (do maior para o menor)
-                contagem_ordenada = dict(sorted(contagem_por_palavra.items(), key=lambda x: x[1], reverse=True))
-                
-                return contagem_ordenada, total_noticias
+            # Estatísticas calculadas sobre a visão em cache do histórico
+            visao = visao_historico_usuario()
+            contagem_por_palavra = contagem_por_palavra_chave(visao)
+            total_noticias = len(visao)
             
-            # Gerar estatísticas
-            contagem_por_palavra, total_noticias = gerar_estatisticas_por_palavra_chave()
-            
-            if not contagem_por_palavra:
+            if contagem_por_palavra.empty:
                 st.warning("Nenhuma notícia relevante encontrada no histórico.")
             else:
                 # Exibir resumo
@@ -1270,13 +1290,11 @@ with tab4:
                 st.subheader("Notícias por Palavra-chave")
                 
                 # Criar uma tabela com as contagens
-                data = {
-                    'Palavra-chave': list(contagem_por_palavra.keys()),
-                    'Quantidade de Notícias': list(contagem_por_palavra.values()),
-                    'Porcentagem': [f"{(count/total_noticias)*100:.1f}%" for count in contagem_por_palavra.values()]
-                }
-                
-                df_estatisticas = pd.DataFrame(data)
+                df_estatisticas = pd.DataFrame({
+                    'Palavra-chave': contagem_por_palavra.index,
+                    'Quantidade de Notícias': contagem_por_palavra.values,
+                    'Porcentagem': (contagem_por_palavra.values / total_noticias * 100).round(1).astype(str) + '%'
+                })
                 st.dataframe(df_estatisticas, use_container_width=True)
                 
                 # Exibir gráfico de barras
@@ -1284,8 +1302,8 @@ with tab4:
                 
                 # Criar dataframe para o gráfico
                 df_grafico = pd.DataFrame({
-                    'Palavra-chave': list(contagem_por_palavra.keys()),
-                    'Quantidade': list(contagem_por_palavra.values())
+                    'Palavra-chave': contagem_por_palavra.index,
+                    'Quantidade': contagem_por_palavra.values
                 })
                 
                 # Limitar a 15 palavras-chave para melhor visualização
@@ -1322,6 +1340,79 @@ with tab4:
                 )
 
 
+# Notícias já salvas no histórico entram no índice de texto uma vez por processo;
+# depois disso cada notícia salva é indexada ao ser gravada
+@st.cache_resource(show_spinner=False)
+def indexar_historico_salvo(username):
+    historico = get_user_history_store(username).load(username)
+    return searcher.index_saved_news(username, [result for consulta in historico for result in consulta['resultados']])
+
+# Aba 5: Pesquisa local no histórico e nas notícias já buscadas
+with tab5:
+    if st.session_state.autenticado:
+        st.header("Pesquisar no Acervo")
+        st.write("Pesquise nas notícias já salvas no seu histórico e nas já baixadas do Google News, sem nova busca na internet.")
+        
+        with st.form(key="pesquisa_acervo_form"):
+            texto_pesquisa = st.text_input("Termos da pesquisa:", help="Acentos e maiúsculas são ignorados; a última palavra pode estar incompleta")
+            col1, col2 = st.columns(2)
+            with col1:
+                escopo = st.radio("Onde pesquisar:", ["Histórico e notícias baixadas", "Somente histórico"], horizontal=True)
+                periodo_pesquisa = st.selectbox("Publicadas:", ["Em qualquer data", "Nos últimos 7 dias", "Nos últimos 30 dias", "Nos últimos 90 dias"])
+            with col2:
+                palavras_pesquisa = st.multiselect("Palavras-chave:", load_keywords(st.session_state.username))
+                idiomas_pesquisa = st.multiselect("Idiomas:", ["Português", "Inglês"])
+                fontes_pesquisa = st.text_input("Fontes (separadas por vírgula):")
+            pesquisar = st.form_submit_button("🔎 Pesquisar")
+        
+        if pesquisar:
+            if not texto_pesquisa.strip():
+                st.warning("Digite ao menos uma palavra para pesquisar.")
+            else:
+                indexar_historico_salvo(st.session_state.username)
+                dias = {"Nos últimos 7 dias": 7, "Nos últimos 30 dias": 30, "Nos últimos 90 dias": 90}.get(periodo_pesquisa)
+                st.session_state.resultados_acervo = searcher.search_local(
+                    texto_pesquisa,
+                    username=st.session_state.username,
+                    include_cache=escopo != "Somente histórico",
+                    start_date=datetime.datetime.utcnow() - datetime.timedelta(days=dias) if dias else None,
+                    keywords=palavras_pesquisa or None,
+                    languages=[{"Português": "pt", "Inglês": "en"}[idioma] for idioma in idiomas_pesquisa] or None,
+                    sources=[fonte.strip() for fonte in fontes_pesquisa.split(',') if fonte.strip()] or None,
+                    limit=200
+                )
+        
+        resultados_acervo = st.session_state.get('resultados_acervo')
+        if resultados_acervo is not None:
+            if not any(resultados_acervo.values()):
+                st.info("Nenhuma notícia encontrada no acervo para essa pesquisa.")
+            else:
+                # A relevância de cada origem vem de um índice diferente, então as listas
+                # são ordenadas separadamente
+                for origem, titulo in (('history', "Histórico"), ('cache', "Notícias baixadas")):
+                    resultados_origem = resultados_acervo.get(origem)
+                    if not resultados_origem:
+                        continue
+                    st.subheader(titulo)
+                    st.write(f"**{len(resultados_origem)}** notícias encontradas, das mais relevantes para as menos")
+                    st.dataframe(
+                        pd.DataFrame([{
+                            'Título': resultado['title'],
+                            'Fonte': resultado['source'],
+                            'Data de Publicação': published_datetime(resultado),
+                            'Palavra-chave': format_keywords(resultado),
+                            'Idioma': format_languages(resultado),
+                            'Link': format_link(resultado['link'])
+                        } for resultado in resultados_origem]),
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            'Link': st.column_config.LinkColumn(display_text="Abrir"),
+                            'Data de Publicação': st.column_config.DatetimeColumn("Data de Publicação", format="DD/MM/YYYY HH:mm")
+                        }
+                    )
+
+
 # Rodapé - visível para todos, mesmo sem autenticação
 st.markdown("---")
 st.markdown("📰 Radar de Mercado | Desenvolvido por Giovanni Cuchiaro com a ajuda do Streamlit")
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import html
+import json
+import re
+import sqlite3
+import threading
+import time
+import logging
+import zlib
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+# Esquema normalizado: uma linha por notícia única, pertinência a
+# palavra-chave/idioma em tabela separada e registro de quando cada variação
+# de consulta foi buscada. O período da busca não faz parte da chave: o filtro
+# de datas é aplicado na leitura
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,  -- a restrição UNIQUE cria o índice por link
+    title TEXT NOT NULL,
+    source TEXT,
+    description TEXT,
+    published_ts REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_accessed REAL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_ts);
+
+CREATE TABLE IF NOT EXISTS article_keywords (
+    keyword TEXT NOT NULL,
+    language TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    PRIMARY KEY (keyword, language, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_keywords_article ON article_keywords (article_id);
+
+CREATE TABLE IF NOT EXISTS feed_fetches (
+    keyword TEXT NOT NULL,
+    language TEXT NOT NULL,
+    variation TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (keyword, language, variation)
+) WITHOUT ROWID;
+
+-- Rendimento de cada variação de consulta: quantas notícias novas para a
+-- palavra-chave/idioma ela trouxe (média móvel exponencial por busca). Não faz
+-- parte do cache e não é apagado ao limpar o cache
+CREATE TABLE IF NOT EXISTS variation_yield (
+    keyword TEXT NOT NULL,
+    language TEXT NOT NULL,
+    variation TEXT NOT NULL,
+    fetches INTEGER NOT NULL,
+    new_items INTEGER NOT NULL,
+    yield_avg REAL NOT NULL,
+    last_fetched REAL NOT NULL,
+    PRIMARY KEY (keyword, language, variation)
+) WITHOUT ROWID;
+
+-- Índice de texto completo dos artigos do cache (rowid = articles.id); o
+-- texto é indexado sem acentos, então "acao" encontra "ação"
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, tokenize = 'unicode61 remove_diacritics 2'
+);
+
+-- Notícias salvas no histórico de cada usuário, indexadas para a busca local.
+-- Não fazem parte do cache: não expiram e não são apagadas ao limpar o cache
+CREATE TABLE IF NOT EXISTS saved_articles (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    source TEXT,
+    published_ts REAL,
+    keywords TEXT NOT NULL DEFAULT '[]',  -- listas JSON
+    languages TEXT NOT NULL DEFAULT '[]',
+    saved_at REAL NOT NULL,
+    UNIQUE (username, link)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS saved_articles_fts USING fts5(
+    title, description, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Versão do esquema gravada em PRAGMA user_version; bancos mais antigos são
+# atualizados por _migrate
+SCHEMA_VERSION = 1
+
+
+# Descrições menores que isto não compensam a compressão
+COMPRESS_MIN_LENGTH = 128
+
+# Peso da busca mais recente na média de rendimento de uma variação
+YIELD_SMOOTHING = 0.3
+
+# Leituras só atualizam last_accessed de artigos não tocados há mais que isto,
+# para que a maioria das consultas não precise de uma transação de escrita
+TOUCH_GRANULARITY = 3600
+
+
+def _compress_text(text):
+    """Return a zlib-compressed blob for long texts; short texts are kept as they are"""
+    if text is None or len(text) < COMPRESS_MIN_LENGTH:
+        return text
+    return zlib.compress(text.encode('utf-8'))
+
+
+def _decompress_text(value):
+    """Inverse of _compress_text; plain text rows written before compression are returned unchanged"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+
+
+def _plain_text(text):
+    """Strip the HTML of feed descriptions before indexing them"""
+    if not text:
+        return ""
+    return html.unescape(TAG_RE.sub(' ', text))
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching every word (the last one as a prefix).
+
+    Quoting each word keeps FTS5 operators typed by the user from being
+    interpreted. Returns None when the text has no words.
+    """
+    words = WORD_RE.findall(text or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class ArticleStore:
+    """SQLite article store shared by every searcher in the process.
+
+    The database runs in WAL mode so several Streamlit sessions can read
+    while a fetch is being written. Each thread gets its own connection;
+    writes are serialized by a lock.
+
+    Long descriptions are stored zlib-compressed. Every article records when
+    it was last read or written, so ``purge_expired`` and
+    ``enforce_size_limit`` can evict the least recently used entries.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._cleanup_thread = None
+        with self._write_lock:
+            conn = self._connect()
+            # Só tem efeito em bancos novos; bancos antigos são convertidos em _migrate
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        """Bring databases created by older versions up to the current schema.
+
+        The schema version is kept in ``PRAGMA user_version``; new databases
+        start at 0 as well, and every step is safe to run on them.
+        """
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            with conn:
+                # Registro de buscas por período, substituído por feed_fetches
+                conn.execute("DROP TABLE IF EXISTS fetch_log")
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(articles)")}
+                if 'last_accessed' not in columns:
+                    conn.execute("ALTER TABLE articles ADD COLUMN last_accessed REAL")
+                    conn.execute("UPDATE articles SET last_accessed = first_seen")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_last_accessed ON articles (last_accessed)")
+                # Bancos anteriores ao índice de texto: indexar os artigos já armazenados
+                if not conn.execute("SELECT 1 FROM articles_fts LIMIT 1").fetchone():
+                    for row in conn.execute("SELECT id, title, description FROM articles").fetchall():
+                        self._index_text(conn, 'articles_fts', row['id'], row['title'], _decompress_text(row['description']))
+        if version != SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        # O modo de auto_vacuum de um banco existente só muda após um VACUUM
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+
+    def _connect(self):
+        """Return the connection owned by the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _index_text(self, conn, table, rowid, title, description):
+        """Insert or update the full-text row of an article; a None description keeps the indexed one"""
+        description = None if description is None else _plain_text(description)
+        updated = conn.execute(
+            f"UPDATE {table} SET title = ?, description = COALESCE(?, description) WHERE rowid = ?",
+            (title, description, rowid)
+        ).rowcount
+        if not updated:
+            conn.execute(
+                f"INSERT INTO {table} (rowid, title, description) VALUES (?, ?, ?)",
+                (rowid, title, description or "")
+            )
+
+    def get_fetch_times(self, keyword, language):
+        """Return {variation: fetched_at} for the query variations fetched for a keyword/language"""
+        rows = self._connect().execute(
+            "SELECT variation, fetched_at FROM feed_fetches WHERE keyword = ? AND language = ?",
+            (keyword, language)
+        ).fetchall()
+        return {row['variation']: row['fetched_at'] for row in rows}
+
+    def get_variation_stats(self, keyword, language):
+        """Return {variation: {'fetches', 'new_items', 'yield', 'last_fetched'}} for a keyword/language"""
+        rows = self._connect().execute(
+            """
+            SELECT variation, fetches, new_items, yield_avg, last_fetched
+            FROM variation_yield WHERE keyword = ? AND language = ?
+            """,
+            (keyword, language)
+        ).fetchall()
+        return {
+            row['variation']: {
+                'fetches': row['fetches'],
+                'new_items': row['new_items'],
+                'yield': row['yield_avg'],
+                'last_fetched': row['last_fetched']
+            }
+            for row in rows
+        }
+
+    def query_articles(self, keyword, language, start_ts=None, end_ts=None):
+        """Return the articles of a keyword/language published within the range, newest first.
+        
+        Without a range every stored article of the keyword/language is
+        returned. The articles read are marked as recently used, in one
+        statement and only when one of them was last used more than
+        ``TOUCH_GRANULARITY`` seconds ago.
+        """
+        start_ts = float('-inf') if start_ts is None else start_ts
+        end_ts = float('inf') if end_ts is None else end_ts
+        conn = self._connect()
+        rows = conn.execute(
+            """
+            SELECT a.title, a.link, a.source, a.description, a.published_ts,
+                   COALESCE(a.last_accessed, a.first_seen) AS last_accessed
+            FROM article_keywords k
+            JOIN articles a ON a.id = k.article_id
+            WHERE k.keyword = ? AND k.language = ?
+              AND a.published_ts BETWEEN ? AND ?
+            ORDER BY a.published_ts DESC
+            """,
+            (keyword, language, start_ts, end_ts)
+        ).fetchall()
+        now = time.time()
+        if rows and min(row['last_accessed'] for row in rows) < now - TOUCH_GRANULARITY:
+            with self._write_lock:
+                with conn:
+                    conn.execute(
+                        """
+                        UPDATE articles SET last_accessed = ?
+                        WHERE id IN (
+                            SELECT article_id FROM article_keywords WHERE keyword = ? AND language = ?
+                        )
+                          AND published_ts BETWEEN ? AND ?
+                          AND COALESCE(last_accessed, first_seen) < ?
+                        """,
+                        (now, keyword, language, start_ts, end_ts, now - TOUCH_GRANULARITY)
+                    )
+        articles = []
+        for row in rows:
+            article = dict(row)
+            del article['last_accessed']
+            article['description'] = _decompress_text(article['description'])
+            articles.append(article)
+        return articles
+
+    def save_articles(self, keyword, language, articles, variation=None, fetched_at=None):
+        """Upsert articles and link them to the keyword/language.
+        
+        When ``variation`` is given, the fetch of that query variation is
+        recorded as well, even if it returned no entries. Returns the set of
+        links linked to the keyword/language for the first time.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        new_links = set()
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                for article in articles:
+                    article_id = conn.execute(
+                        """
+                        INSERT INTO articles (link, title, source, description, published_ts, first_seen, last_accessed)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (link) DO UPDATE SET
+                            title = excluded.title,
+                            source = excluded.source,
+                            description = COALESCE(excluded.description, articles.description),
+                            published_ts = excluded.published_ts,
+                            last_accessed = MAX(COALESCE(articles.last_accessed, 0), excluded.last_accessed)
+                        RETURNING id
+                        """,
+                        (article['link'], article['title'], article.get('source'),
+                         _compress_text(article.get('description')), article['published_ts'],
+                         fetched_at, fetched_at)
+                    ).fetchone()[0]
+                    if conn.execute(
+                        "INSERT OR IGNORE INTO article_keywords (keyword, language, article_id) VALUES (?, ?, ?)",
+                        (keyword, language, article_id)
+                    ).rowcount:
+                        new_links.add(article['link'])
+                    self._index_text(conn, 'articles_fts', article_id, article['title'], article.get('description'))
+                if variation is not None:
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO feed_fetches (keyword, language, variation, fetched_at, entry_count)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (keyword, language, variation, fetched_at, len(articles))
+                    )
+        return new_links
+
+    def record_variation_yield(self, keyword, language, yields, fetched_at=None):
+        """Add one fetch of each variation in ``yields`` ({variation: new articles}) to its yield stats"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO variation_yield (keyword, language, variation, fetches, new_items, yield_avg, last_fetched)
+                    VALUES (?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (keyword, language, variation) DO UPDATE SET
+                        fetches = fetches + 1,
+                        new_items = new_items + excluded.new_items,
+                        yield_avg = yield_avg + ? * (excluded.yield_avg - yield_avg),
+                        last_fetched = MAX(last_fetched, excluded.last_fetched)
+                    """,
+                    [
+                        (keyword, language, variation, count, count, fetched_at, YIELD_SMOOTHING)
+                        for variation, count in yields.items()
+                    ]
+                )
+
+    def count_articles(self):
+        """Return the number of unique articles stored"""
+        return self._connect().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def size_bytes(self):
+        """Return the bytes used by live pages of the database (free pages excluded)"""
+        conn = self._connect()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist) * page_size
+
+    def _delete_articles(self, conn, where, params):
+        """Delete the articles matching ``where`` and forget the fetches of the keywords they belonged to.
+        
+        The fetch records are dropped so the next search refetches those
+        keywords instead of trusting a cache that lost entries.
+        """
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS evicted (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM evicted")
+        conn.execute(f"INSERT INTO evicted (id) SELECT id FROM articles WHERE {where}", params)
+        removed = conn.execute("SELECT COUNT(*) FROM evicted").fetchone()[0]
+        if removed:
+            conn.execute(
+                """
+                DELETE FROM feed_fetches WHERE (keyword, language) IN (
+                    SELECT DISTINCT keyword, language FROM article_keywords
+                    WHERE article_id IN (SELECT id FROM evicted)
+                )
+                """
+            )
+            conn.execute("DELETE FROM articles_fts WHERE rowid IN (SELECT id FROM evicted)")
+            conn.execute("DELETE FROM articles WHERE id IN (SELECT id FROM evicted)")
+        return removed
+
+    def _reclaim_space(self, conn):
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def purge_expired(self, max_age):
+        """Remove articles not read or written for ``max_age`` seconds and old fetch records; returns the articles removed"""
+        cutoff = time.time() - max_age
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                removed = self._delete_articles(conn, "COALESCE(last_accessed, first_seen) < ?", (cutoff,))
+                conn.execute("DELETE FROM feed_fetches WHERE fetched_at < ?", (cutoff,))
+            self._reclaim_space(conn)
+        if removed:
+            logger.info(f"Article store: purged {removed} expired articles")
+        return removed
+
+    def enforce_size_limit(self, max_bytes, batch_size=500):
+        """Evict least recently used articles until the database fits in ``max_bytes``; returns the articles removed"""
+        removed = 0
+        while self.size_bytes() > max_bytes:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    evicted = self._delete_articles(
+                        conn,
+                        "id IN (SELECT id FROM articles ORDER BY COALESCE(last_accessed, first_seen) LIMIT ?)",
+                        (batch_size,)
+                    )
+                self._reclaim_space(conn)
+            if not evicted:
+                break
+            removed += evicted
+        if removed:
+            logger.info(f"Article store: evicted {removed} least recently used articles to stay under {max_bytes} bytes")
+        return removed
+
+    def start_cleanup(self, interval, max_age, max_bytes=None):
+        """Start a daemon thread that purges expired entries and enforces the size cap every ``interval`` seconds"""
+        if self._cleanup_thread is not None and self._cleanup_thread.is_alive():
+            return self._cleanup_thread
+
+        def cleanup_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.purge_expired(max_age)
+                    if max_bytes:
+                        self.enforce_size_limit(max_bytes)
+                except Exception as e:
+                    logger.error(f"Article store cleanup failed: {e}")
+
+        self._cleanup_thread = threading.Thread(target=cleanup_loop, name="ArticleStoreCleanup", daemon=True)
+        self._cleanup_thread.start()
+        return self._cleanup_thread
+
+    def clear(self):
+        """Remove every article and fetch record (saved history entries are kept); returns the number of articles removed"""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                removed = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+                conn.execute("DELETE FROM article_keywords")
+                conn.execute("DELETE FROM feed_fetches")
+                conn.execute("DELETE FROM articles_fts")
+                conn.execute("DELETE FROM articles")
+            self._reclaim_space(conn)
+        logger.info(f"Article store cleared ({removed} articles)")
+        return removed
+
+    def save_saved_articles(self, username, articles, saved_at=None):
+        """Upsert news saved in a user's history into the local search index.
+
+        Each article has ``link``, ``title``, ``source``, ``description``,
+        ``published_ts`` and the ``keywords`` and ``languages`` (codes) it matched.
+        """
+        saved_at = time.time() if saved_at is None else saved_at
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                for article in articles:
+                    saved_id = conn.execute(
+                        """
+                        INSERT INTO saved_articles (username, link, title, source, published_ts, keywords, languages, saved_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (username, link) DO UPDATE SET
+                            title = excluded.title,
+                            source = excluded.source,
+                            published_ts = excluded.published_ts,
+                            keywords = excluded.keywords,
+                            languages = excluded.languages
+                        RETURNING id
+                        """,
+                        (username, article['link'], article['title'], article.get('source'),
+                         article.get('published_ts'), json.dumps(list(article.get('keywords') or []), ensure_ascii=False),
+                         json.dumps(list(article.get('languages') or []), ensure_ascii=False), saved_at)
+                    ).fetchone()[0]
+                    self._index_text(conn, 'saved_articles_fts', saved_id, article['title'], article.get('description'))
+
+    def count_saved_articles(self, username):
+        """Return the number of saved history entries of a user in the search index"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM saved_articles WHERE username = ?", (username,)
+        ).fetchone()[0]
+
+    def clear_saved_articles(self, username):
+        """Remove a user's saved history entries from the search index; returns the number removed"""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "DELETE FROM saved_articles_fts WHERE rowid IN (SELECT id FROM saved_articles WHERE username = ?)",
+                    (username,)
+                )
+                removed = conn.execute("DELETE FROM saved_articles WHERE username = ?", (username,)).rowcount
+        return removed
+
+    def search(self, text, username=None, include_cache=True, start_ts=None, end_ts=None,
+               keywords=None, languages=None, sources=None, limit=50):
+        """Full-text search over the cached articles and, with ``username``, that user's saved history.
+
+        Returns ``{'history': [...], 'cache': [...]}``, each list ranked on
+        its own with BM25 (title matches weigh more than the description)
+        and holding at most ``limit`` results: the two indexes have different
+        corpus statistics, so their scores are not comparable. Results are
+        filtered by publication range, keyword, language code and source. An
+        article found in both places is returned once, as a history entry.
+        Each result carries ``origin`` ('history' or 'cache'), ``rank``
+        (lower is better, within its list) and its ``keywords`` and
+        ``languages``.
+        """
+        results = {'history': [], 'cache': []}
+        query = fts_query(text)
+        if query is None:
+            return results
+        start_ts = float('-inf') if start_ts is None else start_ts
+        end_ts = float('inf') if end_ts is None else end_ts
+        conn = self._connect()
+
+        if username is not None:
+            where = ["saved_articles_fts MATCH ?", "s.username = ?", "COALESCE(s.published_ts, 0) BETWEEN ? AND ?"]
+            params = [query, username, start_ts, end_ts]
+            for column, values in (('keywords', keywords), ('languages', languages)):
+                if values:
+                    where.append(f"EXISTS (SELECT 1 FROM json_each(s.{column}) WHERE value IN ({', '.join('?' * len(values))}))")
+                    params.extend(values)
+            if sources:
+                where.append(f"s.source IN ({', '.join('?' * len(sources))})")
+                params.extend(sources)
+            rows = conn.execute(
+                f"""
+                SELECT s.title, s.link, s.source, saved_articles_fts.description AS description, s.published_ts,
+                       s.keywords, s.languages, s.saved_at, bm25(saved_articles_fts, 10.0, 1.0) AS rank
+                FROM saved_articles_fts
+                JOIN saved_articles s ON s.id = saved_articles_fts.rowid
+                WHERE {' AND '.join(where)}
+                ORDER BY rank
+                LIMIT ?
+                """,
+                params + [limit]
+            ).fetchall()
+            for row in rows:
+                result = dict(row)
+                result['keywords'] = json.loads(result['keywords'])
+                result['languages'] = json.loads(result['languages'])
+                result['origin'] = 'history'
+                results['history'].append(result)
+
+        if include_cache:
+            where = ["articles_fts MATCH ?", "a.published_ts BETWEEN ? AND ?"]
+            params = [query, start_ts, end_ts]
+            for column, values in (('keyword', keywords), ('language', languages)):
+                if values:
+                    where.append(
+                        f"EXISTS (SELECT 1 FROM article_keywords k WHERE k.article_id = a.id "
+                        f"AND k.{column} IN ({', '.join('?' * len(values))}))"
+                    )
+                    params.extend(values)
+            if sources:
+                where.append(f"a.source IN ({', '.join('?' * len(sources))})")
+                params.extend(sources)
+            rows = conn.execute(
+                f"""
+                SELECT a.id, a.title, a.link, a.source, a.description, a.published_ts,
+                       bm25(articles_fts, 10.0, 1.0) AS rank
+                FROM articles_fts
+                JOIN articles a ON a.id = articles_fts.rowid
+                WHERE {' AND '.join(where)}
+                ORDER BY rank
+                LIMIT ?
+                """,
+                params + [limit]
+            ).fetchall()
+            saved_links = {result['link'] for result in results['history']}
+            cached = [dict(row) for row in rows if row['link'] not in saved_links]
+            memberships = {}
+            if cached:
+                ids = [result['id'] for result in cached]
+                for row in conn.execute(
+                    f"SELECT article_id, keyword, language FROM article_keywords WHERE article_id IN ({', '.join('?' * len(ids))})",
+                    ids
+                ):
+                    keywords_seen, languages_seen = memberships.setdefault(row['article_id'], ([], []))
+                    if row['keyword'] not in keywords_seen:
+                        keywords_seen.append(row['keyword'])
+                    if row['language'] not in languages_seen:
+                        languages_seen.append(row['language'])
+            for result in cached:
+                result['keywords'], result['languages'] = memberships.get(result.pop('id'), ([], []))
+                result['description'] = _decompress_text(result['description'])
+                result['origin'] = 'cache'
+                results['cache'].append(result)
+
+        return results
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import email.utils
+import glob
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+from xml.sax.saxutils import escape
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARKS_DIR)
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+
+sys.path.append(BASE_DIR)
+
+
+def _history_items(base_dir):
+    """Yield the news items saved in each user's history: historico_*.jsonl, or the legacy .json not yet migrated.
+
+    The files are only read (HistoryStore.load could migrate or compact them).
+    """
+    from history_store import HistoryStore
+
+    for path in sorted(glob.glob(os.path.join(base_dir, "historico_*.jsonl"))):
+        _, articles, _ = HistoryStore(path)._read_records()
+        for record in articles:
+            yield record['item']
+    for path in sorted(glob.glob(os.path.join(base_dir, "historico_*.json"))):
+        if os.path.exists(path + "l"):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except Exception:
+            continue
+        for query in history if isinstance(history, list) else []:
+            yield from query.get('resultados', []) if isinstance(query, dict) else []
+
+
+def load_history_items(base_dir=BASE_DIR):
+    """Return the unique news items saved in the users' query history files"""
+    items = []
+    seen = set()
+    for item in _history_items(base_dir):
+        if not isinstance(item, dict) or not item.get('title') or not item.get('link'):
+            continue
+        if item['link'] in seen:
+            continue
+        seen.add(item['link'])
+        items.append({
+            'title': item['title'],
+            'link': item['link'],
+            'source': item.get('source') or "Google News",
+            'description': item.get('description') or ""
+        })
+    return items
+
+
+def load_fixture_items(fixtures_dir=FIXTURES_DIR):
+    """Return the news items of the RSS payloads recorded with ``record``"""
+    import feedparser
+
+    items = []
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.xml"))):
+        with open(path, 'rb') as f:
+            feed = feedparser.parse(f.read())
+        for entry in feed.entries:
+            if entry.get('link') in seen or not entry.get('title'):
+                continue
+            seen.add(entry.get('link'))
+            items.append({
+                'title': entry.get('title'),
+                'link': entry.get('link'),
+                'source': entry.get('source', {}).get('title') or "Google News",
+                'description': entry.get('description') or ""
+            })
+    return items
+
+
+def load_items(fixtures_dir=FIXTURES_DIR, base_dir=BASE_DIR, from_history=False):
+    """Return the recorded RSS items, or with ``from_history`` the items saved in the users' query history.
+
+    The history files change as users save news, so results built from them
+    are not comparable across machines or over time.
+    """
+    if from_history:
+        return load_history_items(base_dir)
+    items = load_fixture_items(fixtures_dir)
+    if not items:
+        raise ValueError(f"No recorded RSS fixtures in {fixtures_dir}; record some or use --from-history")
+    return items
+
+
+def expand_items(items, count):
+    """Return ``count`` items, repeating the pool with distinct links and titles when it is too small"""
+    if not items:
+        raise ValueError("No recorded items available to build fixtures")
+    expanded = []
+    for index in range(count):
+        item = dict(items[index % len(items)])
+        copy = index // len(items)
+        if copy:
+            # O sufixo vai no caminho: links do Google News são identificados pelo id do artigo
+            path, separator, query = item['link'].partition('?')
+            item['link'] = f"{path}-{copy}{separator}{query}"
+            item['title'] = f"{item['title']} ({copy})"
+        expanded.append(item)
+    return expanded
+
+
+def build_rss(items, query="", now=None, spacing=600):
+    """Render items as a Google News style RSS 2.0 payload, published ``spacing`` seconds apart"""
+    now = time.time() if now is None else now
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">',
+        '<channel>',
+        '<generator>NFE/5.0</generator>',
+        f'<title>"{escape(query)}" - Google News</title>',
+        '<link>https://news.google.com/search</link>',
+        '<language>pt-BR</language>',
+        '<description>Google News</description>'
+    ]
+    for index, item in enumerate(items):
+        parts.append(
+            '<item>'
+            f'<title>{escape(item["title"])}</title>'
+            f'<link>{escape(item["link"])}</link>'
+            f'<guid isPermaLink="false">{escape(item["link"])}</guid>'
+            f'<pubDate>{email.utils.formatdate(now - index * spacing, usegmt=True)}</pubDate>'
+            f'<description>{escape(item["description"])}</description>'
+            f'<source url="https://news.google.com">{escape(item["source"])}</source>'
+            '</item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def record(keywords, languages=('pt',), fixtures_dir=FIXTURES_DIR):
+    """Save the live Google News RSS payloads of the keywords as fixtures (needs network access)"""
+    from google_news_searcher import GoogleNewsSearcher
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    searcher = GoogleNewsSearcher(cleanup_interval=0)
+    saved = 0
+    for keyword in keywords:
+        for language in languages:
+            variation, url = searcher._build_query_variations(keyword, language)[0]
+            response = searcher.session.get(url, timeout=searcher.request_timeout)
+            response.raise_for_status()
+            slug = re.sub(r'[^a-z0-9]+', '_', f"{keyword}_{language}".lower()).strip('_')
+            with open(os.path.join(fixtures_dir, f"{slug}.xml"), 'wb') as f:
+                f.write(response.content)
+            saved += 1
+            print(f"Gravado: {keyword} ({language}) - {urllib.parse.urlsplit(url).query}")
+    return saved
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Grava feeds RSS reais do Google News como fixtures dos benchmarks")
+    arg_parser.add_argument('keywords', nargs='+', help="Palavras-chave a gravar")
+    arg_parser.add_argument('--languages', nargs='+', default=['pt'], choices=['pt', 'en'])
+    arg_parser.add_argument('--fixtures-dir', default=FIXTURES_DIR)
+    args = arg_parser.parse_args(argv)
+    record(args.keywords, args.languages, args.fixtures_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
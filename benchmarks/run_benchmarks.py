@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import BASE_DIR, load_items
+from stub_server import StubFeedServer
+
+sys.path.append(BASE_DIR)
+
+DEFAULT_KEYWORDS = ['Petrobras', 'Vale', 'Itaú', 'Ambev', 'Embraer', 'Magazine Luiza', 'Natura', 'Suzano']
+
+# Formatos de data vistos nos feeds e no histórico, usados no teste de parsing
+DATE_SAMPLES = [
+    'Sat, 08 Mar 2025 21:00:00 GMT',
+    'Mon, 10 Mar 2025 09:15:00 +0000',
+    '08/03/2025 21:00',
+    '2025-03-08T21:00:00Z',
+    '3 horas atrás',
+    'March 8, 2025'
+]
+
+
+def _measure(function, repeat):
+    """Run ``function`` ``repeat`` times; returns (best seconds, mean seconds, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), sum(timings) / len(timings), result
+
+
+def _stage(function, items, repeat=3):
+    best, mean, result = _measure(function, repeat)
+    return {
+        'seconds': round(best, 6),
+        'mean_seconds': round(mean, 6),
+        'items': items,
+        'items_per_second': round(items / best, 1) if best else None
+    }, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _new_searcher(base_url, workers):
+    from google_news_searcher import GoogleNewsSearcher
+    from fetch_control import TokenBucket, CircuitBreaker
+
+    # O construtor imprime mensagens; mantê-las fora da saída JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        return GoogleNewsSearcher(
+            max_workers=workers,
+            per_host_limit=workers,
+            cache_dir=tempfile.mkdtemp(prefix="radar_bench_"),
+            rate_limiter=TokenBucket(rate=100000, capacity=100000),
+            circuit_breaker=CircuitBreaker(),
+            cleanup_interval=0,
+            feed_base_url=base_url
+        )
+
+
+def export_csv(results):
+    """Build the search results CSV (one in ten marked as relevant) and the history CSV of those items, as the app does"""
+    from csv_export import results_csv, history_csv
+
+    relevance = {index: index % 10 == 0 for index in range(len(results))}
+    history = [{'resultados': results, 'relevante_state': {str(i): v for i, v in relevance.items()}}]
+    return results_csv(results, relevance), history_csv(history) or b''
+
+
+def save_history(results, directory):
+    """Save the results marked as relevant (one in ten) the way the Streamlit app does, into a new history file.
+
+    Each saved item is one consulta appended through HistoryStore.append_new
+    (identity check + group commit); returns the size of the file in bytes.
+    """
+    from history_store import HistoryStore
+
+    path = Path(tempfile.mkdtemp(dir=directory)) / "historico_benchmark.jsonl"
+    agora = datetime.datetime.now()
+    consultas = [
+        {
+            'id': agora.strftime('%Y%m%d_%H%M%S'),
+            'data_hora': agora.strftime('%d/%m/%Y %H:%M'),
+            'usuario': 'benchmark',
+            'parametros': {'keywords': [], 'languages': [], 'start_date': '', 'end_date': ''},
+            'resultados': [result],
+            'relevante_state': {"0": True}
+        }
+        for index, result in enumerate(results)
+        if index % 10 == 0
+    ]
+    HistoryStore(str(path)).append_new(consultas)
+    return path.stat().st_size
+
+
+def run_size(items, feed_size, latency, jitter, keywords, languages, workers, repeat):
+    """Run every stage against a stub server serving ``feed_size`` items per feed"""
+    import feedparser
+    from google_news_searcher import merge_duplicate_news
+    from news_items import published_timestamp, parse_date_fallback, _published_string_timestamp
+    from story_clustering import cluster_stories
+
+    stages = {}
+    tasks = [(keyword, language) for keyword in keywords for language in languages]
+    end_date = datetime.datetime.now() + datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=365)
+
+    with StubFeedServer(items, feed_size=feed_size, latency=latency, jitter=jitter) as server:
+        # Busca completa: cache vazio e depois cache quente
+        searcher = _new_searcher(server.base_url, workers)
+        requests_before = server.request_count
+        stages['search_cold'], batch = _stage(
+            lambda: searcher.fetch_news_batch(tasks, start_date, end_date), len(tasks), repeat=1
+        )
+        stages['search_cold']['requests'] = server.request_count - requests_before
+        requests_before = server.request_count
+        stages['search_warm'], batch = _stage(
+            lambda: searcher.fetch_news_batch(tasks, start_date, end_date), len(tasks), repeat
+        )
+        stages['search_warm']['requests'] = server.request_count - requests_before
+        results = [item for task_results in batch.values() for item in task_results]
+
+        # Download bruto dos feeds, sem parsing
+        urls = [url for keyword, language in tasks for _, url in searcher._build_query_variations(keyword, language)]
+        stages['fetch'], payloads = _stage(
+            lambda: [searcher.session.get(url, timeout=searcher.request_timeout).content for url in urls],
+            len(urls), repeat=1
+        )
+        stages['fetch']['bytes'] = sum(len(payload) for payload in payloads)
+
+    stages['feed_parse'], feeds = _stage(lambda: [feedparser.parse(payload) for payload in payloads], len(payloads), repeat)
+    entry_count = sum(len(feed.entries) for feed in feeds)
+    stages['entry_parse'], _ = _stage(
+        lambda: [searcher._parse_feed_entries(feed, set()) for feed in feeds], entry_count, repeat
+    )
+
+    # Datas sem cache de memoização para medir o custo real de parsing
+    dates = [entry.get('published', '') for feed in feeds for entry in feed.entries] + DATE_SAMPLES * 100
+
+    def parse_dates():
+        parse_date_fallback.cache_clear()
+        _published_string_timestamp.cache_clear()
+        return [searcher._parse_date(date) for date in dates]
+
+    stages['date_parse'], _ = _stage(parse_dates, len(dates), repeat)
+    stages['dedup'], merged = _stage(lambda: merge_duplicate_news(results), len(results), repeat)
+    stages['cluster'], _ = _stage(lambda: cluster_stories(merged), len(merged), repeat)
+    stages['sort'], ordered = _stage(
+        lambda: sorted(merged, key=published_timestamp, reverse=True), len(merged), repeat
+    )
+    stages['csv_export'], (results_bytes, history_bytes) = _stage(lambda: export_csv(ordered), len(ordered), repeat)
+    stages['csv_export']['bytes'] = len(results_bytes) + len(history_bytes)
+    with tempfile.TemporaryDirectory(prefix="radar_bench_") as directory:
+        stages['history_save'], history_bytes = _stage(
+            lambda: save_history(ordered, directory), len(ordered[::10]), repeat
+        )
+    stages['history_save']['bytes'] = history_bytes
+
+    return {
+        'feed_size': feed_size,
+        'latency': latency,
+        'jitter': jitter,
+        'tasks': len(tasks),
+        'results': len(results),
+        'unique_results': len(merged),
+        'stages': stages
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks do Radar de Mercado com um servidor RSS local")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100], help="Notícias por feed")
+    arg_parser.add_argument('--latency', type=float, default=0.05, help="Atraso por resposta do servidor, em segundos")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="Atraso aleatório adicional máximo, em segundos")
+    arg_parser.add_argument('--keywords', nargs='+', default=DEFAULT_KEYWORDS)
+    arg_parser.add_argument('--languages', nargs='+', default=['pt', 'en'], choices=['pt', 'en'])
+    arg_parser.add_argument('--workers', type=int, default=16, help="Requisições simultâneas do buscador")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Repetições por etapa (vale o melhor tempo)")
+    arg_parser.add_argument('--output', help="Arquivo JSON de saída (padrão: saída padrão)")
+    arg_parser.add_argument('--from-history', action='store_true',
+                            help="Usar as notícias dos históricos dos usuários em vez das fixtures gravadas "
+                                 "(resultados não comparáveis entre máquinas)")
+    args = arg_parser.parse_args(argv)
+
+    # Logs do buscador distorcem os tempos e poluem a saída
+    logging.getLogger("GoogleNewsSearcher").setLevel(logging.WARNING)
+
+    items = load_items(from_history=args.from_history)
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fixture_source': 'history' if args.from_history else 'fixtures',
+        'fixture_items': len(items),
+        'parameters': vars(args),
+        'runs': [
+            run_size(items, size, args.latency, args.jitter, args.keywords, args.languages, args.workers, args.repeat)
+            for size in args.sizes
+        ]
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# O que cada fase da inicialização do aplicativo importa
+DEFAULT_TARGETS = {
+    'login': ['streamlit', 'history_store'],
+    'after_login': ['pandas', 'pytz', 'google_news_searcher', 'cache_prewarmer', 'metrics'],
+    'search': ['story_clustering'],
+    'stats': ['altair']
+}
+
+
+def profile_imports(modules, python=sys.executable):
+    """Import ``modules`` in a fresh interpreter with ``-X importtime`` and return the parsed timings.
+
+    Returns a dict with the total wall time of the imports (microseconds),
+    the per-module self/cumulative times and the error, if the import failed.
+    """
+    code = '; '.join(f"import {module}" for module in modules)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BASE_DIR, os.environ.get('PYTHONPATH')])),
+               RADAR_LOG_FILE=os.devnull)
+    completed = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        cwd=BENCHMARKS_DIR, env=env, capture_output=True, text=True
+    )
+    timings = []
+    errors = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            errors.append(line)
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # cabeçalho
+        # O nome vem recuado dois espaços por nível de importação aninhada
+        name = fields[2][1:]
+        timings.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_us': int(fields[0]),
+            'cumulative_us': int(fields[1])
+        })
+    # Módulos de nível zero somam o tempo total das importações
+    total = sum(timing['cumulative_us'] for timing in timings if timing['depth'] == 0)
+    return {
+        'modules': modules,
+        'total_us': total,
+        'imported': len(timings),
+        'timings': timings,
+        'error': '\n'.join(errors[-5:]) if completed.returncode else None
+    }
+
+
+def summarize(profile, top=15):
+    """Return the ``top`` slowest top-level packages, summing the self time of their modules"""
+    packages = {}
+    for timing in profile['timings']:
+        package = timing['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + timing['self_us']
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Resumo de `python -X importtime` para as fases de inicialização do aplicativo")
+    arg_parser.add_argument('--modules', nargs='+', help="Módulos a perfilar (padrão: as fases login, after_login, search e stats)")
+    arg_parser.add_argument('--top', type=int, default=15, help="Quantidade de pacotes listados por fase")
+    arg_parser.add_argument('--json', action='store_true', help="Imprime o resultado completo em JSON")
+    args = arg_parser.parse_args(argv)
+
+    targets = {'custom': args.modules} if args.modules else DEFAULT_TARGETS
+    report = {}
+    for phase, modules in targets.items():
+        profile = profile_imports(modules)
+        profile['packages'] = summarize(profile, args.top)
+        report[phase] = profile
+
+    if args.json:
+        for profile in report.values():
+            del profile['timings']
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    for phase, profile in report.items():
+        print(f"\n== {phase}: {', '.join(profile['modules'])}")
+        if profile['error']:
+            print(f"   falhou: {profile['error']}")
+            continue
+        print(f"   total {profile['total_us'] / 1000:.1f} ms, {profile['imported']} módulos")
+        for package, self_us in profile['packages']:
+            print(f"   {self_us / 1000:8.1f} ms  {package}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import email.utils
+import hashlib
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixtures import build_rss, expand_items, load_items
+
+
+class StubFeedServer:
+    """Local HTTP server answering Google News RSS search URLs with recorded items.
+
+    Each distinct query gets ``feed_size`` items from the recorded pool,
+    starting at an offset derived from the query, so different keywords and
+    query variations overlap partially as they do upstream. Every response
+    waits ``latency`` seconds (plus up to ``jitter``) before being sent.
+    Payloads carry an ETag and a Last-Modified date, and conditional
+    requests are answered with 304.
+    """
+
+    def __init__(self, items=None, feed_size=100, latency=0.0, jitter=0.0, host='127.0.0.1', port=0):
+        self.pool = expand_items(items or load_items(), max(feed_size * 4, 1))
+        self.feed_size = feed_size
+        self.latency = latency
+        self.jitter = jitter
+        self.now = time.time()
+        self.request_count = 0
+        # Requisições em andamento e o maior número delas ao mesmo tempo
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # (status, cabeçalhos) de cada requisição respondida
+        self.request_log = []
+        self.last_modified = email.utils.formatdate(self.now, usegmt=True)
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/rss/search"
+
+    def payload(self, query):
+        """Return (body, etag) for a query string, rendering it once"""
+        with self._lock:
+            if query not in self._payloads:
+                offset = int(hashlib.md5(query.encode('utf-8')).hexdigest(), 16) % len(self.pool)
+                items = [self.pool[(offset + i) % len(self.pool)] for i in range(self.feed_size)]
+                q = urllib.parse.parse_qs(query).get('q', [''])[0]
+                body = build_rss(items, query=q, now=self.now)
+                self._payloads[query] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+            return self._payloads[query]
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                status = None
+                try:
+                    status = self._respond()
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                        stub.request_log.append((status, dict(self.headers)))
+
+            def _respond(self):
+                delay = stub.latency + (random.uniform(0, stub.jitter) if stub.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                path, _, query = self.path.partition('?')
+                if path != '/rss/search':
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return 404
+                body, etag = stub.payload(query)
+                # If-None-Match tem precedência sobre If-Modified-Since
+                if 'If-None-Match' in self.headers:
+                    not_modified = self.headers['If-None-Match'] == etag
+                else:
+                    not_modified = self.headers.get('If-Modified-Since') == stub.last_modified
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', stub.last_modified)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return 304
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', stub.last_modified)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return 200
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="StubFeedServer", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Servidor RSS local que imita a busca do Google News")
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--size', type=int, default=100, help="Notícias por feed")
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="Atraso por resposta, em segundos")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="Atraso aleatório adicional máximo, em segundos")
+    arg_parser.add_argument('--from-history', action='store_true',
+                            help="Usar as notícias dos históricos dos usuários em vez das fixtures gravadas")
+    args = arg_parser.parse_args(argv)
+
+    server = StubFeedServer(
+        load_items(from_history=args.from_history),
+        feed_size=args.size, latency=args.latency, jitter=args.jitter, port=args.port
+    )
+    print(f"Servindo em {server.base_url} (use RADAR_FEED_BASE_URL={server.base_url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import datetime
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_watchlist(keywords_dir=BASE_DIR, languages=('pt', 'en')):
+    """Return the unique (keyword, language) pairs found in every keywords_*.json file"""
+    tasks = []
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(keywords_dir, "keywords_*.json"))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading keyword file {path}: {e}")
+            continue
+        keywords = data.get('keywords', []) if isinstance(data, dict) else data
+        if not isinstance(keywords, list):
+            continue
+        for keyword in keywords:
+            if not isinstance(keyword, str) or not keyword.strip():
+                continue
+            for language in languages:
+                task = (keyword.strip(), language)
+                if task not in seen:
+                    seen.add(task)
+                    tasks.append(task)
+    return tasks
+
+
+class CachePrewarmer(threading.Thread):
+    """Background thread that keeps the cache warm for every user's watchlist.
+
+    Every ``interval`` seconds it re-reads all ``keywords_*.json`` files and
+    refreshes each (keyword, language) through the searcher's normal fetch
+    path. Pairs are processed one at a time, ``stagger`` seconds apart, and
+    only query variations that would expire before the next cycle (older
+    than the cache expiry minus ``interval``) are fetched again.
+    """
+
+    def __init__(self, searcher, interval=1800, stagger=2.0, languages=('pt', 'en'),
+                 keywords_dir=BASE_DIR, window_days=30):
+        super().__init__(name="CachePrewarmer", daemon=True)
+        self.searcher = searcher
+        self.interval = interval
+        self.stagger = stagger
+        self.languages = tuple(languages)
+        self.keywords_dir = keywords_dir
+        self.window_days = window_days
+        self._stop_event = threading.Event()
+        self.last_run = None
+
+    def stop(self):
+        """Ask the thread to stop after the current keyword"""
+        self._stop_event.set()
+
+    def run_once(self):
+        """Refresh the cache for the whole watchlist once; returns the number of pairs processed"""
+        tasks = load_watchlist(self.keywords_dir, self.languages)
+        # Só atualiza o que expiraria antes da próxima rodada
+        max_age = max(self.searcher.cache_expiry - datetime.timedelta(seconds=self.interval), datetime.timedelta(0))
+        processed = 0
+        started = time.time()
+        logger.info(f"Cache pre-warm started for {len(tasks)} keyword/language pairs")
+        for task in tasks:
+            if self._stop_event.is_set():
+                break
+            end_date = datetime.datetime.now()
+            start_date = end_date - datetime.timedelta(days=self.window_days)
+            try:
+                self.searcher.fetch_news_batch([task], start_date, end_date, max_age=max_age)
+            except Exception as e:
+                logger.error(f"Error pre-warming cache for {task[0]} ({task[1]}): {e}")
+            processed += 1
+            # Espaçar as consultas para não sobrecarregar o Google News
+            if self._stop_event.wait(self.stagger):
+                break
+        self.last_run = datetime.datetime.now()
+        logger.info(f"Cache pre-warm finished: {processed} pairs in {time.time() - started:.1f}s")
+        return processed
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Cache pre-warm failed: {e}")
+            self._stop_event.wait(self.interval)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Mantém o cache de notícias aquecido para todas as palavras-chave dos usuários")
+    arg_parser.add_argument('--interval', type=int, default=1800, help="Intervalo entre atualizações, em segundos")
+    arg_parser.add_argument('--stagger', type=float, default=2.0, help="Espera entre palavras-chave, em segundos")
+    arg_parser.add_argument('--languages', nargs='+', default=['pt', 'en'], choices=['pt', 'en'])
+    arg_parser.add_argument('--once', action='store_true', help="Executa uma única rodada e sai")
+    args = arg_parser.parse_args(argv)
+
+    from google_news_searcher import GoogleNewsSearcher
+    import metrics
+
+    metrics.start_http_server_from_env()
+    prewarmer = CachePrewarmer(
+        GoogleNewsSearcher(),
+        interval=args.interval,
+        stagger=args.stagger,
+        languages=args.languages
+    )
+    if args.once:
+        prewarmer.run_once()
+        return 0
+
+    prewarmer.start()
+    try:
+        while prewarmer.is_alive():
+            prewarmer.join(1)
+    except KeyboardInterrupt:
+        prewarmer.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import hashlib
+import io
+import json
+
+from news_items import format_keywords, format_languages, format_published
+
+RESULTS_COLUMNS = ['Relevante', 'Índice', 'Palavra-chave', 'Título', 'Fonte', 'Data/Hora', 'Idioma', 'Link']
+HISTORY_COLUMNS = ['Data da Consulta', 'ID da Consulta', 'Palavra-chave', 'Título', 'Fonte',
+                   'Data de Publicação', 'Idioma', 'Link']
+
+
+def content_hash(*parts):
+    """Return a stable hash of JSON-serializable data, used as the memoization key of exports"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_csv(columns, rows):
+    """Serialize a header and rows as UTF-8 CSV bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def results_rows(results, relevance):
+    """Yield the CSV rows of the search results; ``relevance`` maps result index to the relevance mark"""
+    for index, result in enumerate(results):
+        yield [
+            relevance.get(index, False),
+            index,
+            format_keywords(result),
+            result['title'],
+            ', '.join(result.get('sources') or [result['source']]),
+            format_published(result),
+            format_languages(result),
+            result['link']
+        ]
+
+
+def history_rows(history):
+    """Yield the CSV rows of every news item marked as relevant in the query history"""
+    for query in history:
+        relevance = query.get('relevante_state', {})
+        for index, item in enumerate(query.get('resultados', [])):
+            if not relevance.get(str(index), False):
+                continue
+            yield [
+                query.get('data_hora', ''),
+                query.get('id', ''),
+                format_keywords(item),
+                item['title'],
+                item['source'],
+                format_published(item),
+                format_languages(item),
+                item['link']
+            ]
+
+
+def results_csv(results, relevance):
+    """Return the search results CSV as bytes"""
+    return write_csv(RESULTS_COLUMNS, results_rows(results, relevance))
+
+
+def history_csv(history):
+    """Return the relevant history items CSV as bytes, or None when nothing is marked as relevant"""
+    rows = history_rows(history)
+    first = next(rows, None)
+    if first is None:
+        return None
+
+    def all_rows():
+        yield first
+        yield from rows
+
+    return write_csv(HISTORY_COLUMNS, all_rows())
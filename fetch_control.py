@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+
+class FetchError(Exception):
+    """A feed request failed and should not be retried"""
+
+
+class RetryableFetchError(FetchError):
+    """A feed request failed with a transient error (429, 5xx, timeout, connection)"""
+
+
+class CircuitOpenError(FetchError):
+    """The circuit breaker is open; no request was issued"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the outbound request rate.
+
+    ``rate`` tokens are added per second up to ``capacity``; each request
+    takes one token and waits when the bucket is empty.
+    """
+
+    def __init__(self, rate=5.0, capacity=10):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to ``timeout`` seconds (forever if None); returns True on success"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Stops issuing requests for a cool-down once the recent failure rate is too high.
+
+    The outcome of the last ``window`` requests is kept. When at least
+    ``min_requests`` were seen and the failure ratio reaches
+    ``failure_threshold`` the circuit opens for ``cooldown`` seconds. After
+    the cool-down a single trial request is allowed (half-open): success
+    closes the circuit, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=0.5, window=20, min_requests=10, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self._outcomes = collections.deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a request may be issued now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # Meio-aberto: apenas uma requisição de teste por vez
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info("Circuit breaker closed after successful trial request")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._trial_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_requests \
+                    and failures / len(self._outcomes) >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        logger.warning(f"Circuit breaker opened for {self.cooldown:.0f}s after repeated upstream failures")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        self._outcomes.clear()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller of a key runs the function; callers arriving while it
+    is in flight wait for it and get the same result (or exception). Once it
+    finishes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args, **kwargs):
+        """Run ``function(*args, **kwargs)`` once per in-flight ``key``; returns (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """Return the number of keys being executed now"""
+        with self._lock:
+            return len(self._calls)
+
+
+# Instâncias compartilhadas por todo o processo (todas as sessões do Streamlit)
+DEFAULT_RATE_LIMITER = TokenBucket(rate=5.0, capacity=10)
+DEFAULT_CIRCUIT_BREAKER = CircuitBreaker()
@@ -31,34 +31,91 @@ class CGIModule:
 sys.modules['cgi'] = CGIModule
 
 import feedparser
+import argparse
+import contextlib
 import datetime
 import time
-from dateutil import parser
 from dateutil.relativedelta import relativedelta
 import os
 import json
 import urllib.parse
 import requests
-import random
-import logging
 import pickle
 from pathlib import Path
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import backoff
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("google_news_searcher.log"),
-        logging.StreamHandler()
-    ]
+from article_store import ArticleStore
+from news_items import (
+    to_timestamp, from_timestamp, parse_rfc822, parse_date_fallback, published_timestamp,
+    format_keywords, format_languages, normalize_link
+)
+from memory_cache import MemoryLRU
+from query_planner import VariationPlanner, marginal_yield
+from safe_io import write_json
+import metrics
+from logging_setup import configure_logging
+from fetch_control import (
+    FetchError, RetryableFetchError, CircuitOpenError, SingleFlight,
+    DEFAULT_RATE_LIMITER, DEFAULT_CIRCUIT_BREAKER
 )
-logger = logging.getLogger("GoogleNewsSearcher")
+
+# Configurar logging (fila com escrita em segundo plano, ver logging_setup.py)
+logger = configure_logging("GoogleNewsSearcher")
+
+# Datas relativas, ex.: "5 horas atrás"
+TIME_AGO_RE = re.compile(r'(\d+)\s+(minutos?|horas?|dias?|semanas?)\s+atrás', re.IGNORECASE)
+
+def merge_duplicate_news(results):
+    """Merge news items that point to the same article across keywords and languages"""
+    # Indexado pelo link canônico (uma única passada); a primeira ocorrência é mantida
+    # e ganha as listas keywords/languages com todas as correspondências
+    merged = {}
+    for item in results:
+        key = normalize_link(item.get('link')) or id(item)
+        existing = merged.get(key)
+        if existing is None:
+            existing = dict(item)
+            existing['keywords'] = list(item.get('keywords', [item['keyword']]))
+            existing['languages'] = list(item.get('languages', [item['language']]))
+            merged[key] = existing
+            continue
+        for keyword in item.get('keywords', [item['keyword']]):
+            if keyword not in existing['keywords']:
+                existing['keywords'].append(keyword)
+        for language in item.get('languages', [item['language']]):
+            if language not in existing['languages']:
+                existing['languages'].append(language)
+    return list(merged.values())
+
+DEFAULT_FEED_BASE_URL = "https://news.google.com/rss/search"
+
+# Campos das entradas lidos por _parse_feed_entries; é só o que se guarda de um
+# feed para responder a um 304 Not Modified
+FEED_ENTRY_FIELDS = ('title', 'link', 'published', 'published_parsed', 'summary')
+
+def _slim_feed(feed):
+    """Return a copy of a parsed feed holding only the entry fields needed to parse it again"""
+    entries = []
+    for entry in feed.entries:
+        slim = feedparser.FeedParserDict((field, entry[field]) for field in FEED_ENTRY_FIELDS if field in entry)
+        if 'source' in entry and 'title' in entry.source:
+            slim['source'] = feedparser.FeedParserDict(title=entry.source['title'])
+        entries.append(slim)
+    return feedparser.FeedParserDict(entries=entries)
+
+def _record_retry(details):
+    """backoff handler counting the retries of feed requests"""
+    metrics.FETCH_RETRIES.inc()
 
 class GoogleNewsSearcher:
-    def __init__(self):
+    def __init__(self, max_workers=16, per_host_limit=8, cache_dir=None,
+                 rate_limiter=None, circuit_breaker=None,
+                 memory_cache_entries=256, memory_cache_bytes=32 * 1024 * 1024,
+                 disk_cache_bytes=256 * 1024 * 1024, cache_retention=datetime.timedelta(days=30),
+                 cleanup_interval=900, feed_base_url=None, single_flight=None, variation_planner=None,
+                 feed_validator_entries=1024, feed_validator_bytes=16 * 1024 * 1024):
         self.keywords = []
         self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.json")
         # Configurações de idioma para as buscas
@@ -67,12 +124,74 @@ class GoogleNewsSearcher:
             'en': {'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en', 'name': 'Inglês'}
         }
         
+        # Endereço do feed RSS de busca (pode apontar para um servidor local nos benchmarks)
+        self.feed_base_url = feed_base_url or os.environ.get('RADAR_FEED_BASE_URL', DEFAULT_FEED_BASE_URL)
+        
         # Configuração do cache
-        self.cache_dir = Path(os.path.dirname(os.path.abspath(__file__))) / "cache"
+        if cache_dir is None:
+            cache_dir = Path(os.path.dirname(os.path.abspath(__file__))) / "cache"
+        self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.article_store = ArticleStore(self.cache_dir / "articles.db")
+        self.import_legacy_cache()
         self.cache_expiry = datetime.timedelta(hours=6)  # Cache expira após 6 horas
+        
+        # Variações de consulta escolhidas pelo rendimento medido de cada uma
+        self.variation_planner = variation_planner or VariationPlanner(self.article_store)
+        
+        # Cache em dois níveis: L1 em memória (por palavra-chave/idioma/período) na
+        # frente do banco SQLite, que tem tamanho máximo e remove entradas não
+        # usadas há mais de cache_retention
+        self.memory_cache = MemoryLRU(max_entries=memory_cache_entries, max_bytes=memory_cache_bytes)
+        self.disk_cache_bytes = disk_cache_bytes
+        self.cache_retention = cache_retention
+        if cleanup_interval:
+            self.article_store.start_cleanup(
+                cleanup_interval, cache_retention.total_seconds(), disk_cache_bytes
+            )
+        
+        # Configuração do motor de busca concorrente
+        self.max_workers = max_workers  # Total de requisições simultâneas
+        self.per_host_limit = per_host_limit  # Requisições simultâneas por host
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        
+        # Limite de taxa e disjuntor compartilhados por todo o processo
+        self.rate_limiter = rate_limiter or DEFAULT_RATE_LIMITER
+        self.circuit_breaker = circuit_breaker or DEFAULT_CIRCUIT_BREAKER
+        
+        # Buscas idênticas simultâneas (várias sessões, pré-aquecimento) compartilham
+        # a mesma requisição, gravação no cache e leitura do banco
+        self.single_flight = single_flight or SingleFlight()
+        
+        # Sessão HTTP persistente (keep-alive, gzip) compartilhada pelas threads
+        self.request_timeout = 15  # Segundos
+        self.session = self._create_session()
+        
+        # Validadores (ETag / Last-Modified) e entradas do último feed por URL
+        # (LRU limitada: sem ela, cresceria com cada URL de palavra-chave/idioma/variação)
+        self._feed_validators = MemoryLRU(
+            max_entries=feed_validator_entries, max_bytes=feed_validator_bytes, ttl=float('inf')
+        )
         self.load_keywords()
         
+    def _create_session(self):
+        """Create the pooled HTTP session used for every feed request"""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.max_workers
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (compatible; RadarDeMercado/1.0)',
+            'Accept': 'application/rss+xml, application/xml;q=0.9, */*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+        
     def load_keywords(self):
         """Load saved keywords from file if it exists"""
         if os.path.exists(self.config_file):
@@ -87,8 +206,7 @@ class GoogleNewsSearcher:
     def save_keywords(self):
         """Save keywords to file"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.keywords, f, ensure_ascii=False)
+            write_json(self.config_file, self.keywords)
             print("Palavras-chave salvas com sucesso!")
         except Exception as e:
             print(f"Erro ao salvar palavras-chave: {e}")
@@ -237,17 +355,20 @@ class GoogleNewsSearcher:
         print(f"\nBuscando notícias de {start_date.strftime('%d/%m/%Y')} até {end_date.strftime('%d/%m/%Y')}...")
         
         all_results = []
-        for keyword in selected_keywords:
-            for lang in selected_languages:
-                lang_name = self.language_configs[lang]['name']
-                print(f"\nBuscando por: '{keyword}' em {lang_name}")
-                results = self._fetch_news(keyword, start_date, end_date, lang)
-                
-                if results:
-                    all_results.extend(results)
-                    print(f"Encontradas {len(results)} notícias para '{keyword}' em {lang_name}")
-                else:
-                    print(f"Nenhuma notícia encontrada para '{keyword}' em {lang_name}")
+        tasks = [(keyword, lang) for keyword in selected_keywords for lang in selected_languages]
+        search_started = time.perf_counter()
+        for keyword, lang, results in self.iter_news_batch(tasks, start_date, end_date):
+            lang_name = self.language_configs[lang]['name']
+            if results:
+                all_results.extend(results)
+                print(f"Encontradas {len(results)} notícias para '{keyword}' em {lang_name}")
+            else:
+                print(f"Nenhuma notícia encontrada para '{keyword}' em {lang_name}")
+        
+        # Remover duplicatas entre palavras-chave e idiomas
+        all_results = merge_duplicate_news(all_results)
+        metrics.SEARCH_SECONDS.observe(time.perf_counter() - search_started, source='cli')
+        metrics.SEARCH_RESULTS.inc(len(all_results), source='cli')
         
         # Display results
         if all_results:
@@ -267,138 +388,367 @@ class GoogleNewsSearcher:
             print("\nNenhuma notícia encontrada para as palavras-chave e período especificados.")
             return []
     
-    def _get_cache_key(self, keyword, start_date, end_date, language):
-        """Generate a unique cache key for the query"""
-        start_str = start_date.strftime('%Y%m%d')
-        end_str = end_date.strftime('%Y%m%d')
-        return f"{keyword}_{language}_{start_str}_{end_str}".replace(' ', '_')
+    def _get_cache_key(self, keyword, language, variation):
+        """Generate a unique cache key for a query variation"""
+        return f"{keyword}_{language}_{variation}".replace(' ', '_')
     
-    def _get_cached_results(self, cache_key):
-        """Get cached results if they exist and are not expired"""
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        
-        if not cache_file.exists():
-            return None
-            
+    def _get_fresh_variations(self, keyword, language, max_age=None):
+        """Return the query variations cached within max_age (default: cache expiry), without counting lookups"""
+        max_age = self.cache_expiry if max_age is None else max_age
         try:
-            # Check if cache is expired
-            file_time = datetime.datetime.fromtimestamp(cache_file.stat().st_mtime)
-            if datetime.datetime.now() - file_time > self.cache_expiry:
-                logger.info(f"Cache expired for {cache_key}")
-                return None
-                
-            # Load cache
-            with open(cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
-                logger.info(f"Loaded {len(cached_data)} results from cache for {cache_key}")
-                return cached_data
+            fetch_times = self.article_store.get_fetch_times(keyword, language)
         except Exception as e:
             logger.error(f"Error loading cache: {e}")
-            return None
+            return set()
+        now = datetime.datetime.now()
+        return {
+            variation for variation, fetched_at in fetch_times.items()
+            if now - datetime.datetime.fromtimestamp(fetched_at) <= max_age
+        }
     
-    def _save_to_cache(self, cache_key, results):
-        """Save results to cache"""
-        if not results:
-            return
-            
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+    def _get_stale_variations(self, keyword, language, variations, max_age=None):
+        """Return the query variations that are not cached or older than max_age (default: cache expiry)"""
+        max_age = self.cache_expiry if max_age is None else max_age
+        try:
+            fetch_times = self.article_store.get_fetch_times(keyword, language)
+        except Exception as e:
+            logger.error(f"Error loading cache: {e}")
+            return list(variations)
+        
+        now = datetime.datetime.now()
+        stale = []
+        for variation in variations:
+            cache_key = self._get_cache_key(keyword, language, variation)
+            fetched_at = fetch_times.get(variation)
+            if fetched_at is None:
+                metrics.CACHE_LOOKUPS.inc(language=language, result='miss')
+                stale.append(variation)
+            elif now - datetime.datetime.fromtimestamp(fetched_at) > max_age:
+                metrics.CACHE_LOOKUPS.inc(language=language, result='expired')
+                logger.info(f"Cache expired for {cache_key}",
+                            extra={'event': 'cache_expired', 'keyword': keyword, 'language': language, 'variation': variation})
+                stale.append(variation)
+            else:
+                metrics.CACHE_LOOKUPS.inc(language=language, result='hit')
+                logger.info(f"Cache hit for {cache_key}",
+                            extra={'event': 'cache_hit', 'keyword': keyword, 'language': language, 'variation': variation})
+        return stale
+    
+    def _get_cached_results(self, keyword, start_date, end_date, language):
+        """Get the cached news of a keyword published within the date range"""
+        # Filtro de datas aplicado na leitura (consulta por intervalo no banco):
+        # qualquer período é respondido pelas mesmas entradas em cache
+        start_ts, end_ts = to_timestamp(start_date), to_timestamp(end_date)
+        cache_key = (keyword, language, start_ts, end_ts)
+        articles = self.memory_cache.get(cache_key)
+        metrics.MEMORY_CACHE_LOOKUPS.inc(result='miss' if articles is None else 'hit')
+        if articles is None:
+            try:
+                articles, shared = self.single_flight.do(
+                    ('cache_read',) + cache_key, self._load_cached_articles, *cache_key
+                )
+            except Exception as e:
+                logger.error(f"Error loading cache: {e}")
+                return []
+            if shared:
+                metrics.COALESCED_CALLS.inc(operation='cache_read')
+        return [self._article_to_news_item(article, keyword, language) for article in articles]
+    
+    def _load_cached_articles(self, keyword, language, start_ts, end_ts):
+        """Read the stored articles of a keyword/language within a range into the in-process cache"""
+        articles = self.article_store.query_articles(keyword, language, start_ts, end_ts)
+        self.memory_cache.put((keyword, language, start_ts, end_ts), articles)
+        return articles
+    
+    def _save_to_cache(self, keyword, language, variation, articles):
+        """Save the raw entries of one query variation to cache; returns the links new to the keyword (None on error)"""
+        cache_key = self._get_cache_key(keyword, language, variation)
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(results, f)
-            logger.info(f"Saved {len(results)} results to cache for {cache_key}")
+            new_links = self.article_store.save_articles(keyword, language, articles, variation=variation)
+            logger.info(f"Saved {len(articles)} entries to cache for {cache_key}",
+                        extra={'event': 'cache_saved', 'keyword': keyword, 'language': language,
+                               'variation': variation, 'entries': len(articles)})
+            return new_links
         except Exception as e:
             logger.error(f"Error saving to cache: {e}")
+            return None
+        finally:
+            self.memory_cache.discard_prefix((keyword, language))
+    
+    def _article_to_news_item(self, article, keyword, language):
+        """Build a news item (same shape returned by _fetch_news) from a stored article"""
+        news_item = {
+            'title': article['title'],
+            'link': article['link'],
+            'published': from_timestamp(article['published_ts']).strftime('%d/%m/%Y %H:%M'),
+            'published_ts': article['published_ts'],
+            'source': article['source'] or "Google News",
+            'keyword': keyword,
+            'language': self.language_configs[language]['name']
+        }
+        if article.get('description') is not None:
+            news_item['description'] = article['description']
+        return news_item
+    
+    def import_legacy_cache(self):
+        """Import the old per-query pickle files into the article store and remove them"""
+        language_codes = {config['name']: code for code, config in self.language_configs.items()}
+        imported = 0
+        for cache_file in self.cache_dir.glob('*.pkl'):
+            try:
+                _, language, _, _ = cache_file.stem.rsplit('_', 3)
+                with open(cache_file, 'rb') as f:
+                    results = pickle.load(f)
+                keyword = results[0]['keyword'] if results else None
+                if keyword and language in self.language_configs:
+                    articles = [
+                        {
+                            'link': item['link'],
+                            'title': item['title'],
+                            'source': item.get('source'),
+                            'description': item.get('description'),
+                            'published_ts': published_timestamp(item)
+                        }
+                        for item in results
+                        if language_codes.get(item.get('language'), language) == language
+                    ]
+                    # Sem registrar a busca: as entradas antigas não tornam o cache válido
+                    self.article_store.save_articles(
+                        keyword, language, articles,
+                        fetched_at=cache_file.stat().st_mtime
+                    )
+                    imported += 1
+                cache_file.unlink()
+            except Exception as e:
+                logger.error(f"Error importing legacy cache file {cache_file.name}: {e}")
+        if imported:
+            logger.info(f"Imported {imported} legacy cache files into the article store")
+        return imported
+    
+    def clear_cache(self):
+        """Remove every cached article; returns the number of entries removed"""
+        self.memory_cache.clear()
+        removed = self.article_store.clear()
+        for cache_file in self.cache_dir.glob('*.pkl'):
+            cache_file.unlink()
+            removed += 1
+        return removed
     
+    def clear_expired_cache(self):
+        """Remove articles unused for longer than the retention and enforce the disk cap; returns the number removed"""
+        removed = self.article_store.purge_expired(self.cache_retention.total_seconds())
+        removed += self.article_store.enforce_size_limit(self.disk_cache_bytes)
+        if removed:
+            self.memory_cache.clear()
+        return removed
+    
+    def cache_stats(self):
+        """Return the size and hit counters of both cache tiers"""
+        memory = self.memory_cache.stats()
+        return {
+            'memory_entries': memory['entries'],
+            'memory_bytes': memory['bytes'],
+            'memory_hits': memory['hits'],
+            'memory_misses': memory['misses'],
+            'disk_articles': self.article_store.count_articles(),
+            'disk_bytes': self.article_store.size_bytes()
+        }
+
+    def index_saved_news(self, username, news_items):
+        """Add news items saved in a user's history to the local full-text index"""
+        language_codes = {config['name']: code for code, config in self.language_configs.items()}
+        articles = []
+        for item in news_items:
+            if not item.get('title') or not item.get('link'):
+                continue
+            languages = item.get('languages') or [item.get('language')]
+            articles.append({
+                'link': item['link'],
+                'title': item['title'],
+                'source': item.get('source'),
+                'description': item.get('description'),
+                'published_ts': published_timestamp(item),
+                'keywords': item.get('keywords') or [item.get('keyword')],
+                'languages': [language_codes.get(language, language) for language in languages]
+            })
+        self.article_store.save_saved_articles(username, articles)
+        return len(articles)
+
+    def clear_saved_news(self, username):
+        """Remove a user's history from the local full-text index"""
+        return self.article_store.clear_saved_articles(username)
+
+    def search_local(self, text, username=None, include_cache=True, start_date=None, end_date=None,
+                     keywords=None, languages=None, sources=None, limit=50):
+        """Ranked full-text search over fetched articles and saved history; returns {'history': [...], 'cache': [...]}"""
+        # languages são códigos ('pt', 'en'); cada lista é ordenada pelo rank (menor é melhor)
+        with metrics.SEARCH_SECONDS.time(source='local'):
+            results = self.article_store.search(
+                text, username=username, include_cache=include_cache,
+                start_ts=to_timestamp(start_date) if start_date else None,
+                end_ts=to_timestamp(end_date) if end_date else None,
+                keywords=keywords, languages=languages, sources=sources, limit=limit
+            )
+        news_items = {origin: [self._search_result_to_news_item(result) for result in origin_results]
+                      for origin, origin_results in results.items()}
+        metrics.SEARCH_RESULTS.inc(sum(len(items) for items in news_items.values()), source='local')
+        return news_items
+
+    def _search_result_to_news_item(self, result):
+        """Build a news item from an ``ArticleStore.search`` result"""
+        news_item = {
+            'title': result['title'],
+            'link': result['link'],
+            'published': from_timestamp(result['published_ts'] or 0).strftime('%d/%m/%Y %H:%M'),
+            'published_ts': result['published_ts'] or 0,
+            'source': result['source'] or "Google News",
+            'description': result['description'],
+            'keyword': result['keywords'][0] if result['keywords'] else '',
+            'keywords': result['keywords'],
+            'language': '',
+            'languages': [self.language_configs.get(code, {}).get('name', code) for code in result['languages']],
+            'origin': result['origin'],
+            'rank': result['rank']
+        }
+        news_item['language'] = news_item['languages'][0] if news_item['languages'] else ''
+        return news_item
+
     def _parse_date(self, date_str):
         """Enhanced date parsing with multiple formats"""
-        # Lista de formatos de data comuns
-        formats = [
-            # Formatos padrão
-            '%a, %d %b %Y %H:%M:%S %z',  # RFC 822
-            '%a, %d %b %Y %H:%M:%S %Z',
-            '%Y-%m-%dT%H:%M:%S%z',       # ISO 8601
-            '%Y-%m-%dT%H:%M:%S.%f%z',
-            '%Y-%m-%d %H:%M:%S',
-            '%d/%m/%Y %H:%M:%S',
-            '%d/%m/%Y %H:%M',
-            '%d/%m/%Y',
-            # Formatos em português
-            '%d de %b de %Y',
-            '%d %b %Y',
-            '%d %B %Y',
-        ]
+        # Caminho rápido para o formato enviado pelo Google News
+        pub_date = parse_rfc822(date_str)
+        if pub_date is not None:
+            return pub_date
         
-        # Tentar formatos conhecidos primeiro
-        for fmt in formats:
-            try:
-                return datetime.datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
+        # Procurar padrões como "5 horas atrás", "2 dias atrás", etc.
+        # (não memorizados, pois dependem do horário atual)
+        time_ago_match = TIME_AGO_RE.search(date_str)
+        if time_ago_match:
+            num, unit = time_ago_match.groups()
+            num = int(num)
+            now = datetime.datetime.now()
+            unit = unit.lower()
+            
+            if 'minuto' in unit:
+                return now - datetime.timedelta(minutes=num)
+            elif 'hora' in unit:
+                return now - datetime.timedelta(hours=num)
+            elif 'dia' in unit:
+                return now - datetime.timedelta(days=num)
+            elif 'semana' in unit:
+                return now - datetime.timedelta(weeks=num)
         
-        # Tentar extrair data com regex
-        try:
-            # Procurar padrões como "5 horas atrás", "2 dias atrás", etc.
-            time_ago_match = re.search(r'(\d+)\s+(minutos?|horas?|dias?|semanas?)\s+atrás', date_str, re.IGNORECASE)
-            if time_ago_match:
-                num, unit = time_ago_match.groups()
-                num = int(num)
-                now = datetime.datetime.now()
-                
-                if 'minuto' in unit:
-                    return now - datetime.timedelta(minutes=num)
-                elif 'hora' in unit:
-                    return now - datetime.timedelta(hours=num)
-                elif 'dia' in unit:
-                    return now - datetime.timedelta(days=num)
-                elif 'semana' in unit:
-                    return now - datetime.timedelta(weeks=num)
-        except Exception:
-            pass
-        
-        # Usar o parser da dateutil como último recurso
-        return parser.parse(date_str)
+        # Demais formatos: fallback memorizado
+        return parse_date_fallback(date_str)
     
     @backoff.on_exception(backoff.expo, 
-                          (requests.exceptions.RequestException, 
-                           Exception), 
+                          RetryableFetchError, 
                           max_tries=3, 
-                          jitter=backoff.full_jitter)
+                          jitter=backoff.full_jitter,
+                          on_backoff=_record_retry)
     def _fetch_rss_feed(self, url):
         """Fetch and parse RSS feed with retry logic"""
+        # Limite de taxa e disjuntor compartilhados pelo processo; apenas 429/5xx,
+        # timeouts e erros de conexão são repetidos
+        if not self.circuit_breaker.allow():
+            metrics.CIRCUIT_REJECTIONS.inc()
+            raise CircuitOpenError(f"Circuit open, skipping {url}")
+        self.rate_limiter.acquire()
+        
+        # GET condicional: um 304 reaproveita as entradas da requisição anterior
+        # (apenas os campos lidos por _parse_feed_entries, ver _slim_feed)
+        previous = self._feed_validators.get(url)
+        
+        headers = {}
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        
+        started = time.perf_counter()
         try:
-            feed = feedparser.parse(url)
-            if not feed or not hasattr(feed, 'entries') or len(feed.entries) == 0:
-                logger.warning(f"No entries found in feed from {url}")
-            return feed
-        except Exception as e:
+            response = self.session.get(url, headers=headers, timeout=self.request_timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            metrics.FEED_REQUESTS.inc(status='timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection_error')
+            self.circuit_breaker.record_failure()
             logger.error(f"Error fetching RSS feed from {url}: {e}")
-            raise
-    
-    def _fetch_news(self, keyword, start_date, end_date, language='pt'):
-        """Fetch news from Google News RSS feed for a specific keyword with enhancements"""
-        # Check cache first
-        cache_key = self._get_cache_key(keyword, start_date, end_date, language)
-        cached_results = self._get_cached_results(cache_key)
-        if cached_results is not None:
-            return cached_results
+            raise RetryableFetchError(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            metrics.FEED_REQUESTS.inc(status='error')
+            self.circuit_breaker.record_failure()
+            logger.error(f"Error fetching RSS feed from {url}: {e}")
+            raise FetchError(str(e)) from e
+        metrics.FETCH_SECONDS.observe(time.perf_counter() - started)
+        metrics.FEED_REQUESTS.inc(status=str(response.status_code))
+        body_size = len(response.content)
+        # Com gzip/deflate, contar os bytes recebidos pela conexão, não os descomprimidos
+        metrics.FEED_BYTES.inc(response.raw.tell() if response.raw is not None else body_size)
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+            logger.error(f"Error fetching RSS feed from {url}: HTTP {response.status_code}")
+            raise RetryableFetchError(f"HTTP {response.status_code} from {url}")
+        
+        # O servidor respondeu: upstream saudável, mesmo que a resposta seja inválida
+        self.circuit_breaker.record_success()
+        
+        if response.status_code == 304 and previous:
+            logger.info(f"Feed not modified, reusing parsed entries for {url}",
+                        extra={'event': 'feed_not_modified', 'url': url})
+            return previous['feed']
+        
+        if response.status_code >= 400:
+            logger.error(f"Error fetching RSS feed from {url}: HTTP {response.status_code}")
+            raise FetchError(f"HTTP {response.status_code} from {url}")
+        
+        try:
+            with metrics.FEED_PARSE_SECONDS.time():
+                feed = feedparser.parse(response.content)
+        except Exception as e:
+            logger.error(f"Error parsing RSS feed from {url}: {e}")
+            raise FetchError(str(e)) from e
+        if not feed or not hasattr(feed, 'entries') or len(feed.entries) == 0:
+            logger.warning(f"No entries found in feed from {url}")
         
+        # Guardar validadores para a próxima requisição condicional
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._feed_validators.put(url, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'feed': _slim_feed(feed)
+            })
+        return feed
+    
+    def _build_query_variations(self, keyword, language, max_age=None):
+        """Return the (variation, url) pairs of Google News RSS queries to fetch for a keyword"""
+        # O planejador deixa de fora as variações que pararam de trazer notícias novas
+        # e só explora outras quando a busca já vai sair para a rede
+        candidates = self._query_variation_candidates(keyword, language)
+        fresh = self._get_fresh_variations(keyword, language, max_age)
+        variations = self.variation_planner.plan(keyword, language, candidates, fresh=fresh)
+        metrics.QUERY_VARIATIONS.inc(len(variations), decision='fetch')
+        metrics.QUERY_VARIATIONS.inc(len(candidates) - len(variations), decision='skip')
+        return variations
+    
+    def _query_variation_candidates(self, keyword, language):
+        """Build every (variation, url) pair of Google News RSS queries for a keyword, in preference order"""
         # URL encode the keyword
         encoded_keyword = urllib.parse.quote(keyword)
         
         # Get language configuration
         lang_config = self.language_configs[language]
         
-        # Lista para armazenar todas as notícias
-        all_results = []
-        
         # Implementação de consultas múltiplas com variações para obter mais resultados
         query_variations = [
             # Consulta padrão
-            f"https://news.google.com/rss/search?q={encoded_keyword}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}",
+            ('default', f"{self.feed_base_url}?q={encoded_keyword}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}"),
             # Consulta com aspas para busca exata
-            f"https://news.google.com/rss/search?q=%22{encoded_keyword}%22&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}",
+            ('exact', f"{self.feed_base_url}?q=%22{encoded_keyword}%22&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}"),
             # Consulta com ordenação por data (quando disponível)
-            f"https://news.google.com/rss/search?q={encoded_keyword}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}&sort=date"
+            ('date', f"{self.feed_base_url}?q={encoded_keyword}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}&sort=date")
         ]
         
         # Adicionar variações com palavras relacionadas ao domínio financeiro
@@ -407,92 +757,279 @@ class GoogleNewsSearcher:
         else:  # 'en'
             domain_terms = ['market', 'finance', 'economy', 'business']
             
-        # Adicionar algumas variações com termos de domínio (mas não muitas para não sobrecarregar)
-        for term in random.sample(domain_terms, min(2, len(domain_terms))):
+        # O planejador limita quantos termos de domínio são buscados de fato
+        for term in domain_terms:
             term_encoded = urllib.parse.quote(term)
-            query_variations.append(
-                f"https://news.google.com/rss/search?q={encoded_keyword}+{term_encoded}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}"
-            )
+            query_variations.append((
+                f"term:{term}",
+                f"{self.feed_base_url}?q={encoded_keyword}+{term_encoded}&hl={lang_config['hl']}&gl={lang_config['gl']}&ceid={lang_config['ceid']}"
+            ))
         
-        # Processar cada variação de consulta
-        for url in query_variations:
+        return query_variations
+    
+    def _get_host_semaphore(self, url):
+        """Return the semaphore that caps concurrent requests to the URL's host"""
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._host_semaphores_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def _fetch_variation(self, url):
+        """Fetch one query variation respecting the per-host concurrency cap"""
+        try:
+            with self._get_host_semaphore(url):
+                logger.info(f"Fetching news from {url}", extra={'event': 'fetch', 'url': url})
+                return self._fetch_rss_feed(url)
+        except CircuitOpenError as e:
+            # A abertura do disjuntor já é registrada como aviso; aqui apenas amostras
+            logger.info(str(e), extra={'event': 'circuit_skip', 'url': url})
+            return None
+        except Exception as e:
+            logger.error(f"Erro ao processar feed {url}: {e}")
+            # Continue para a próxima variação em vez de falhar completamente
+            return None
+    
+    def _parse_feed_entries(self, feed, seen_links):
+        """Convert feed entries into cacheable articles, regardless of publication date"""
+        articles = []
+        
+        for entry in feed.entries:
+            # Verificar se a notícia já foi adicionada (evitar duplicatas)
+            link_key = normalize_link(entry.link)
+            if link_key in seen_links:
+                continue
+                
+            # Parse the publication date with enhanced error handling
             try:
-                logger.info(f"Fetching news from {url}")
-                feed = self._fetch_rss_feed(url)
+                # Tentar vários métodos de parsing de data
+                try:
+                    if getattr(entry, 'published_parsed', None):
+                        # Data já convertida para UTC pelo feedparser
+                        pub_date = datetime.datetime(*entry.published_parsed[:6])
+                    else:
+                        pub_date = self._parse_date(entry.published)
+                except Exception:
+                    # Se falhar, tentar extrair a data do título ou descrição
+                    if hasattr(entry, 'title'):
+                        match = re.search(r'\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}\s+(?:jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\w*\s+\d{2,4}', 
+                                          entry.title, re.IGNORECASE)
+                        if match:
+                            pub_date = self._parse_date(match.group(0))
+                        else:
+                            # Se não encontrar data, usar a data atual menos 1 dia (aproximação razoável)
+                            pub_date = datetime.datetime.now() - datetime.timedelta(days=1)
+                    else:
+                        # Último recurso: usar a data atual
+                        pub_date = datetime.datetime.now()
                 
-                for entry in feed.entries:
-                    # Verificar se a notícia já foi adicionada (evitar duplicatas)
-                    if any(r.get('link') == entry.link for r in all_results):
-                        continue
-                        
-                    # Parse the publication date with enhanced error handling
-                    try:
-                        # Tentar vários métodos de parsing de data
-                        try:
-                            pub_date = self._parse_date(entry.published)
-                        except Exception:
-                            # Se falhar, tentar extrair a data do título ou descrição
-                            if hasattr(entry, 'title'):
-                                match = re.search(r'\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}\s+(?:jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\w*\s+\d{2,4}', 
-                                                  entry.title, re.IGNORECASE)
-                                if match:
-                                    pub_date = self._parse_date(match.group(0))
-                                else:
-                                    # Se não encontrar data, usar a data atual menos 1 dia (aproximação razoável)
-                                    pub_date = datetime.datetime.now() - datetime.timedelta(days=1)
-                            else:
-                                # Último recurso: usar a data atual
-                                pub_date = datetime.datetime.now()
-                        
-                        # Convert aware datetime to naive datetime for comparison
-                        if pub_date.tzinfo is not None:
-                            # Convert to UTC and then remove timezone info
-                            pub_date = pub_date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
-                        
-                        # Check if the publication date is within the specified range
-                        if start_date <= pub_date <= end_date:
-                            # Criar um dicionário com os dados básicos da notícia
-                            news_item = {
-                                'title': entry.title,
-                                'link': entry.link,
-                                'published': pub_date.strftime('%d/%m/%Y %H:%M'),
-                                'source': entry.source.title if hasattr(entry, 'source') else "Google News",
-                                'keyword': keyword,
-                                'language': self.language_configs[language]['name']
-                            }
-                            
-                            # Adicionar descrição se disponível
-                            if hasattr(entry, 'summary'):
-                                news_item['description'] = entry.summary
-                            
-                            all_results.append(news_item)
-                    except Exception as e:
-                        logger.error(f"Erro ao processar data de publicação: {e}")
-                        continue
+                # Convert aware datetime to naive datetime for comparison
+                if pub_date.tzinfo is not None:
+                    # Convert to UTC and then remove timezone info
+                    pub_date = pub_date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+                
+                # Criar um dicionário com os dados básicos da notícia
+                article = {
+                    'title': entry.title,
+                    'link': entry.link,
+                    'published_ts': to_timestamp(pub_date),
+                    'source': entry.source.title if hasattr(entry, 'source') else "Google News",
+                    # Adicionar descrição se disponível
+                    'description': entry.summary if hasattr(entry, 'summary') else None
+                }
+                
+                seen_links.add(link_key)
+                articles.append(article)
             except Exception as e:
-                logger.error(f"Erro ao processar feed {url}: {e}")
-                # Continue para a próxima variação em vez de falhar completamente
+                logger.error(f"Erro ao processar data de publicação: {e}")
                 continue
         
-        # Salvar resultados no cache
-        self._save_to_cache(cache_key, all_results)
-        
-        return all_results
+        return articles
+    
+    def _fetch_and_store_variation(self, keyword, language, variation, url, requested_at=None):
+        """Fetch one query variation and save its entries to cache; returns (articles, new_links)"""
+        # Chamadas simultâneas compartilham uma busca; quem só esperou não sabe quais
+        # links foram novos (new_links None), assim como em caso de falha
+        (articles, new_links), shared = self.single_flight.do(
+            ('fetch', keyword, language, variation), self._fetch_and_store_variation_once,
+            keyword, language, variation, url, requested_at
+        )
+        if shared:
+            metrics.COALESCED_CALLS.inc(operation='fetch')
+            return articles, None
+        return articles, new_links
+    
+    def _fetch_and_store_variation_once(self, keyword, language, variation, url, requested_at):
+        # Gravada por outra chamada depois de requested_at: as entradas já estão no cache
+        if requested_at is not None:
+            fetched_at = self.article_store.get_fetch_times(keyword, language).get(variation)
+            if fetched_at is not None and fetched_at >= requested_at:
+                metrics.COALESCED_CALLS.inc(operation='fetch_skipped')
+                logger.info(f"Skipping fetch of {url}: stored meanwhile by another caller",
+                            extra={'event': 'fetch_skipped', 'url': url})
+                return [], None
+        feed = self._fetch_variation(url)
+        if feed is None:
+            # Falhas não são registradas no cache, para serem tentadas de novo
+            return None, None
+        metrics.ENTRIES_SEEN.inc(len(feed.entries), language=language)
+        articles = self._parse_feed_entries(feed, set())
+        return articles, self._save_to_cache(keyword, language, variation, articles)
+    
+    def _record_variation_yield(self, keyword, language, fetched):
+        """Record the marginal yield of the variations fetched in one round"""
+        # fetched: (variation, articles, new_links) em ordem de prioridade. A rodada só é
+        # medida quando esta chamada buscou e gravou todas as variações
+        if not fetched or any(articles is None or new_links is None for _, articles, new_links in fetched):
+            return
+        new_links = set().union(*(links for _, _, links in fetched))
+        yields = marginal_yield(
+            [(variation, [article['link'] for article in articles]) for variation, articles, _ in fetched],
+            new_links
+        )
+        try:
+            self.article_store.record_variation_yield(keyword, language, yields)
+        except Exception as e:
+            logger.error(f"Error saving variation stats: {e}")
+    
+    def _iter_fetch_events(self, tasks, start_date, end_date, max_age=None):
+        """Run the concurrent fetch and yield (event, keyword, language, payload) tuples as they happen"""
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        start_ts, end_ts = to_timestamp(start_date), to_timestamp(end_date)
+        try:
+            for keyword, language in tasks:
+                if (keyword, language) in pending:
+                    continue
+                
+                # Check cache first
+                requested_at = time.time()
+                variations = self._build_query_variations(keyword, language, max_age)
+                stale = set(self._get_stale_variations(keyword, language, [v for v, _ in variations], max_age))
+                if not stale:
+                    yield 'task', keyword, language, self._get_cached_results(keyword, start_date, end_date, language)
+                    continue
+                
+                # Variações na ordem de prioridade do planejador (padrão primeiro)
+                pending[(keyword, language)] = [
+                    (variation, executor.submit(
+                        self._fetch_and_store_variation, keyword, language, variation, url, requested_at
+                    ))
+                    for variation, url in variations
+                    if variation in stale
+                ]
+            
+            future_to_task = {
+                future: task
+                for task, futures in pending.items()
+                for _, future in futures
+            }
+            remaining = {task: len(futures) for task, futures in pending.items()}
+            
+            for future in as_completed(future_to_task):
+                keyword, language = task = future_to_task[future]
+                articles, _ = future.result()
+                # 'feed': itens de uma variação dentro do período, ainda sem deduplicação
+                if articles:
+                    items = [
+                        self._article_to_news_item(article, keyword, language)
+                        for article in articles
+                        if start_ts <= article['published_ts'] <= end_ts
+                    ]
+                    metrics.ENTRIES_KEPT.inc(len(items), language=language)
+                    yield 'feed', keyword, language, items
+                
+                remaining[task] -= 1
+                if not remaining[task]:
+                    fetched = [
+                        (variation, *variation_future.result()) for variation, variation_future in pending[task]
+                    ]
+                    # O rendimento é medido com a rodada completa, então não depende
+                    # da ordem em que as variações terminaram
+                    self._record_variation_yield(keyword, language, fetched)
+                    # 'failed' (falhas, variações) vem logo antes do 'task', cujos resultados são lidos do cache
+                    failed = sum(1 for _, variation_articles, _ in fetched if variation_articles is None)
+                    if failed:
+                        yield 'failed', keyword, language, (failed, len(fetched))
+                    yield 'task', keyword, language, self._get_cached_results(keyword, start_date, end_date, language)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def iter_news_batch(self, tasks, start_date, end_date, max_age=None):
+        """Fetch several (keyword, language) pairs concurrently, yielding (keyword, language, results) as each completes"""
+        # Só variações ausentes ou expiradas (ou mais velhas que max_age) são buscadas;
+        # o período é aplicado na leitura do cache
+        for kind, keyword, language, results in self._iter_fetch_events(tasks, start_date, end_date, max_age):
+            if kind == 'task':
+                yield keyword, language, results
+    
+    def iter_news(self, tasks, start_date, end_date, max_age=None, on_task_done=None,
+                  on_fetch_failed=None, merge_tags=True):
+        """Stream deduplicated news items while the feeds are being fetched"""
+        # Itens já entregues, pelo link canônico. Com merge_tags=False guardam-se só as
+        # chaves, e keywords/languages ficam com a primeira tarefa (para quem grava
+        # cada item assim que chega)
+        merged = {}
+        total = len(set(tasks))
+        completed = 0
+        for kind, keyword, language, items in self._iter_fetch_events(tasks, start_date, end_date, max_age):
+            # Os callbacks rodam na thread de quem chama
+            if kind == 'failed':
+                if on_fetch_failed is not None:
+                    on_fetch_failed(keyword, language, *items)
+                continue
+            batch = []
+            for item in items:
+                key = normalize_link(item['link'])
+                existing = merged.get(key)
+                if existing is None:
+                    item = dict(item)
+                    item['keywords'] = [item['keyword']]
+                    item['languages'] = [item['language']]
+                    merged[key] = item if merge_tags else True
+                    batch.append(item)
+                    continue
+                if not merge_tags:
+                    continue
+                # Notícia já entregue: estender as listas no próprio item
+                if item['keyword'] not in existing['keywords']:
+                    existing['keywords'].append(item['keyword'])
+                if item['language'] not in existing['languages']:
+                    existing['languages'].append(item['language'])
+            if batch:
+                yield batch
+            if kind == 'task':
+                completed += 1
+                if on_task_done is not None:
+                    on_task_done(keyword, language, completed, total)
+    
+    def fetch_news_batch(self, tasks, start_date, end_date, max_age=None):
+        """Fetch several (keyword, language) pairs concurrently and return a dict keyed by pair"""
+        results = {}
+        for keyword, language, task_results in self.iter_news_batch(tasks, start_date, end_date, max_age):
+            results[(keyword, language)] = task_results
+        return {task: results[task] for task in tasks if task in results}
+    
+    def _fetch_news(self, keyword, start_date, end_date, language='pt'):
+        """Fetch news from Google News RSS feed for a specific keyword with enhancements"""
+        results = self.fetch_news_batch([(keyword, language)], start_date, end_date)
+        return results.get((keyword, language), [])
     
-
     
     def _display_results(self, results):
         """Display search results in a formatted way"""
         # Sort results by date (newest first)
-        results.sort(key=lambda x: parser.parse(x['published']), reverse=True)
+        results.sort(key=published_timestamp, reverse=True)
         
         print(f"\n=== Resultados da Busca ({len(results)} notícias) ===")
         for i, result in enumerate(results, 1):
             print(f"\n{i}. {result['title']}")
             print(f"   Fonte: {result['source']}")
             print(f"   Data: {result['published']}")
-            print(f"   Palavra-chave: {result['keyword']}")
-            print(f"   Idioma: {result['language']}")
+            print(f"   Palavra-chave: {format_keywords(result)}")
+            print(f"   Idioma: {format_languages(result)}")
             print(f"   Link: {result['link']}")
     
 
@@ -501,7 +1038,7 @@ class GoogleNewsSearcher:
         """Save search results to a file"""
         try:
             # Sort results by date (newest first)
-            results.sort(key=lambda x: parser.parse(x['published']), reverse=True)
+            results.sort(key=published_timestamp, reverse=True)
             
             # Save as text file
             with open(f"{filename}.txt", 'w', encoding='utf-8') as f:
@@ -510,8 +1047,8 @@ class GoogleNewsSearcher:
                     f.write(f"{i}. {result['title']}\n")
                     f.write(f"   Fonte: {result['source']}\n")
                     f.write(f"   Data: {result['published']}\n")
-                    f.write(f"   Palavra-chave: {result['keyword']}\n")
-                    f.write(f"   Idioma: {result['language']}\n")
+                    f.write(f"   Palavra-chave: {format_keywords(result)}\n")
+                    f.write(f"   Idioma: {format_languages(result)}\n")
                     f.write(f"   Link: {result['link']}\n\n")
             
             # Save as JSON for potential future use
@@ -522,7 +1059,134 @@ class GoogleNewsSearcher:
         except Exception as e:
             print(f"Erro ao salvar resultados: {e}")
 
+def _load_keyword_file(path):
+    """Read keywords from a JSON file ({"keywords": [...]} or a list) or a text file with one per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return [line.strip() for line in content.splitlines() if line.strip()]
+    keywords = data.get('keywords', []) if isinstance(data, dict) else data
+    if not isinstance(keywords, list):
+        raise ValueError(f"Formato de palavras-chave inválido em {path}")
+    return [keyword for keyword in keywords if isinstance(keyword, str) and keyword.strip()]
+
+def _parse_batch_args(argv):
+    """Parse the command line of the non-interactive batch mode"""
+    arg_parser = argparse.ArgumentParser(
+        description="Busca notícias no Google News sem interação e grava os resultados em JSON Lines."
+    )
+    arg_parser.add_argument('--keywords', nargs='+', default=[], help="Palavras-chave a buscar")
+    arg_parser.add_argument('--keyword-file', action='append', default=[],
+                            help="Arquivo de palavras-chave (JSON ou uma por linha); pode ser repetido")
+    arg_parser.add_argument('--languages', nargs='+', default=['pt'], choices=['pt', 'en'])
+    arg_parser.add_argument('--days', type=int, default=1, help="Buscar notícias dos últimos N dias (padrão: 1)")
+    arg_parser.add_argument('--start', help="Data inicial DD/MM/AAAA (substitui --days)")
+    arg_parser.add_argument('--end', help="Data final DD/MM/AAAA (padrão: agora)")
+    arg_parser.add_argument('--output', default='-', help="Arquivo de saída JSON Lines ('-' para stdout)")
+    arg_parser.add_argument('--concurrency', type=int, default=16, help="Requisições simultâneas")
+    arg_parser.add_argument('--cache-dir', help="Diretório do cache (padrão: cache/ ao lado do script)")
+    args = arg_parser.parse_args(argv)
+    
+    keywords = list(args.keywords)
+    for path in args.keyword_file:
+        try:
+            keywords.extend(_load_keyword_file(path))
+        except (OSError, ValueError) as e:
+            arg_parser.error(f"não foi possível ler {path}: {e}")
+    args.keywords = list(dict.fromkeys(keyword.strip() for keyword in keywords if keyword.strip()))
+    if not args.keywords:
+        arg_parser.error("informe --keywords ou --keyword-file")
+    
+    try:
+        if args.end:
+            args.end_date = datetime.datetime.strptime(args.end, "%d/%m/%Y") + datetime.timedelta(days=1, seconds=-1)
+        else:
+            args.end_date = datetime.datetime.now()
+        if args.start:
+            args.start_date = datetime.datetime.strptime(args.start, "%d/%m/%Y")
+        else:
+            args.start_date = args.end_date - datetime.timedelta(days=args.days)
+    except ValueError:
+        arg_parser.error("formato de data inválido, use DD/MM/AAAA")
+    if args.start_date > args.end_date:
+        arg_parser.error("a data inicial não pode ser maior que a data final")
+    if args.concurrency < 1:
+        arg_parser.error("--concurrency deve ser maior que zero")
+    return args
+
+def run_batch(argv):
+    """Run a non-interactive search streaming results as JSON Lines; returns the exit status"""
+    args = _parse_batch_args(argv)
+    started = time.time()
+    
+    # Mensagens informativas vão para stderr para não misturar com a saída JSON Lines
+    with contextlib.redirect_stdout(sys.stderr):
+        searcher = GoogleNewsSearcher(max_workers=args.concurrency, per_host_limit=args.concurrency,
+                                      cache_dir=args.cache_dir)
+    
+    tasks = [(keyword, language) for keyword in args.keywords for language in args.languages]
+    summary = {
+        'tasks': len(tasks),
+        'items_written': 0,
+        'batches': 0,
+        'tasks_failed': 0,
+        'variations_failed': 0,
+        'task_timings': [],
+    }
+    
+    def on_task_done(keyword, language, completed, total):
+        summary['task_timings'].append({
+            'keyword': keyword,
+            'language': language,
+            'elapsed_seconds': round(time.time() - started, 3)
+        })
+    
+    def on_fetch_failed(keyword, language, failed, fetched):
+        summary['variations_failed'] += failed
+        if failed == fetched:
+            summary['tasks_failed'] += 1
+    
+    status = 0
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        # Uma linha gravada não muda mais: keywords/languages ficam com a primeira tarefa
+        for batch in searcher.iter_news(tasks, args.start_date, args.end_date, on_task_done=on_task_done,
+                                        on_fetch_failed=on_fetch_failed, merge_tags=False):
+            if not summary['items_written']:
+                summary['first_item_seconds'] = round(time.time() - started, 3)
+            for item in batch:
+                output.write(json.dumps(item, ensure_ascii=False) + '\n')
+            output.flush()
+            summary['items_written'] += len(batch)
+            summary['batches'] += 1
+    except Exception as e:
+        logger.error(f"Batch search failed: {e}")
+        summary['error'] = str(e)
+        status = 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    summary['tasks_completed'] = len(summary['task_timings'])
+    if summary['tasks_completed'] and summary['tasks_failed'] == summary['tasks_completed']:
+        # Nenhuma tarefa foi buscada com sucesso (todas as requisições falharam)
+        summary['error'] = summary.get('error') or "all fetches failed"
+        status = 1
+    summary['elapsed_seconds'] = round(time.time() - started, 3)
+    summary['feed_requests'] = sum(value for _, value in metrics.FEED_REQUESTS.values())
+    summary['cache_hit_ratio'] = metrics.cache_hit_ratio()
+    metrics.SEARCH_SECONDS.observe(time.time() - started, source='batch')
+    metrics.SEARCH_RESULTS.inc(summary['items_written'], source='batch')
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return status
+
 def main():
+    # Com argumentos na linha de comando, executar no modo não interativo
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
+    
     searcher = GoogleNewsSearcher()
     last_results = []
     
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from news_items import normalize_link, published_timestamp
+from safe_io import atomic_write, file_lock, file_version, group_commit_log
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+# Formato JSON Lines, uma linha por registro:
+#   {"type": "query", "ref": ..., "id": ..., "data_hora": ..., "parametros": {...}}
+#   {"type": "article", "query": <ref da consulta>, "relevant": true, "item": {...}}
+# Os parâmetros da consulta são gravados uma única vez e referenciados por cada
+# notícia salva. Salvar só acrescenta linhas ao fim do arquivo; a compactação
+# reescreve o arquivo quando há linhas repetidas ou corrompidas demais
+QUERY = 'query'
+ARTICLE = 'article'
+
+# Compactar quando as linhas descartáveis passam deste número e desta fração das úteis
+COMPACT_MIN_WASTE = 50
+COMPACT_WASTE_RATIO = 0.5
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def query_ref(consulta):
+    """Return the reference shared by the saved news items of one query (same id, time and parameters)"""
+    key = _dumps([consulta.get('id', ''), consulta.get('data_hora', ''), consulta.get('parametros', {})])
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _article_key(record):
+    item = record['item']
+    return (record['query'], item.get('link'), item.get('title'))
+
+
+def _title_hash(title, source=None):
+    from story_clustering import normalize_text, strip_source_suffix
+
+    tokens = normalize_text(strip_source_suffix(title, source))
+    if not tokens:
+        return None
+    key = _dumps([' '.join(tokens), ' '.join(normalize_text(source or ''))])
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def article_identities(item):
+    """Return the keys identifying a saved news item: its canonical link and its normalized title hash.
+
+    Two items are the same article when either key matches, so a republished
+    link or a title edited only in case, accents or source suffix is still
+    recognized. The title key is scoped to the source and the publication
+    day (UTC), so recurring headlines such as "Dólar hoje" can be saved again
+    on later days; items without a publication date are identified by the
+    link alone.
+    """
+    identities = []
+    link = normalize_link(item.get('link'))
+    if link:
+        identities.append(('link', link))
+    published_ts = published_timestamp(item)
+    title = _title_hash(item.get('title'), item.get('source'))
+    if title and published_ts:
+        identities.append(('title', title, int(published_ts // 86400)))
+    return identities
+
+
+def _is_valid_consulta(consulta):
+    return isinstance(consulta, dict) and 'resultados' in consulta and 'relevante_state' in consulta
+
+
+def _consulta_records(consulta, known_refs):
+    """Yield the records of a query: its metadata (unless already written) and one row per news item"""
+    ref = query_ref(consulta)
+    if ref not in known_refs:
+        known_refs.add(ref)
+        yield {
+            'type': QUERY,
+            'ref': ref,
+            'id': consulta.get('id', ''),
+            'data_hora': consulta.get('data_hora', ''),
+            'parametros': consulta.get('parametros', {})
+        }
+    relevance = consulta['relevante_state']
+    for index, item in enumerate(consulta['resultados']):
+        yield {
+            'type': ARTICLE,
+            'query': ref,
+            'relevant': bool(relevance.get(str(index), relevance.get(index, False))),
+            'item': item
+        }
+
+
+class HistoryStore:
+    """Append-only query history of one user, kept as a JSON Lines file.
+
+    ``load`` returns the history in the shape used by the app: a list of
+    ``consulta`` dicts with one news item each. ``append`` writes only the new
+    items, so saving does not depend on the size of the history. Duplicate
+    rows (e.g. the same item saved from two sessions) and lines torn by a
+    crash are skipped on load and dropped by ``compact``.
+
+    Appends go through the file's ``GroupCommitLog``, so saves from
+    concurrent sessions are written together, and rewrites (migration,
+    compaction, clear) are atomic and hold the same file lock, also across
+    processes.
+
+    ``append_new`` checks items against an in-memory index of the
+    identities of saved items (see ``article_identities``), built lazily
+    from the last load and kept in sync by every write; when ``version``
+    shows the file was changed elsewhere, the index is rebuilt.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._known_refs = set()
+        self._loaded = False
+        self._index = None  # identidades das notícias salvas, montado na primeira verificação
+        self._indexed_items = None  # notícias da última leitura, ainda não indexadas
+        self._index_version = None  # versão do arquivo refletida pelo índice
+        self._inflight = 0  # gravações preparadas ainda não confirmadas em disco
+        self._transitions = {}  # versão antes -> depois das nossas gravações confirmadas
+        self._lock = threading.Lock()
+
+    def version(self):
+        """Return a token that changes whenever the file changes (None while it does not exist).
+
+        Based on the file's modification time and size, so writes made by
+        other processes are noticed as well.
+        """
+        return file_version(self.path)
+
+    def _read_records(self):
+        """Return (query records by ref, article records, number of wasted lines)"""
+        queries = {}
+        articles = []
+        seen = set()
+        waste = 0
+        if not os.path.exists(self.path):
+            return queries, articles, waste
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    kind = record['type']
+                    if kind == QUERY:
+                        if record['ref'] in queries:
+                            waste += 1
+                        queries[record['ref']] = record
+                    elif kind == ARTICLE and isinstance(record['item'], dict):
+                        key = _article_key(record)
+                        if key in seen:
+                            waste += 1
+                            continue
+                        seen.add(key)
+                        articles.append(record)
+                    else:
+                        waste += 1
+                except (ValueError, KeyError, TypeError):
+                    waste += 1
+        # Notícias sem o registro da consulta não podem ser reconstruídas
+        valid = [record for record in articles if record['query'] in queries]
+        waste += len(articles) - len(valid)
+        return queries, valid, waste
+
+    def _write_all(self, records):
+        """Atomically replace the file with ``records``; the caller holds the file lock"""
+        atomic_write(self.path, ''.join(_dumps(record) + '\n' for record in records), lock=False)
+
+    def migrate_legacy(self):
+        """Convert the legacy historico_<user>.json file, once; returns the number of queries migrated.
+
+        Runs only while the JSON Lines file does not exist. The legacy file is
+        left in place as a backup.
+        """
+        with self._lock:
+            return self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return 0
+        with file_lock(self.path):
+            # Outro processo pode ter migrado enquanto esperávamos o bloqueio
+            if os.path.exists(self.path):
+                return 0
+            try:
+                with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                    historico = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not read legacy history {self.legacy_path}: {e}")
+                return 0
+            consultas = [c for c in historico if _is_valid_consulta(c)] if isinstance(historico, list) else []
+            known_refs = set()
+            self._write_all(record for consulta in consultas for record in _consulta_records(consulta, known_refs))
+        logger.info(f"Migrated {len(consultas)} queries from {self.legacy_path} to {self.path}")
+        return len(consultas)
+
+    def load(self, username=''):
+        """Return the history as a list of ``consulta`` dicts, compacting the file when it is too wasteful"""
+        with self._lock:
+            self._migrate_legacy()
+            version = self.version()
+            queries, articles, waste = self._read_records()
+            self._known_refs = set(queries)
+            self._loaded = True
+            if not self._inflight and (self._index is None or self._index_version != version):
+                self._index = None
+                self._indexed_items = [record['item'] for record in articles]
+                self._index_version = version
+            if waste >= COMPACT_MIN_WASTE and waste >= COMPACT_WASTE_RATIO * (len(queries) + len(articles)):
+                self._compact()
+
+        historico = []
+        for record in articles:
+            query = queries[record['query']]
+            historico.append({
+                'id': query['id'],
+                'data_hora': query['data_hora'],
+                'usuario': username,
+                'parametros': query['parametros'],
+                'resultados': [record['item']],
+                'relevante_state': {"0": record['relevant']}
+            })
+        return historico
+
+    def _invalidate_index(self):
+        self._index = self._indexed_items = self._index_version = None
+
+    def _ensure_index(self):
+        version = self.version()
+        # Com gravações em andamento, as mudanças no arquivo são nossas e já estão no índice
+        if not self._inflight and self._index_version != version:
+            # O arquivo mudou fora deste objeto (outro processo): reler
+            self._invalidate_index()
+        if self._index is not None:
+            return
+        if self._indexed_items is None:
+            _, articles, _ = self._read_records()
+            self._indexed_items = [record['item'] for record in articles]
+        self._index = {identity for item in self._indexed_items for identity in article_identities(item)}
+        self._indexed_items = None
+        self._index_version = version
+
+    def _ensure_known_refs(self):
+        if not self._loaded:
+            # Conhecer as consultas já gravadas evita repetir seus parâmetros
+            queries, _, _ = self._read_records()
+            self._known_refs = set(queries)
+            self._loaded = True
+
+    def _prepare(self, consultas):
+        """Serialize ``consultas`` and reserve their identities in the index; the caller holds the lock"""
+        records = [record for consulta in consultas for record in _consulta_records(consulta, self._known_refs)]
+        items = [record['item'] for record in records if record['type'] == ARTICLE]
+        if self._index is not None:
+            self._index.update(identity for item in items for identity in article_identities(item))
+        elif self._indexed_items is not None:
+            self._indexed_items.extend(items)
+        self._inflight += 1
+        return ''.join(_dumps(record) + '\n' for record in records), len(items)
+
+    def _commit(self, data):
+        """Write prepared data through the group commit of the file, without holding the store lock"""
+        result = error = None
+        try:
+            result = group_commit_log(self.path).append(data)
+        except BaseException as e:
+            error = e
+        with self._lock:
+            self._inflight -= 1
+            if error is not None:
+                # Reservas e consultas conhecidas podem não ter chegado ao disco
+                self._invalidate_index()
+                self._transitions.clear()
+                self._loaded = False
+            else:
+                # Encadear as versões produzidas pelas nossas gravações, na ordem em que ocorreram
+                before, after = result
+                self._transitions[before] = after
+                while self._index_version in self._transitions:
+                    self._index_version = self._transitions.pop(self._index_version)
+            if not self._inflight and self._transitions:
+                # Sobrou uma versão sem encadeamento: outro processo gravou entre os lotes
+                self._transitions.clear()
+                self._invalidate_index()
+        if error is not None:
+            raise error
+
+    def append(self, consultas):
+        """Append the news items of ``consultas``; returns the number of items written"""
+        consultas = [c for c in consultas if _is_valid_consulta(c)]
+        if not consultas:
+            return 0
+        with self._lock:
+            self._ensure_known_refs()
+            data, count = self._prepare(consultas)
+        self._commit(data)
+        return count
+
+    def append_new(self, consultas):
+        """Append the consultas whose news items are not saved yet; returns the ones written.
+
+        Duplicates within ``consultas`` are also skipped. Each lookup is a set
+        membership test, so the check does not depend on the size of the history.
+        """
+        with self._lock:
+            self._ensure_known_refs()
+            self._ensure_index()
+            pending = set()
+            novas = []
+            for consulta in consultas:
+                if not _is_valid_consulta(consulta):
+                    continue
+                identities = {identity for item in consulta['resultados'] for identity in article_identities(item)}
+                if identities & self._index or identities & pending:
+                    continue
+                pending |= identities
+                novas.append(consulta)
+            if not novas:
+                return []
+            data, _ = self._prepare(novas)
+        self._commit(data)
+        return novas
+
+    def is_saved(self, item):
+        """Return whether a news item (or the same article under another link or title) is already saved"""
+        with self._lock:
+            self._ensure_index()
+            return any(identity in self._index for identity in article_identities(item))
+
+    def _compact(self):
+        """Rewrite the file from what is on disk now; the caller holds the store lock"""
+        with file_lock(self.path):
+            version = self.version()
+            queries, articles, _ = self._read_records()
+            used = {record['query'] for record in articles}
+            self._write_all([query for ref, query in queries.items() if ref in used] + articles)
+            self._known_refs = used
+            if self._index_version == version and not self._inflight:
+                # Mesmas notícias: o índice continua válido
+                self._index_version = self.version()
+        logger.info(f"Compacted history {self.path}: {len(used)} queries, {len(articles)} items")
+
+    def compact(self):
+        """Rewrite the file without duplicate, orphan or corrupted lines"""
+        with self._lock:
+            self._compact()
+
+    def clear(self):
+        """Remove every saved item (an empty file keeps the legacy history from being migrated again)"""
+        with self._lock:
+            with file_lock(self.path):
+                self._write_all([])
+                self._known_refs = set()
+                self._loaded = True
+                if not self._inflight:
+                    self._index = set()
+                    self._indexed_items = None
+                    self._index_version = self.version()
+                else:
+                    self._invalidate_index()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path, legacy_path=None):
+    """Return the process-wide store of a history file, so every session shares its lock"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = HistoryStore(path, legacy_path)
+        return store
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG_FILE = os.path.join(BASE_DIR, "logs", "google_news_searcher.log")
+
+# Atributos padrão de LogRecord; o restante veio de ``extra`` e vai para o JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_queue_handler = None
+_logger = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including fields passed with ``extra``"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class EventSampler(logging.Filter):
+    """Rate-limit records tagged with an ``event`` (via ``extra``), per event.
+
+    At most ``rate`` records of each event pass every ``per`` seconds; the
+    number dropped meanwhile is attached as ``suppressed`` to the next record
+    of that event that passes. Untagged records and warnings or errors are
+    never dropped.
+    """
+
+    def __init__(self, rate=20, per=60.0):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self._windows = {}  # evento -> [início da janela, aceitos, suprimidos]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(event)
+            if window is None or now - window[0] >= self.per:
+                suppressed = window[2] if window else 0
+                window = self._windows[event] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.rate:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+def _file_handler(log_file, rotation, max_bytes, backup_count):
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+    if rotation == 'size':
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    # Rotação por tempo: 'midnight', 'H', 'D', ...
+    return logging.handlers.TimedRotatingFileHandler(
+        log_file, when=rotation, backupCount=backup_count, encoding='utf-8'
+    )
+
+
+def configure_logging(name="GoogleNewsSearcher", log_file=None, level=None, console_level=None,
+                      rotation=None, max_bytes=5 * 1024 * 1024, backup_count=5, sample_rate=20, sample_period=60.0):
+    """Route the application logger through a queue drained by a background thread.
+
+    Records are written to a rotating JSON Lines file and, from
+    ``console_level`` up, to stderr as text. Callers only pay for putting
+    the record on the queue. Settings default to the RADAR_LOG_FILE,
+    RADAR_LOG_LEVEL, RADAR_LOG_CONSOLE_LEVEL and RADAR_LOG_ROTATION ('size'
+    or a TimedRotatingFileHandler ``when``) environment variables.
+    Configuring twice in the same process is a no-op.
+    """
+    global _listener, _queue_handler, _logger
+    logger = logging.getLogger(name)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        log_file = log_file or os.environ.get('RADAR_LOG_FILE', DEFAULT_LOG_FILE)
+        level = level or os.environ.get('RADAR_LOG_LEVEL', 'INFO')
+        console_level = console_level or os.environ.get('RADAR_LOG_CONSOLE_LEVEL', 'WARNING')
+        rotation = rotation or os.environ.get('RADAR_LOG_ROTATION', 'size')
+
+        handlers = []
+        try:
+            file_handler = _file_handler(log_file, rotation, max_bytes, backup_count)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Não foi possível abrir o arquivo de log {log_file}: {e}")
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(console_level)
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_handler.addFilter(EventSampler(sample_rate, sample_period))
+        logger.addHandler(_queue_handler)
+        _logger = logger
+        logger.setLevel(level)
+        # Não repassar ao logger raiz (Streamlit e bibliotecas têm seus próprios handlers)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Flush the queue and stop the background writer"""
+    global _listener, _queue_handler, _logger
+    with _setup_lock:
+        if _listener is not None:
+            _logger.removeHandler(_queue_handler)
+            _listener.stop()
+            _listener = _queue_handler = _logger = None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import sys
+import threading
+import time
+
+
+def estimate_size(value):
+    """Roughly estimate the memory used by a value made of dicts, lists and scalars"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class MemoryLRU:
+    """Thread-safe in-process LRU cache bounded by entry count and bytes.
+
+    Entries older than ``ttl`` seconds are treated as missing, so writes made
+    by another process reach this tier after at most ``ttl`` seconds.
+    Sizes are estimated once, on insertion.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()  # chave -> (valor, tamanho, inserido_em)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] > self.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Valores maiores que o limite inteiro não são guardados
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def discard_prefix(self, prefix):
+        """Remove every entry whose tuple key starts with ``prefix``"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        """Return entry count, estimated bytes, hits and misses"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
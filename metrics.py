@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import contextlib
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+# Limites (em segundos) dos histogramas de duração
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics.append(metric)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally split by labels"""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def values(self):
+        """Return [(labels, value)] for every label combination seen"""
+        with self._lock:
+            return [(self._labels(key), value) for key, value in sorted(self._values.items())]
+
+    def samples(self):
+        for labels, value in self.values():
+            yield f"{self.name}_total", labels, value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values with fixed cumulative buckets"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block, in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summaries(self):
+        """Return [(labels, count, sum, p50, p95)] per label combination; quantiles are bucket upper bounds"""
+        with self._lock:
+            states = [(self._labels(key), dict(state, buckets=list(state['buckets'])))
+                      for key, state in sorted(self._values.items())]
+        summaries = []
+        for labels, state in states:
+            summaries.append((labels, state['count'], state['sum'],
+                              self._quantile(state, 0.5), self._quantile(state, 0.95)))
+        return summaries
+
+    def _quantile(self, state, quantile):
+        target = quantile * state['count']
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['buckets']):
+            cumulative += count
+            if cumulative >= target and cumulative:
+                return bound
+        return float('inf')
+
+    def samples(self):
+        with self._lock:
+            states = [(self._labels(key), state['buckets'][:], state['sum'], state['count'])
+                      for key, state in sorted(self._values.items())]
+        for labels, buckets, total, count in states:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", dict(labels, le=f"{bound:g}"), cumulative
+            yield f"{self.name}_bucket", dict(labels, le="+Inf"), count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+# Métricas do buscador e do aplicativo
+FEED_REQUESTS = Counter('radar_feed_requests', "Feed HTTP requests issued, by outcome", ['status'])
+FEED_BYTES = Counter('radar_feed_bytes', "Bytes of feed payloads received on the wire, before decompression")
+FETCH_RETRIES = Counter('radar_fetch_retries', "Feed requests retried after a transient error")
+CIRCUIT_REJECTIONS = Counter('radar_circuit_rejections', "Feed requests skipped because the circuit breaker was open")
+FETCH_SECONDS = Histogram('radar_fetch_seconds', "Duration of feed HTTP requests")
+FEED_PARSE_SECONDS = Histogram('radar_feed_parse_seconds', "Time spent parsing feed payloads")
+ENTRIES_SEEN = Counter('radar_entries_seen', "Feed entries received, by language", ['language'])
+ENTRIES_KEPT = Counter('radar_entries_kept', "Feed entries kept after the date filter, by language", ['language'])
+CACHE_LOOKUPS = Counter(
+    'radar_cache_lookups', "Query variation cache lookups, by language and result (hit, miss, expired)",
+    ['language', 'result']
+)
+MEMORY_CACHE_LOOKUPS = Counter('radar_memory_cache_lookups', "In-process article cache lookups, by result", ['result'])
+COALESCED_CALLS = Counter(
+    'radar_coalesced_calls', "Calls that waited for an identical in-flight call instead of repeating it, by operation",
+    ['operation']
+)
+QUERY_VARIATIONS = Counter(
+    'radar_query_variations', "Query variations considered for a keyword, by planner decision (fetch, skip)",
+    ['decision']
+)
+SEARCH_SECONDS = Histogram('radar_search_seconds', "End-to-end search duration, by caller", ['source'])
+SEARCH_STAGE_SECONDS = Histogram('radar_search_stage_seconds', "Duration of each search stage in the app", ['stage'])
+SEARCH_RESULTS = Counter('radar_search_results', "News items returned to users, by caller", ['source'])
+
+
+def cache_hit_ratio():
+    """Return the fraction of variation cache lookups that were hits (None before any lookup)"""
+    totals = {}
+    for labels, value in CACHE_LOOKUPS.values():
+        totals[labels['result']] = totals.get(labels['result'], 0) + value
+    lookups = sum(totals.values())
+    return totals.get('hit', 0) / lookups if lookups else None
+
+
+def start_http_server(port, host='127.0.0.1', registry=REGISTRY):
+    """Serve the registry at http://host:port/metrics from a daemon thread; returns the server"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+_env_server = None
+_env_server_lock = threading.Lock()
+
+
+def start_http_server_from_env():
+    """Start the endpoint once per process when RADAR_METRICS_PORT is set (RADAR_METRICS_HOST, default 127.0.0.1)"""
+    global _env_server
+    port = os.environ.get('RADAR_METRICS_PORT')
+    if not port:
+        return None
+    with _env_server_lock:
+        if _env_server is None:
+            try:
+                _env_server = start_http_server(int(port), os.environ.get('RADAR_METRICS_HOST', '127.0.0.1'))
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not start metrics endpoint on port {port}: {e}")
+        return _env_server
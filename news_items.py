@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import calendar
+import datetime
+import functools
+import re
+import urllib.parse
+
+
+def to_timestamp(dt):
+    """Convert a naive UTC datetime to an epoch timestamp"""
+    return calendar.timegm(dt.timetuple())
+
+
+def from_timestamp(ts):
+    """Convert an epoch timestamp to a naive UTC datetime"""
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).replace(tzinfo=None)
+
+
+# Formato RFC 822 usado pelo Google News, ex.: "Sat, 08 Mar 2025 21:00:00 GMT"
+RFC822_RE = re.compile(
+    r'^\s*(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*(GMT|UTC|UT|Z|[+-]\d{4})?\s*$'
+)
+RFC822_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# Lista de formatos de data comuns, tentados pelo fallback
+DATE_FORMATS = [
+    # Formatos padrão
+    '%a, %d %b %Y %H:%M:%S %z',  # RFC 822
+    '%a, %d %b %Y %H:%M:%S %Z',
+    '%Y-%m-%dT%H:%M:%S%z',       # ISO 8601
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    # Formatos em português
+    '%d de %b de %Y',
+    '%d %b %Y',
+    '%d %B %Y',
+]
+
+
+def parse_rfc822(date_str):
+    """Parse an RFC 822 date without exceptions; returns an aware UTC datetime or None"""
+    match = RFC822_RE.match(date_str)
+    if not match:
+        return None
+    day, month, year, hour, minute, second, zone = match.groups()
+    month = RFC822_MONTHS.get(month.lower())
+    if month is None:
+        return None
+    try:
+        pub_date = datetime.datetime(int(year), month, int(day), int(hour), int(minute),
+                                     int(second or 0), tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+    if zone and zone[0] in '+-':
+        offset = datetime.timedelta(hours=int(zone[1:3]), minutes=int(zone[3:5]))
+        pub_date -= offset if zone[0] == '+' else -offset
+    return pub_date
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date_fallback(date_str):
+    """Try the known formats and then dateutil (memoized)"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    # Usar o parser da dateutil como último recurso (importado só quando
+    # necessário, para que este módulo não dependa de bibliotecas externas)
+    from dateutil import parser
+    return parser.parse(date_str)
+
+
+@functools.lru_cache(maxsize=8192)
+def _published_string_timestamp(published):
+    """Convert a stored '%d/%m/%Y %H:%M' string (UTC) to an epoch timestamp"""
+    try:
+        return to_timestamp(datetime.datetime.strptime(published, '%d/%m/%Y %H:%M'))
+    except (TypeError, ValueError):
+        pass
+    try:
+        pub_date = parse_date_fallback(published)
+        if pub_date.tzinfo is not None:
+            pub_date = pub_date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return to_timestamp(pub_date)
+    except Exception:
+        return 0.0
+
+
+def published_timestamp(item):
+    """Return the publication epoch timestamp (UTC) of a news item.
+
+    Items produced by the searcher carry ``published_ts``; older items (e.g.
+    saved in history files) only have the ``published`` string.
+    """
+    published_ts = item.get('published_ts')
+    if published_ts is not None:
+        return published_ts
+    return _published_string_timestamp(item.get('published', ''))
+
+
+def published_datetime(item):
+    """Return the publication date of a news item as a naive UTC datetime"""
+    return from_timestamp(published_timestamp(item))
+
+
+def format_published(item):
+    """Return the publication date of a news item as '%d/%m/%Y %H:%M'"""
+    if item.get('published'):
+        return item['published']
+    return published_datetime(item).strftime('%d/%m/%Y %H:%M')
+
+
+def format_keywords(item):
+    """Return every keyword that matched a news item as one display string"""
+    return ', '.join(item.get('keywords') or [item.get('keyword', '')])
+
+
+def format_languages(item):
+    """Return every language that matched a news item as one display string"""
+    return ', '.join(item.get('languages') or [item.get('language', '')])
+
+
+# Parâmetros de rastreamento ignorados na comparação de links
+TRACKING_PARAMS = {'oc', 'ved', 'usg', 'fbclid', 'gclid'}
+
+
+def normalize_link(link):
+    """Return a canonical identity for a news link.
+
+    Google News article links are reduced to their article ID; other links
+    lose scheme, ``www.``, fragment, trailing slash and tracking parameters.
+    """
+    if not link:
+        return ""
+    parts = urllib.parse.urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+    if host == 'news.google.com' and '/articles/' in path:
+        return 'gnews:' + path.rsplit('/', 1)[-1]
+    query = urllib.parse.urlencode(sorted(
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith('utm_')
+    ))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
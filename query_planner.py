@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+logger = logging.getLogger("GoogleNewsSearcher")
+
+# Prefixo das variações com termos de domínio ("term:mercado")
+TERM_PREFIX = 'term:'
+
+
+def marginal_yield(fetched, new_links):
+    """Credit each variation of a round with the new links no higher-priority variation returned.
+
+    ``fetched`` lists (variation, links) in priority order, default first;
+    ``new_links`` are the links the whole round added to the keyword's cache.
+    The credit depends only on what each variation returned, not on which
+    fetch finished (and was saved) first. Returns {variation: new links}.
+    """
+    seen = set()
+    yields = {}
+    for variation, links in fetched:
+        links = set(links)
+        yields[variation] = len((links & new_links) - seen)
+        seen |= links
+    return yields
+
+
+class VariationPlanner:
+    """Choose which query variations of a keyword are worth fetching.
+
+    The choice is based on the measured yield of each variation (new
+    articles it brought that no higher-priority variation of the same round
+    returned, see ``marginal_yield``) and is deterministic for the same stats:
+
+    - ``default`` is always fetched;
+    - other variations are dropped once they have ``min_samples`` fetches
+      and their average yield is below ``min_yield``;
+    - at most ``max_terms`` domain terms are fetched, tried terms first (by
+      yield), then never-tried ones (in the given order);
+    - explore budget: when the plan goes upstream anyway (a chosen variation
+      is not fresh in cache) after a measured round, one variation left out
+      is fetched too, a
+      never-tried term first, otherwise one not tried for ``explore_after``
+      seconds, so a variation whose yield improved can come back. While the
+      chosen variations are fresh the selection stays the same and nothing
+      is explored, so repeat searches are served from cache.
+    """
+
+    def __init__(self, store, min_samples=3, min_yield=0.5, max_terms=2, explore_after=24 * 3600):
+        self.store = store
+        self.min_samples = min_samples
+        self.min_yield = min_yield
+        self.max_terms = max_terms
+        self.explore_after = explore_after
+
+    def _unproductive(self, stats):
+        return stats is not None and stats['fetches'] >= self.min_samples and stats['yield'] < self.min_yield
+
+    def plan(self, keyword, language, candidates, fresh=None, now=None):
+        """Return the (variation, url) pairs of ``candidates`` to fetch, keeping their order.
+
+        ``fresh`` holds the variations whose cached results are still valid;
+        None means unknown, and the plan may then explore.
+        """
+        now = time.time() if now is None else now
+        try:
+            stats = self.store.get_variation_stats(keyword, language)
+        except Exception as e:
+            logger.error(f"Error loading variation stats: {e}")
+            stats = {}
+
+        chosen = set()
+        terms = []
+        for position, (variation, _) in enumerate(candidates):
+            variation_stats = stats.get(variation)
+            if variation == 'default':
+                chosen.add(variation)
+            elif variation.startswith(TERM_PREFIX):
+                if not self._unproductive(variation_stats):
+                    # Termos já testados primeiro (maior rendimento antes), depois os nunca buscados;
+                    # assim a escolha não muda enquanto nenhuma rodada nova é medida
+                    rank = (1, 0) if variation_stats is None else (0, -variation_stats['yield'])
+                    terms.append((rank, position, variation))
+            elif not self._unproductive(variation_stats):
+                chosen.add(variation)
+        chosen.update(variation for _, _, variation in sorted(terms)[:self.max_terms])
+
+        # Nada a explorar na primeira rodada (ainda sem medidas) nem quando todas as
+        # escolhidas estão no cache, pois então a busca não sai para a rede
+        if not stats or (fresh is not None and chosen <= set(fresh)):
+            return [(variation, url) for variation, url in candidates if variation in chosen]
+
+        # Orçamento de exploração: um termo nunca buscado, senão a variação deixada de fora há mais tempo
+        explore = min(
+            (
+                (stats[variation]['last_fetched'] if variation in stats else float('-inf'), position, variation)
+                for position, (variation, _) in enumerate(candidates)
+                if variation not in chosen
+                and (variation not in stats or now - stats[variation]['last_fetched'] >= self.explore_after)
+            ),
+            default=None
+        )
+        if explore is not None:
+            chosen.add(explore[2])
+            logger.info(f"Exploring query variation {explore[2]} for {keyword} ({language})",
+                        extra={'event': 'variation_explore', 'keyword': keyword, 'language': language,
+                               'variation': explore[2]})
+
+        return [(variation, url) for variation, url in candidates if variation in chosen]
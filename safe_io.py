@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas o bloqueio entre threads do processo
+    fcntl = None
+
+# Tempo máximo de espera pelo bloqueio de um arquivo, em segundos
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        lock = _thread_locks.get(path)
+        if lock is None:
+            lock = _thread_locks[path] = threading.Lock()
+        return lock
+
+
+@contextlib.contextmanager
+def file_lock(path, timeout=DEFAULT_LOCK_TIMEOUT):
+    """Hold the exclusive write lock of ``path`` for the ``with`` block.
+
+    Threads of this process are serialized by an in-memory lock; other
+    processes (e.g. several Streamlit workers) by ``flock`` on ``path.lock``.
+    Raises TimeoutError if the lock cannot be taken within ``timeout`` seconds,
+    so a stuck writer never blocks a session for long.
+    """
+    path = os.path.abspath(path)
+    lock = _thread_lock(path)
+    if not lock.acquire(timeout=timeout):
+        raise TimeoutError(f"Timed out waiting for the lock of {path}")
+    try:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        deadline = time.monotonic() + timeout
+        with open(f"{path}.lock", 'a') as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for the lock of {path}")
+                    time.sleep(0.01)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        lock.release()
+
+
+def _fsync_directory(directory):
+    """Persist a rename; not supported on every platform"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data, lock=True, timeout=DEFAULT_LOCK_TIMEOUT):
+    """Replace ``path`` with ``data`` (str or bytes) through a fsynced temporary file and a rename.
+
+    Readers see either the old or the new content, never a truncated file.
+    With ``lock`` the write holds ``file_lock(path)``; pass False when the
+    caller already holds it.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with file_lock(path, timeout) if lock else contextlib.nullcontext():
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+        _fsync_directory(directory)
+
+
+def write_json(path, obj, timeout=DEFAULT_LOCK_TIMEOUT, **dump_kwargs):
+    """Atomically write ``obj`` as JSON (UTF-8, non-ASCII kept) under the file lock"""
+    dump_kwargs.setdefault('ensure_ascii', False)
+    atomic_write(path, json.dumps(obj, **dump_kwargs), timeout=timeout)
+
+
+def file_version(path):
+    """Return a token that changes whenever the file changes (None while it does not exist)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class GroupCommitLog:
+    """Append-only file whose concurrent appends are coalesced into group commits.
+
+    Each ``append`` waits until its data is on disk. The first waiting thread
+    becomes the leader: it takes the file lock, writes every batch queued so
+    far with one write and one fsync, and wakes up the threads whose data
+    went along. A burst of saves therefore costs one fsync instead of one per
+    save.
+    """
+
+    def __init__(self, path, timeout=DEFAULT_LOCK_TIMEOUT):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._pending = []
+        self._enqueued = 0  # último tíquete entregue
+        self._done = 0  # último tíquete cujo lote já foi gravado (ou falhou)
+        self._failures = {}  # tíquete -> exceção do lote que falhou
+        self._results = {}  # tíquete -> (versão antes, versão depois) do lote
+        self._busy = False
+        self.commits = 0
+
+    def append(self, data):
+        """Append ``data`` (str) and return the file versions (before, after) around the commit that wrote it"""
+        with self._cond:
+            self._pending.append(data)
+            self._enqueued += 1
+            ticket = self._enqueued
+            while self._busy and self._done < ticket:
+                self._cond.wait()
+            if self._done >= ticket:
+                return self._collect(ticket)
+            # Líder: grava tudo o que está na fila
+            self._busy = True
+            batch, self._pending = self._pending, []
+            first, last = self._done + 1, self._enqueued
+
+        error = result = None
+        try:
+            with file_lock(self.path, self.timeout):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                before = file_version(self.path)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(batch))
+                    f.flush()
+                    os.fsync(f.fileno())
+                result = (before, file_version(self.path))
+        except BaseException as e:
+            error = e
+
+        with self._cond:
+            for number in range(first, last + 1):
+                if error is not None:
+                    self._failures[number] = error
+                else:
+                    self._results[number] = result
+            self._done = last
+            self._busy = False
+            self.commits += 1
+            self._cond.notify_all()
+            return self._collect(ticket)
+
+    def _collect(self, ticket):
+        error = self._failures.pop(ticket, None)
+        result = self._results.pop(ticket, None)
+        if error is not None:
+            raise error
+        return result
+
+
+_logs = {}
+_logs_guard = threading.Lock()
+
+
+def group_commit_log(path):
+    """Return the process-wide GroupCommitLog of ``path``"""
+    path = os.path.abspath(path)
+    with _logs_guard:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = GroupCommitLog(path)
+        return log
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import hashlib
+import html
+import itertools
+import re
+import unicodedata
+
+# Distância de Hamming máxima (em bits) entre impressões digitais da mesma história
+DEFAULT_MAX_DISTANCE = 6
+FINGERPRINT_BITS = 64
+
+# Largura das faixas do LSH: com faixas largas os grupos de candidatos ficam pequenos
+# mesmo com títulos curtos (2^16 valores por faixa)
+BAND_BITS = 16
+
+# Cada bit da impressão digital tem um contador de 32 bits dentro de um inteiro
+# grande, então somar os atributos conta os votos de todos os bits de uma vez
+LANE_BITS = 32
+BITS_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+TAG_RE = re.compile(r'<[^>]+>')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+SOURCE_SUFFIX_RE = re.compile(r'\s+[-–—|]\s+([^-–—|]{1,60})$')
+
+# Palavras muito frequentes que não ajudam a distinguir histórias
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no', 'na',
+    'nos', 'nas', 'um', 'uma', 'para', 'por', 'com', 'que', 'se', 'ao', 'aos',
+    'the', 'of', 'and', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'an', 'is'
+}
+
+
+def strip_source_suffix(title, source=None):
+    """Remove the trailing ' - Source' that Google News appends to titles"""
+    if not title:
+        return ""
+    title = title.strip()
+    if source and title.endswith(f" - {source}"):
+        return title[:-len(source) - 3].rstrip()
+    match = SOURCE_SUFFIX_RE.search(title)
+    if match and len(match.group(1).split()) <= 6:
+        return title[:match.start()].rstrip()
+    return title
+
+
+def normalize_text(text):
+    """Lowercase, strip HTML and accents and return the significant tokens"""
+    if not text:
+        return []
+    text = html.unescape(TAG_RE.sub(' ', text))
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [token for token in TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+def _story_tokens(item):
+    """Return the tokens that identify the story of a news item"""
+    source = item.get('source')
+    tokens = normalize_text(strip_source_suffix(item.get('title', ''), source))
+    description = normalize_text(item.get('description', ''))
+    # A descrição do Google News costuma repetir título e fonte; descartar o nome da fonte
+    source_tokens = set(normalize_text(source))
+    return tokens + [token for token in description if token not in source_tokens]
+
+
+@functools.lru_cache(maxsize=None)
+def _lane_ones(bits):
+    """Return an integer with 1 in the lowest bit of each of the ``bits`` counter lanes"""
+    return sum(1 << (LANE_BITS * i) for i in range(bits))
+
+
+@functools.lru_cache(maxsize=None)
+def _spread_steps(bits):
+    """Return the (mask, shift) steps that move bit i of a hash to bit LANE_BITS * i.
+
+    Bit i moves by (LANE_BITS - 1) * i, done as one shift per bit of i, so
+    spreading takes log2(bits) steps instead of one per bit.
+    """
+    positions = list(range(bits))
+    steps = []
+    for k in reversed(range((bits - 1).bit_length())):
+        shift = (LANE_BITS - 1) << k
+        steps.append((sum(1 << positions[i] for i in range(bits) if (i >> k) & 1), shift))
+        positions = [position + shift if (i >> k) & 1 else position for i, position in enumerate(positions)]
+    return steps
+
+
+@functools.lru_cache(maxsize=65536)
+def _feature_lanes(feature, bits):
+    """Hash a feature and spread bit i of the hash into counter lane i"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+    for mask, shift in _spread_steps(bits):
+        moving = value & mask
+        value = (value ^ moving) | (moving << shift)
+    return value
+
+
+def simhash(tokens, bits=FINGERPRINT_BITS):
+    """Compute the SimHash fingerprint of a token list (unigrams and bigrams)"""
+    features = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return None
+    # counts tem, na faixa i, quantos atributos têm o bit i ligado
+    counts = sum(_feature_lanes(feature, bits) for feature in features)
+    # O bit i fica ligado quando a maioria vota nele: somar 2^31 - (n // 2 + 1) a
+    # cada contador deixa o bit mais alto da faixa ligado exatamente nesse caso
+    ones = _lane_ones(bits)
+    high = LANE_BITS - 1
+    flags = ((counts + ((1 << high) - (len(features) // 2 + 1)) * ones) >> high) & ones
+    digits = flags.to_bytes(bits * LANE_BITS // 8, 'little')[::LANE_BITS // 8]
+    return int(digits.translate(BITS_TO_DIGITS)[::-1], 2)
+
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def cluster_stories(items, max_distance=DEFAULT_MAX_DISTANCE):
+    """Group near-duplicate news items into stories.
+
+    Each fingerprint is split into ``BAND_BITS``-wide bands; by the
+    pigeonhole principle two fingerprints within ``max_distance`` bits differ
+    by at most ``max_distance // bands`` bits in at least one band, so each
+    band is looked up with its value and every neighbour within that
+    distance, and only items found there are compared. Returns one item per
+    story, in input order, holding the first item of the story plus
+    ``sources``, ``story_size`` and ``related`` (the other members), with
+    keywords and languages merged.
+    """
+    # Impressões idênticas são agrupadas antes do LSH
+    by_fingerprint = {}
+    singletons = []
+    for index, item in enumerate(items):
+        fingerprint = simhash(_story_tokens(item))
+        if fingerprint is None:
+            singletons.append(index)
+        else:
+            by_fingerprint.setdefault(fingerprint, []).append(index)
+
+    fingerprints = list(by_fingerprint)
+    parents = list(range(len(fingerprints)))
+    bands = FINGERPRINT_BITS // BAND_BITS
+    band_mask = (1 << BAND_BITS) - 1
+    # Máscaras dos vizinhos de uma faixa (valores a até max_distance // bands bits)
+    neighbours = [
+        sum(1 << bit for bit in flipped)
+        for distance in range(max_distance // bands + 1)
+        for flipped in itertools.combinations(range(BAND_BITS), distance)
+    ]
+    buckets = {}
+    for position, fingerprint in enumerate(fingerprints):
+        candidates = set()
+        for band in range(bands):
+            # Chave do grupo: número da faixa nos bits acima do valor
+            key = band << BAND_BITS | fingerprint >> (band * BAND_BITS) & band_mask
+            for mask in neighbours:
+                bucket = buckets.get(key ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+            buckets.setdefault(key, []).append(position)
+        for other in candidates:
+            if bin(fingerprint ^ fingerprints[other]).count('1') <= max_distance:
+                root, other_root = _find(parents, position), _find(parents, other)
+                if root != other_root:
+                    parents[root] = other_root
+
+    groups = {}
+    for position, fingerprint in enumerate(fingerprints):
+        groups.setdefault(_find(parents, position), []).extend(by_fingerprint[fingerprint])
+    members = [sorted(group) for group in groups.values()] + [[index] for index in singletons]
+    members.sort(key=lambda group: group[0])
+
+    return [_build_story([items[index] for index in group]) for group in members]
+
+
+def _build_story(group):
+    """Merge a group of news items into one story item"""
+    story = dict(group[0])
+    story['keywords'] = list(story.get('keywords') or [story.get('keyword')])
+    story['languages'] = list(story.get('languages') or [story.get('language')])
+    story['sources'] = [story.get('source')]
+    story['related'] = []
+    for item in group[1:]:
+        if item.get('source') not in story['sources']:
+            story['sources'].append(item.get('source'))
+        for keyword in item.get('keywords') or [item.get('keyword')]:
+            if keyword not in story['keywords']:
+                story['keywords'].append(keyword)
+        for language in item.get('languages') or [item.get('language')]:
+            if language not in story['languages']:
+                story['languages'].append(language)
+        story['related'].append({
+            'title': item.get('title'),
+            'link': item.get('link'),
+            'source': item.get('source'),
+            'published': item.get('published')
+        })
+    story['story_size'] = len(group)
+    return story
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Test case with a temporary directory removed after each test"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def temp_path(self, name):
+        return os.path.join(self.directory, name)
+
+
+class StubFeedTestCase(TempDirTestCase):
+    """Test case with the local Google News stub (benchmarks/stub_server.py) running"""
+
+    feed_size = 20
+    latency = 0.0
+    jitter = 0.0
+    # Período que cobre todas as notícias servidas pelo stub
+    start_date = datetime.datetime(2000, 1, 1)
+    end_date = datetime.datetime.now() + datetime.timedelta(days=1)
+
+    def setUp(self):
+        super().setUp()
+        if BENCHMARKS_DIR not in sys.path:
+            sys.path.append(BENCHMARKS_DIR)
+        from stub_server import StubFeedServer
+
+        self.server = StubFeedServer(feed_size=self.feed_size, latency=self.latency, jitter=self.jitter)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def new_searcher(self, **options):
+        """Searcher pointed at the stub, with its cache in the temporary directory"""
+        from fetch_control import CircuitBreaker, TokenBucket
+        from google_news_searcher import GoogleNewsSearcher
+
+        options.setdefault('cache_dir', self.temp_path('cache'))
+        options.setdefault('rate_limiter', TokenBucket(rate=100000, capacity=100000))
+        options.setdefault('circuit_breaker', CircuitBreaker())
+        return GoogleNewsSearcher(cleanup_interval=0, feed_base_url=self.server.base_url, **options)
+
+    def requests_made(self, search):
+        """Run ``search`` and return how many requests reached the stub"""
+        before = self.server.request_count
+        search()
+        return self.server.request_count - before
+
+
+def news_item(link, title=None, source='Valor', published='01/03/2025 10:00', keyword='Petrobras',
+              language='Português', **extra):
+    """News item in the format returned by the searcher"""
+    item = {
+        'title': title if title is not None else f"Notícia {link}",
+        'link': link,
+        'source': source,
+        'published': published,
+        'keyword': keyword,
+        'language': language
+    }
+    item.update(extra)
+    return item
+
+
+def history_query(link, title, published='01/03/2025 10:00', source='Valor', query_id='20250301_100000',
+                  relevant=True):
+    """Saved query with a single result, in the format kept in the user history"""
+    return {
+        'id': query_id,
+        'data_hora': '01/03/2025 10:05',
+        'usuario': 'marco',
+        'parametros': {'keywords': ['Petrobras'], 'languages': ['Português'], 'start_date': '', 'end_date': ''},
+        'resultados': [news_item(link, title, source=source, published=published)],
+        'relevante_state': {"0": relevant}
+    }
+
+
+def stored_articles(*links, published_ts=1700000000.0, description=None):
+    """Articles in the format saved by ArticleStore"""
+    return [
+        {'link': link, 'title': f"Notícia {link}", 'source': 'Valor', 'description': description,
+         'published_ts': published_ts}
+        for link in links
+    ]
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import time
+import unittest
+
+from article_store import SCHEMA_VERSION, TOUCH_GRANULARITY, ArticleStore, fts_query
+from helpers import TempDirTestCase, stored_articles
+
+# Esquema criado pela primeira versão do banco (antes de feed_fetches e do FTS)
+LEGACY_SCHEMA = """
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    source TEXT,
+    description TEXT,
+    published_ts REAL NOT NULL,
+    first_seen REAL NOT NULL
+);
+CREATE TABLE article_keywords (
+    keyword TEXT NOT NULL,
+    language TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    PRIMARY KEY (keyword, language, article_id)
+) WITHOUT ROWID;
+CREATE TABLE fetch_log (
+    cache_key TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    language TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    fetched_at REAL NOT NULL
+);
+INSERT INTO articles VALUES (1, 'https://a/1', 'Ação da Petrobras sobe', 'Valor', 'Alta de 3%', 1700000000.0, 1700000100.0);
+INSERT INTO article_keywords VALUES ('Petrobras', 'pt', 1);
+INSERT INTO fetch_log VALUES ('Petrobras_pt', 'Petrobras', 'pt', 0, 1, 1700000100.0);
+"""
+
+
+class ArticleStoreTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.temp_path('articles.db')
+
+    def _tables(self, store):
+        return {row['name'] for row in store._connect().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+class SchemaMigrationTest(ArticleStoreTest):
+    def _legacy_store(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.close()
+        return ArticleStore(self.path)
+
+    def test_legacy_database_is_upgraded(self):
+        store = self._legacy_store()
+        conn = store._connect()
+
+        self.assertNotIn('fetch_log', self._tables(store))
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.assertEqual(conn.execute("SELECT last_accessed FROM articles").fetchone()[0], 1700000100.0)
+        # A busca antiga não torna o cache válido: a palavra-chave é buscada de novo
+        self.assertEqual(store.get_fetch_times('Petrobras', 'pt'), {})
+        self.assertEqual([article['link'] for article in store.query_articles('Petrobras', 'pt')], ['https://a/1'])
+
+    def test_stored_articles_are_indexed_for_search(self):
+        store = self._legacy_store()
+        self.assertEqual([result['link'] for result in store.search('acao petrobras')['cache']], ['https://a/1'])
+
+    def test_new_database_starts_at_current_version(self):
+        store = ArticleStore(self.path)
+        self.assertEqual(store._connect().execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        self.assertNotIn('fetch_log', self._tables(store))
+
+    def test_migration_runs_once(self):
+        self._legacy_store()
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE fetch_log (cache_key TEXT PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        self.assertIn('fetch_log', self._tables(ArticleStore(self.path)))
+
+
+class RangeQueryTest(ArticleStoreTest):
+    def test_range_is_applied_on_read(self):
+        store = ArticleStore(self.path)
+        for day in range(5):
+            store.save_articles('Petrobras', 'pt', stored_articles(f'https://a/{day}', published_ts=1700000000.0 + day * 86400))
+
+        articles = store.query_articles('Petrobras', 'pt', 1700000000.0 + 86400, 1700000000.0 + 3 * 86400)
+        self.assertEqual([article['link'] for article in articles], ['https://a/3', 'https://a/2', 'https://a/1'])
+        self.assertEqual(store.query_articles('Vale', 'pt'), [])
+
+    def test_reads_only_touch_articles_unused_for_a_while(self):
+        store = ArticleStore(self.path)
+        old = time.time() - 2 * TOUCH_GRANULARITY
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1'), fetched_at=old)
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/2', published_ts=1800000000.0), fetched_at=old)
+        conn = store._connect()
+
+        store.query_articles('Petrobras', 'pt', end_ts=1750000000.0)
+        touched = dict(conn.execute("SELECT link, last_accessed FROM articles").fetchall())
+        self.assertGreater(touched['https://a/1'], old)
+        self.assertEqual(touched['https://a/2'], old)
+
+        store.query_articles('Petrobras', 'pt', end_ts=1750000000.0)
+        self.assertEqual(conn.execute("SELECT last_accessed FROM articles WHERE link = 'https://a/1'").fetchone()[0],
+                         touched['https://a/1'])
+
+    def test_long_descriptions_round_trip_compressed(self):
+        store = ArticleStore(self.path)
+        description = "Petrobras anuncia dividendos extraordinários. " * 20
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1', description=description))
+
+        self.assertIsInstance(store._connect().execute("SELECT description FROM articles").fetchone()[0], bytes)
+        self.assertEqual(store.query_articles('Petrobras', 'pt')[0]['description'], description)
+
+
+class EvictionTest(ArticleStoreTest):
+    def test_purge_removes_unused_articles_and_their_fetch_records(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1'), variation='default', fetched_at=time.time() - 7200)
+        store.save_articles('Vale', 'pt', stored_articles('https://b/1'), variation='default')
+
+        self.assertEqual(store.purge_expired(3600), 1)
+        self.assertEqual(store.query_articles('Petrobras', 'pt'), [])
+        self.assertEqual(store.get_fetch_times('Petrobras', 'pt'), {})
+        self.assertIn('default', store.get_fetch_times('Vale', 'pt'))
+
+    def test_size_limit_evicts_least_recently_used_first(self):
+        store = ArticleStore(self.path)
+        description = os.urandom(3000).hex()
+        now = time.time()
+        for index in range(200):
+            store.save_articles('Petrobras', 'pt', stored_articles(f'https://a/{index}', description=description),
+                                fetched_at=now - 200 + index)
+        limit = store.size_bytes() // 2
+
+        removed = store.enforce_size_limit(limit, batch_size=20)
+        self.assertGreater(removed, 0)
+        self.assertLessEqual(store.size_bytes(), limit)
+        links = {article['link'] for article in store.query_articles('Petrobras', 'pt')}
+        self.assertIn('https://a/199', links)
+        self.assertNotIn('https://a/0', links)
+        self.assertEqual(store.get_fetch_times('Petrobras', 'pt'), {})
+
+    def test_clear_keeps_saved_history(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1'), variation='default')
+        store.save_saved_articles('marco', stored_articles('https://a/1'))
+
+        self.assertEqual(store.clear(), 1)
+        self.assertEqual(store.count_articles(), 0)
+        self.assertEqual(store.count_saved_articles('marco'), 1)
+
+
+class FullTextSearchTest(ArticleStoreTest):
+    def test_query_quotes_every_word_and_prefixes_the_last(self):
+        self.assertEqual(fts_query('petrobras divid'), '"petrobras" "divid"*')
+        self.assertIsNone(fts_query('  -- "" '))
+        self.assertIsNone(fts_query(None))
+
+    def test_fts_operators_typed_by_the_user_are_plain_words(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', [
+            {'link': 'https://a/1', 'title': 'Petrobras OR Vale NEAR acordo', 'source': 'Valor',
+             'description': None, 'published_ts': 1700000000.0}
+        ])
+
+        for text in ('OR', 'NEAR(petrobras vale)', 'vale OR acordo', 'petrobras -vale', '"vale', 'vale*)'):
+            with self.subTest(text=text):
+                self.assertEqual([r['link'] for r in store.search(text)['cache']], ['https://a/1'])
+        # Sem operadores: todas as palavras precisam aparecer, e sintaxe inválida não gera erro
+        self.assertEqual(store.search('title:petrobras')['cache'], [])
+        self.assertEqual(store.search('petrobras AND NOT')['cache'], [])
+
+    def test_search_ignores_accents_and_html(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', [
+            {'link': 'https://a/1', 'title': 'Ação da Petrobras', 'source': 'Valor',
+             'description': '<a href="https://a/1">Lucro recorde</a>&nbsp;<font>Valor</font>', 'published_ts': 1700000000.0}
+        ])
+
+        self.assertEqual(len(store.search('acao')['cache']), 1)
+        self.assertEqual(len(store.search('lucro recor')['cache']), 1)
+        self.assertEqual(store.search('href')['cache'], [])
+
+    def test_history_and_cache_hits_are_ranked_separately(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1', 'https://a/2'))
+        store.save_articles('Vale', 'en', stored_articles('https://b/1'))
+        saved = stored_articles('https://a/1', 'https://c/1')
+        for article in saved:
+            article['keywords'], article['languages'] = ['Petrobras'], ['pt']
+        store.save_saved_articles('marco', saved)
+
+        results = store.search('noticia', username='marco')
+        self.assertEqual({r['link'] for r in results['history']}, {'https://a/1', 'https://c/1'})
+        # Notícia salva aparece uma única vez, como histórico
+        self.assertEqual({r['link'] for r in results['cache']}, {'https://a/2', 'https://b/1'})
+        self.assertTrue(all(r['origin'] == 'history' for r in results['history']))
+        for origin in ('history', 'cache'):
+            ranks = [r['rank'] for r in results[origin]]
+            self.assertEqual(ranks, sorted(ranks))
+
+        filtered = store.search('noticia', username='marco', keywords=['Vale'], languages=['en'])
+        self.assertEqual([r['link'] for r in filtered['cache']], ['https://b/1'])
+        self.assertEqual(filtered['history'], [])
+        self.assertEqual(store.search('noticia', username='giovanni', include_cache=False),
+                         {'history': [], 'cache': []})
+
+    def test_evicted_articles_leave_the_index(self):
+        store = ArticleStore(self.path)
+        store.save_articles('Petrobras', 'pt', stored_articles('https://a/1'), fetched_at=time.time() - 7200)
+        store.purge_expired(3600)
+        self.assertEqual(store.search('noticia')['cache'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
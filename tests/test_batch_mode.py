@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from google_news_searcher import _parse_batch_args, run_batch
+from helpers import StubFeedTestCase, TempDirTestCase
+
+
+class ParseBatchArgsTest(TempDirTestCase):
+    def _error(self, argv):
+        with self.assertRaises(SystemExit) as raised, contextlib.redirect_stderr(io.StringIO()):
+            _parse_batch_args(argv)
+        return raised.exception.code
+
+    def test_keywords_and_keyword_files_are_merged_without_duplicates(self):
+        json_file, text_file = self.temp_path('keywords.json'), self.temp_path('keywords.txt')
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump({'keywords': ['Vale', 'Itaú', 3]}, f)
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write('Ambev\n\n Vale \n')
+
+        args = _parse_batch_args(['--keywords', 'Petrobras', 'Vale', '--keyword-file', json_file,
+                                  '--keyword-file', text_file])
+        self.assertEqual(args.keywords, ['Petrobras', 'Vale', 'Itaú', 'Ambev'])
+        self.assertEqual(args.languages, ['pt'])
+        self.assertEqual(args.output, '-')
+
+    def test_period_defaults_to_the_last_days(self):
+        args = _parse_batch_args(['--keywords', 'Petrobras', '--days', '7'])
+        self.assertEqual(args.end_date - args.start_date, datetime.timedelta(days=7))
+
+        args = _parse_batch_args(['--keywords', 'Petrobras', '--start', '01/03/2025', '--end', '02/03/2025'])
+        self.assertEqual(args.start_date, datetime.datetime(2025, 3, 1))
+        self.assertEqual(args.end_date, datetime.datetime(2025, 3, 2, 23, 59, 59))
+
+    def test_invalid_arguments_exit_with_usage_error(self):
+        for argv in ([], ['--keywords', ' '], ['--keywords', 'Petrobras', '--start', '2025-03-01'],
+                     ['--keywords', 'Petrobras', '--start', '02/03/2025', '--end', '01/03/2025'],
+                     ['--keywords', 'Petrobras', '--concurrency', '0'],
+                     ['--keyword-file', self.temp_path('missing.json')]):
+            with self.subTest(argv=argv):
+                self.assertEqual(self._error(argv), 2)
+
+
+class RunBatchTest(StubFeedTestCase):
+    def _run(self, base_url, *argv):
+        """Run the batch mode against ``base_url``; returns (status, written items, summary)"""
+        output = self.temp_path('noticias.jsonl')
+        stderr = io.StringIO()
+        with mock.patch.dict(os.environ, {'RADAR_FEED_BASE_URL': base_url}), contextlib.redirect_stderr(stderr):
+            status = run_batch(['--output', output, '--cache-dir', self.temp_path('cache'), *argv])
+        with open(output, 'r', encoding='utf-8') as f:
+            items = [json.loads(line) for line in f]
+        summary = json.loads(stderr.getvalue().strip().splitlines()[-1])
+        return status, items, summary
+
+    def test_results_are_written_as_json_lines(self):
+        status, items, summary = self._run(self.server.base_url, '--keywords', 'Petrobras', 'Vale',
+                                           '--languages', 'pt', 'en', '--days', '2')
+
+        self.assertEqual(status, 0)
+        self.assertTrue(items)
+        self.assertEqual(len({item['link'] for item in items}), len(items))
+        self.assertTrue(all(item['keywords'] and item['languages'] for item in items))
+        self.assertEqual((summary['tasks'], summary['tasks_completed'], summary['tasks_failed']), (4, 4, 0))
+        self.assertEqual(summary['items_written'], len(items))
+        self.assertNotIn('error', summary)
+
+    def test_exit_status_is_1_when_every_fetch_fails(self):
+        missing = self.server.base_url.replace('/rss/search', '/missing')
+        status, items, summary = self._run(missing, '--keywords', 'Petrobras', '--days', '2')
+
+        self.assertEqual(status, 1)
+        self.assertEqual(items, [])
+        self.assertEqual(summary['tasks_failed'], 1)
+        self.assertEqual(summary['error'], "all fetches failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
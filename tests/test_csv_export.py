@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import unittest
+
+from csv_export import HISTORY_COLUMNS, RESULTS_COLUMNS, content_hash, history_csv, results_csv, write_csv
+from helpers import news_item
+
+
+def _rows(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'))))
+
+
+class CsvExportTest(unittest.TestCase):
+    def test_results_csv_lists_every_source_keyword_and_language(self):
+        results = [
+            news_item('https://a/0', sources=['Valor', 'Globo'], keywords=['Petrobras', 'Vale'], languages=['Português', 'Inglês']),
+            news_item('https://a/1', title='Título com "aspas", vírgula')
+        ]
+        rows = _rows(results_csv(results, {0: True}))
+
+        self.assertEqual(rows[0], RESULTS_COLUMNS)
+        self.assertEqual(rows[1][0:2], ['True', '0'])
+        self.assertEqual(rows[1][4], 'Valor, Globo')
+        self.assertIn('Vale', rows[1][2])
+        self.assertIn('Inglês', rows[1][6])
+        self.assertEqual(rows[2][0], 'False')
+        self.assertEqual(rows[2][3], 'Título com "aspas", vírgula')
+
+    def test_history_csv_only_has_relevant_items(self):
+        history = [
+            {'id': '1', 'data_hora': '01/03/2025 10:05', 'resultados': [news_item('https://a/0'), news_item('https://a/1')],
+             'relevante_state': {'0': False, '1': True}},
+            {'id': '2', 'data_hora': '02/03/2025 10:05', 'resultados': [news_item('https://a/2')], 'relevante_state': {'0': False}}
+        ]
+        rows = _rows(history_csv(history))
+
+        self.assertEqual(rows[0], HISTORY_COLUMNS)
+        self.assertEqual([row[-1] for row in rows[1:]], ['https://a/1'])
+        self.assertIsNone(history_csv(history[1:]))
+
+    def test_rows_are_written_after_the_header(self):
+        data = write_csv(['a', 'b'], ([index, f'linha {index}'] for index in range(3)))
+        self.assertEqual(data, 'a,b\n0,linha 0\n1,linha 1\n2,linha 2\n'.encode('utf-8'))
+
+    def test_content_hash_follows_the_content(self):
+        results = [news_item('https://a/0'), news_item('https://a/1')]
+        self.assertEqual(content_hash(results, {0: True}), content_hash([dict(r) for r in results], {0: True}))
+        self.assertNotEqual(content_hash(results, {0: True}), content_hash(results, {0: False}))
+        self.assertNotEqual(content_hash(results), content_hash(results[:1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
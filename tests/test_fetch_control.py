@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+
+from fetch_control import CircuitBreaker, SingleFlight, TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_up_to_capacity_then_waits_for_refill(self):
+        bucket = TokenBucket(rate=50, capacity=3)
+        self.assertTrue(all(bucket.acquire(timeout=0) for _ in range(3)))
+        self.assertFalse(bucket.acquire(timeout=0))
+
+        started = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.01)
+
+    def test_timeout_shorter_than_the_refill_gives_up(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.acquire()
+        started = time.monotonic()
+        self.assertFalse(bucket.acquire(timeout=0.05))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def _breaker(self, cooldown=60.0):
+        return CircuitBreaker(failure_threshold=0.5, window=4, min_requests=4, cooldown=cooldown)
+
+    def test_opens_when_failure_ratio_reaches_threshold(self):
+        breaker = self._breaker()
+        for record in (breaker.record_success, breaker.record_failure, breaker.record_success):
+            record()
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_few_requests_do_not_open_the_circuit(self):
+        breaker = self._breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_allows_a_single_trial(self):
+        breaker = self._breaker(cooldown=0.01)
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.02)
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_opens_the_circuit_again(self):
+        breaker = self._breaker(cooldown=0.05)
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+
+class SingleFlightTest(unittest.TestCase):
+    def _run_concurrently(self, flight, key, function, callers=5):
+        """Start ``callers`` threads calling ``flight.do(key, function)`` once the first one is running"""
+        started = threading.Event()
+        release = threading.Event()
+        outcomes = []
+
+        def leader_function():
+            started.set()
+            release.wait(5)
+            return function()
+
+        def call():
+            try:
+                outcomes.append(flight.do(key, leader_function))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=call)]
+        threads[0].start()
+        started.wait(5)
+        threads += [threading.Thread(target=call) for _ in range(callers - 1)]
+        for thread in threads[1:]:
+            thread.start()
+        # Dar tempo para os demais chegarem enquanto o líder está em andamento
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        outcomes = self._run_concurrently(flight, 'feed', lambda: calls.append(1) or 'payload')
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(outcomes), [('payload', False)] + [('payload', True)] * 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_followers_get_the_leader_exception(self):
+        def fail():
+            raise ValueError('upstream')
+
+        outcomes = self._run_concurrently(SingleFlight(), 'feed', fail, callers=3)
+        self.assertEqual(len(outcomes), 3)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+    def test_finished_keys_run_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('feed', lambda: 1), (1, False))
+        self.assertEqual(flight.do('feed', lambda: 2), (2, False))
+        self.assertEqual(flight.do('other', lambda: 3), (3, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
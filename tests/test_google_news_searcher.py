@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+
+from google_news_searcher import merge_duplicate_news
+from helpers import StubFeedTestCase, news_item
+from news_items import normalize_link
+
+TASKS = [('Petrobras', 'pt'), ('Vale', 'pt'), ('Petrobras', 'en'), ('Vale', 'en')]
+
+
+class MergeDuplicateNewsTest(unittest.TestCase):
+    def test_same_article_from_several_queries_is_merged(self):
+        results = [
+            news_item('https://news.google.com/rss/articles/abc?oc=5', source='Valor'),
+            news_item('https://valor.com.br/a', keyword='Vale'),
+            news_item('https://news.google.com/rss/articles/abc', source='Globo', keyword='Vale', language='Inglês'),
+            news_item('http://WWW.valor.com.br/a/?utm_source=rss', keyword='Vale', language='Inglês'),
+            news_item('https://news.google.com/rss/articles/abc?oc=5', source='Exame'),
+        ]
+
+        merged = merge_duplicate_news(results)
+        self.assertEqual([item['link'] for item in merged],
+                         ['https://news.google.com/rss/articles/abc?oc=5', 'https://valor.com.br/a'])
+        # A primeira ocorrência é mantida (fonte incluída) e ganha as marcações das demais
+        self.assertEqual(merged[0]['source'], 'Valor')
+        self.assertEqual(merged[0]['keywords'], ['Petrobras', 'Vale'])
+        self.assertEqual(merged[0]['languages'], ['Português', 'Inglês'])
+        self.assertEqual((merged[1]['keywords'], merged[1]['languages']), (['Vale'], ['Português', 'Inglês']))
+        self.assertNotIn('keywords', results[0])
+
+    def test_items_already_merged_keep_their_tags(self):
+        merged = merge_duplicate_news([
+            news_item('https://a/1', keywords=['Petrobras', 'Vale'], languages=['Português']),
+            news_item('https://a/1', keyword='Itaú', keywords=['Itaú', 'Vale'], languages=['Inglês']),
+            news_item('', title='Sem link'),
+            news_item('', title='Outro sem link'),
+        ])
+        self.assertEqual(merged[0]['keywords'], ['Petrobras', 'Vale', 'Itaú'])
+        self.assertEqual(merged[0]['languages'], ['Português', 'Inglês'])
+        # Itens sem link nunca são considerados duplicados
+        self.assertEqual(len(merged), 3)
+
+
+class ConcurrentFetchTest(StubFeedTestCase):
+    latency = 0.02
+    jitter = 0.03
+
+    def test_requests_per_host_stay_within_the_cap(self):
+        searcher = self.new_searcher(max_workers=8, per_host_limit=2)
+        self.assertEqual(self.requests_made(lambda: searcher.fetch_news_batch(TASKS, self.start_date, self.end_date)), 20)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_batch_results_follow_the_task_order(self):
+        searcher = self.new_searcher(max_workers=8, per_host_limit=8)
+        results = searcher.fetch_news_batch(TASKS, self.start_date, self.end_date)
+
+        self.assertEqual(list(results), TASKS)
+        for (keyword, language), items in results.items():
+            with self.subTest(keyword=keyword, language=language):
+                self.assertTrue(items)
+                self.assertEqual({(item['keyword'], item['language']) for item in items},
+                                 {(keyword, searcher.language_configs[language]['name'])})
+                timestamps = [item['published_ts'] for item in items]
+                self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_each_task_is_yielded_once_as_it_completes(self):
+        searcher = self.new_searcher(max_workers=8, per_host_limit=8)
+        completed = [(keyword, language) for keyword, language, _ in
+                     searcher.iter_news_batch(TASKS + [('Vale', 'pt')], self.start_date, self.end_date)]
+        self.assertCountEqual(completed, TASKS)
+
+    def test_streamed_items_are_deduplicated_across_tasks(self):
+        searcher = self.new_searcher(max_workers=8, per_host_limit=8)
+        items = [item for batch in searcher.iter_news(TASKS, self.start_date, self.end_date) for item in batch]
+
+        links = [normalize_link(item['link']) for item in items]
+        self.assertEqual(len(links), len(set(links)))
+        # O stub devolve notícias em comum entre palavras-chave e idiomas
+        self.assertTrue(any(len(item['keywords']) > 1 or len(item['languages']) > 1 for item in items))
+
+
+class ConditionalGetTest(StubFeedTestCase):
+    def test_second_fetch_sends_validators_and_reuses_entries_on_304(self):
+        searcher = self.new_searcher()
+        url = searcher._query_variation_candidates('Petrobras', 'pt')[0][1]
+
+        first = searcher._fetch_rss_feed(url)
+        second = searcher._fetch_rss_feed(url)
+        (first_status, first_headers), (second_status, second_headers) = self.server.request_log
+        self.assertEqual((first_status, second_status), (200, 304))
+        self.assertNotIn('If-None-Match', first_headers)
+        self.assertEqual(second_headers['If-None-Match'], self.server.payload(url.partition('?')[2])[1])
+        self.assertEqual(second_headers['If-Modified-Since'], self.server.last_modified)
+        self.assertEqual([entry.link for entry in second.entries], [entry.link for entry in first.entries])
+        self.assertEqual(searcher._parse_feed_entries(second, set()), searcher._parse_feed_entries(first, set()))
+
+    def test_expired_cache_is_refreshed_with_not_modified_responses(self):
+        searcher = self.new_searcher()
+        cold = searcher.fetch_news_batch([('Petrobras', 'pt')], self.start_date, self.end_date)
+        del self.server.request_log[:]
+
+        refreshed = searcher.fetch_news_batch([('Petrobras', 'pt')], self.start_date, self.end_date,
+                                              max_age=datetime.timedelta(0))
+        statuses = [status for status, headers in self.server.request_log if 'If-None-Match' in headers]
+        self.assertEqual(statuses, [304] * 5)
+        # Entradas reaproveitadas continuam nos resultados (o termo explorado só acrescenta)
+        self.assertLessEqual({item['link'] for item in cold[('Petrobras', 'pt')]},
+                             {item['link'] for item in refreshed[('Petrobras', 'pt')]})
+
+
+class VariationPlanningTest(StubFeedTestCase):
+    def _search(self, searcher, max_age=None):
+        return lambda: searcher.fetch_news_batch([('Petrobras', 'pt')], self.start_date, self.end_date, max_age)
+
+    def test_repeat_search_within_ttl_makes_no_requests(self):
+        searcher = self.new_searcher()
+        self.assertEqual(self.requests_made(self._search(searcher)), 5)
+        self.assertEqual(self.requests_made(self._search(searcher)), 0)
+        self.assertEqual(self.requests_made(self._search(searcher)), 0)
+
+    def test_untried_term_is_explored_when_the_search_goes_upstream(self):
+        searcher = self.new_searcher()
+        self.requests_made(self._search(searcher))
+
+        # Cache expirado: as mesmas cinco variações e mais um termo nunca buscado
+        self.assertEqual(self.requests_made(self._search(searcher, max_age=datetime.timedelta(0))), 6)
+        self.assertIn('term:economia', searcher.article_store.get_fetch_times('Petrobras', 'pt'))
+        self.assertEqual(self.requests_made(self._search(searcher)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
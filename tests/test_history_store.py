@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import unittest
+
+from helpers import TempDirTestCase, history_query
+from history_store import COMPACT_MIN_WASTE, HistoryStore
+
+
+class HistoryStoreTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.temp_path('historico_marco.jsonl')
+        self.legacy_path = self.temp_path('historico_marco.json')
+
+    def _lines(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class LegacyMigrationTest(HistoryStoreTest):
+    def _write_legacy(self, historico):
+        with open(self.legacy_path, 'w', encoding='utf-8') as f:
+            json.dump(historico, f, ensure_ascii=False)
+
+    def test_legacy_queries_are_migrated_once(self):
+        legacy = [
+            history_query('https://a/1', 'Petrobras anuncia dividendos'),
+            history_query('https://a/2', 'Petrobras reduz preço do diesel'),
+            {'id': 'sem resultados'}
+        ]
+        self._write_legacy(legacy)
+        store = HistoryStore(self.path, self.legacy_path)
+
+        self.assertEqual(store.migrate_legacy(), 2)
+        self.assertTrue(os.path.exists(self.legacy_path))
+        historico = store.load('marco')
+        self.assertEqual([c['resultados'][0]['link'] for c in historico], ['https://a/1', 'https://a/2'])
+        self.assertEqual(historico[0]['parametros'], legacy[0]['parametros'])
+        # Parâmetros da mesma consulta gravados uma única vez
+        self.assertEqual([record['type'] for record in self._lines()], ['query', 'article', 'article'])
+
+        self._write_legacy(legacy + [history_query('https://a/3', 'Petrobras compra refinaria')])
+        self.assertEqual(HistoryStore(self.path, self.legacy_path).migrate_legacy(), 0)
+        self.assertEqual(len(HistoryStore(self.path, self.legacy_path).load()), 2)
+
+    def test_cleared_history_is_not_migrated_again(self):
+        self._write_legacy([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        store = HistoryStore(self.path, self.legacy_path)
+        store.load()
+        store.clear()
+        self.assertEqual(HistoryStore(self.path, self.legacy_path).load(), [])
+
+
+class AppendAndCompactTest(HistoryStoreTest):
+    def test_torn_and_duplicate_lines_are_skipped(self):
+        store = HistoryStore(self.path)
+        store.append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        store.append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "article", "query": ')
+
+        historico = HistoryStore(self.path).load()
+        self.assertEqual(len(historico), 1)
+        self.assertTrue(historico[0]['relevante_state']["0"])
+
+    def test_compact_drops_wasted_lines(self):
+        store = HistoryStore(self.path)
+        store.append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        store.append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('not json\n')
+
+        store.compact()
+        self.assertEqual([record['type'] for record in self._lines()], ['query', 'article'])
+        self.assertEqual(len(store.load()), 1)
+
+    def test_load_compacts_when_waste_dominates(self):
+        store = HistoryStore(self.path)
+        store.append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('not json\n' * COMPACT_MIN_WASTE)
+
+        self.assertEqual(len(HistoryStore(self.path).load()), 1)
+        self.assertEqual(len(self._lines()), 2)
+
+
+class DuplicateDetectionTest(HistoryStoreTest):
+    def test_same_link_with_tracking_parameters_is_a_duplicate(self):
+        store = HistoryStore(self.path)
+        store.append_new([history_query('https://news.google.com/rss/articles/abc?oc=5', 'Petrobras anuncia dividendos')])
+
+        self.assertEqual(store.append_new([history_query('https://news.google.com/rss/articles/abc', 'Outro título')]), [])
+        self.assertTrue(store.is_saved({'link': 'https://news.google.com/rss/articles/abc?oc=5&utm_source=x'}))
+
+    def test_same_title_same_day_and_source_is_a_duplicate(self):
+        store = HistoryStore(self.path)
+        store.append_new([history_query('https://a/1', 'Petrobras anuncia dividendos - Valor')])
+
+        duplicate = history_query('https://b/1', 'PETROBRAS anúncia dividendos', published='01/03/2025 18:00')
+        self.assertEqual(store.append_new([duplicate]), [])
+
+    def test_recurring_headline_is_saved_on_later_days(self):
+        store = HistoryStore(self.path)
+        store.append_new([history_query('https://a/1', 'Dólar hoje')])
+
+        next_day = history_query('https://a/2', 'Dólar hoje', published='02/03/2025 10:00')
+        other_source = history_query('https://b/1', 'Dólar hoje', source='Globo')
+        self.assertEqual(len(store.append_new([next_day, other_source])), 2)
+
+    def test_title_without_publication_date_is_matched_by_link_only(self):
+        store = HistoryStore(self.path)
+        store.append_new([history_query('https://a/1', 'Dólar hoje', published='')])
+
+        self.assertEqual(len(store.append_new([history_query('https://a/2', 'Dólar hoje', published='')])), 1)
+
+    def test_duplicates_within_one_save_are_skipped(self):
+        store = HistoryStore(self.path)
+        saved = store.append_new([
+            history_query('https://a/1', 'Petrobras anuncia dividendos'),
+            history_query('https://a/1?oc=5', 'Petrobras anuncia dividendos')
+        ])
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(len(store.load()), 1)
+
+    def test_index_notices_writes_from_another_store(self):
+        store = HistoryStore(self.path)
+        self.assertFalse(store.is_saved({'link': 'https://a/1'}))
+
+        HistoryStore(self.path).append([history_query('https://a/1', 'Petrobras anuncia dividendos')])
+        self.assertTrue(store.is_saved({'link': 'https://a/1'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
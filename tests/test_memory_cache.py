@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+
+from memory_cache import MemoryLRU, estimate_size
+
+
+class MemoryLRUTest(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = MemoryLRU(max_entries=2)
+        cache.put('a', [1])
+        cache.put('b', [2])
+        cache.get('a')
+        cache.put('c', [3])
+
+        self.assertEqual(cache.get('a'), [1])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), [3])
+
+    def test_byte_limit_is_enforced(self):
+        value = ['x' * 100]
+        cache = MemoryLRU(max_entries=100, max_bytes=estimate_size(value) * 2)
+        for key in range(5):
+            cache.put(key, value)
+
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+
+    def test_values_larger_than_the_limit_are_not_kept(self):
+        cache = MemoryLRU(max_bytes=10)
+        cache.put('a', ['x' * 100])
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+    def test_expired_entries_are_missing(self):
+        cache = MemoryLRU(ttl=0.01)
+        cache.put('a', [1])
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_discard_prefix_removes_every_range_of_a_keyword(self):
+        cache = MemoryLRU()
+        cache.put(('Petrobras', 'pt', 0, 10), [1])
+        cache.put(('Petrobras', 'pt', 5, 20), [2])
+        cache.put(('Petrobras', 'en', 0, 10), [3])
+        cache.discard_prefix(('Petrobras', 'pt'))
+
+        self.assertIsNone(cache.get(('Petrobras', 'pt', 0, 10)))
+        self.assertIsNone(cache.get(('Petrobras', 'pt', 5, 20)))
+        self.assertEqual(cache.get(('Petrobras', 'en', 0, 10)), [3])
+        self.assertEqual(cache.stats()['bytes'], estimate_size([3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import datetime
+import glob
+import os
+import re
+import unittest
+
+from dateutil import parser
+
+from news_items import normalize_link, parse_date_fallback, parse_rfc822
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'fixtures')
+
+
+def _utc(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+def _feed_dates():
+    """Publication dates of the recorded Google News feeds"""
+    dates = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.xml'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            dates += re.findall(r'<pubDate>([^<]+)</pubDate>', f.read())
+    return dates
+
+
+class ParseRfc822Test(unittest.TestCase):
+    def test_numeric_offsets_are_converted_to_utc(self):
+        self.assertEqual(parse_rfc822('Sat, 08 Mar 2025 21:00:00 +0300'), _utc(2025, 3, 8, 18, 0))
+        self.assertEqual(parse_rfc822('Sat, 08 Mar 2025 21:00:00 -0230'), _utc(2025, 3, 8, 23, 30))
+        self.assertEqual(parse_rfc822('Sat, 08 Mar 2025 23:00:00 -0300'), _utc(2025, 3, 9, 2, 0))
+
+    def test_utc_zone_names(self):
+        for zone in ('GMT', 'UT', 'UTC', 'Z', ''):
+            with self.subTest(zone=zone):
+                self.assertEqual(parse_rfc822(f'Sat, 08 Mar 2025 21:00:00 {zone}'), _utc(2025, 3, 8, 21, 0))
+
+    def test_weekday_and_seconds_are_optional(self):
+        self.assertEqual(parse_rfc822('08 Mar 2025 21:00:00 GMT'), _utc(2025, 3, 8, 21, 0))
+        self.assertEqual(parse_rfc822('8 mar 2025 21:00 GMT'), _utc(2025, 3, 8, 21, 0))
+
+    def test_invalid_dates_fall_through(self):
+        for date_str in ('Sat, 31 Feb 2025 21:00:00 GMT', 'Sat, 08 Foo 2025 21:00:00 GMT',
+                         'Sat, 08 Mar 2025 25:00:00 GMT', '2025-03-08T21:00:00Z', '5 horas atrás', ''):
+            with self.subTest(date_str=date_str):
+                self.assertIsNone(parse_rfc822(date_str))
+
+    def test_matches_dateutil_on_recorded_feed_dates(self):
+        dates = _feed_dates() + ['Mon, 10 Mar 2025 09:15:00 +0000', 'Tue, 11 Mar 2025 07:05:09 -0500']
+        self.assertGreater(len(dates), 100)
+        for date_str in dates:
+            with self.subTest(date_str=date_str):
+                expected = parser.parse(date_str).astimezone(datetime.timezone.utc)
+                self.assertEqual(parse_rfc822(date_str), expected)
+
+
+class ParseDateFallbackTest(unittest.TestCase):
+    def test_known_formats_are_tried_before_dateutil(self):
+        self.assertEqual(parse_date_fallback('08/03/2025 21:00'), datetime.datetime(2025, 3, 8, 21, 0))
+        self.assertEqual(parse_date_fallback('8 de Mar de 2025'), datetime.datetime(2025, 3, 8))
+
+    def test_dateutil_reads_ambiguous_dates_month_first(self):
+        self.assertEqual(parse_date_fallback('03-08-2025'), datetime.datetime(2025, 3, 8))
+        self.assertEqual(parse_date_fallback('March 8, 2025'), datetime.datetime(2025, 3, 8))
+
+
+class NormalizeLinkTest(unittest.TestCase):
+    def test_tracking_parameters_are_dropped(self):
+        self.assertEqual(normalize_link('https://valor.com.br/a?id=1&utm_source=x&fbclid=y&gclid=z'),
+                         normalize_link('https://valor.com.br/a?id=1'))
+        self.assertEqual(normalize_link('https://valor.com.br/a?b=2&a=1'), normalize_link('https://valor.com.br/a?a=1&b=2'))
+        self.assertNotEqual(normalize_link('https://valor.com.br/a?id=1'), normalize_link('https://valor.com.br/a?id=2'))
+
+    def test_scheme_host_case_www_and_trailing_slash_are_ignored(self):
+        expected = normalize_link('https://valor.com.br/empresas/petrobras')
+        for link in ('http://valor.com.br/empresas/petrobras', 'https://WWW.Valor.com.br/empresas/petrobras/',
+                     ' https://valor.com.br/empresas/petrobras#topo'):
+            with self.subTest(link=link):
+                self.assertEqual(normalize_link(link), expected)
+        # O caminho diferencia maiúsculas de minúsculas
+        self.assertNotEqual(normalize_link('https://valor.com.br/Empresas/petrobras'), expected)
+
+    def test_google_news_links_are_reduced_to_the_article_id(self):
+        self.assertEqual(normalize_link('https://news.google.com/rss/articles/CBMiabc?oc=5'), 'gnews:CBMiabc')
+        self.assertEqual(normalize_link('https://news.google.com/articles/CBMiabc?hl=pt-BR'), 'gnews:CBMiabc')
+        self.assertEqual(normalize_link(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from article_store import ArticleStore
+from helpers import TempDirTestCase, stored_articles
+from query_planner import VariationPlanner, marginal_yield
+
+
+class MarginalYieldTest(TempDirTestCase):
+    DEFAULT = ['https://a', 'https://b', 'https://c']
+    EXACT = ['https://b', 'https://c', 'https://d']
+
+    def _round(self, save_order):
+        """Save one round of two overlapping variations in ``save_order`` and return the recorded stats"""
+        store = ArticleStore(self.temp_path('_'.join(save_order) + '.db'))
+        returned = {'default': self.DEFAULT, 'exact': self.EXACT}
+        new_links = set()
+        for variation in save_order:
+            new_links |= store.save_articles('Petrobras', 'pt', stored_articles(*returned[variation]), variation=variation)
+        yields = marginal_yield([(v, returned[v]) for v in ('default', 'exact')], new_links)
+        store.record_variation_yield('Petrobras', 'pt', yields)
+        return {v: (s['fetches'], s['new_items']) for v, s in store.get_variation_stats('Petrobras', 'pt').items()}
+
+    def test_overlap_is_credited_to_higher_priority_variation(self):
+        yields = marginal_yield(
+            [('default', self.DEFAULT), ('exact', self.EXACT)],
+            set(self.DEFAULT) | set(self.EXACT)
+        )
+        self.assertEqual(yields, {'default': 3, 'exact': 1})
+
+    def test_credit_does_not_depend_on_save_order(self):
+        expected = {'default': (1, 3), 'exact': (1, 1)}
+        self.assertEqual(self._round(['default', 'exact']), expected)
+        self.assertEqual(self._round(['exact', 'default']), expected)
+
+    def test_links_already_cached_are_not_credited(self):
+        yields = marginal_yield([('default', self.DEFAULT), ('exact', self.EXACT)], {'https://d'})
+        self.assertEqual(yields, {'default': 0, 'exact': 1})
+
+
+class VariationPlannerTest(TempDirTestCase):
+    CANDIDATES = [(variation, f'https://feed/{variation}')
+                  for variation in ('default', 'exact', 'term:a', 'term:b', 'term:c')]
+    ROUND = ['default', 'exact', 'term:a', 'term:b']
+
+    def setUp(self):
+        super().setUp()
+        self.store = ArticleStore(self.temp_path('articles.db'))
+        self.planner = VariationPlanner(self.store, max_terms=2)
+
+    def _plan(self, fresh=None, now=None):
+        return [variation for variation, _ in self.planner.plan('Petrobras', 'pt', self.CANDIDATES, fresh, now)]
+
+    def test_first_round_fetches_the_first_terms_without_exploring(self):
+        self.assertEqual(self._plan(fresh=set()), self.ROUND)
+
+    def test_selection_is_stable_while_the_chosen_variations_are_fresh(self):
+        self.store.record_variation_yield('Petrobras', 'pt', {'default': 5, 'exact': 1, 'term:a': 0, 'term:b': 2})
+        self.assertEqual(self._plan(fresh=set(self.ROUND)), self.ROUND)
+
+    def test_untried_term_is_explored_only_when_going_upstream(self):
+        self.store.record_variation_yield('Petrobras', 'pt', {'default': 5, 'exact': 1, 'term:a': 0, 'term:b': 2})
+        self.assertEqual(self._plan(fresh={'exact', 'term:a', 'term:b'}), self.ROUND + ['term:c'])
+
+    def test_left_out_variation_returns_after_explore_after(self):
+        fetched_at = 1700000000.0
+        for _ in range(3):
+            self.store.record_variation_yield('Petrobras', 'pt', {
+                'default': 5, 'exact': 1, 'term:a': 0, 'term:b': 2, 'term:c': 3
+            }, fetched_at=fetched_at)
+
+        # term:a parou de trazer notícias novas; volta a ser testado depois de explore_after
+        self.assertEqual(self._plan(fresh=set(), now=fetched_at + 60), ['default', 'exact', 'term:b', 'term:c'])
+        self.assertEqual(self._plan(fresh=set(), now=fetched_at + self.planner.explore_after),
+                         ['default', 'exact', 'term:a', 'term:b', 'term:c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+import safe_io
+from helpers import TempDirTestCase
+from safe_io import GroupCommitLog, atomic_write, file_lock, file_version, write_json
+
+
+class SafeIOTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.temp_path('historico_marco.jsonl')
+
+
+class AtomicWriteTest(SafeIOTest):
+    def test_replaces_content_without_leaving_temporary_files(self):
+        atomic_write(self.path, 'antigo')
+        write_json(self.path, {'keywords': ['Itaú']})
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'keywords': ['Itaú']})
+        self.assertEqual(sorted(os.listdir(self.directory)), ['historico_marco.jsonl', 'historico_marco.jsonl.lock'])
+
+    def test_failed_write_keeps_the_old_content(self):
+        atomic_write(self.path, 'antigo')
+        with mock.patch('safe_io.os.replace', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                atomic_write(self.path, 'novo')
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'antigo')
+        self.assertNotIn('.tmp', ''.join(os.listdir(self.directory)))
+
+    def test_lock_times_out(self):
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with file_lock(self.path):
+                acquired.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        acquired.wait(5)
+        try:
+            with self.assertRaises(TimeoutError):
+                atomic_write(self.path, 'novo', timeout=0.05)
+        finally:
+            release.set()
+            holder.join(5)
+
+
+class GroupCommitLogTest(SafeIOTest):
+    def test_append_returns_the_versions_around_the_commit(self):
+        log = GroupCommitLog(self.path)
+        before, after = log.append('linha 1\n')
+        self.assertIsNone(before)
+        self.assertEqual(after, file_version(self.path))
+        self.assertEqual(log.append('linha 2\n')[0], after)
+
+    def test_concurrent_appends_are_grouped_and_all_written(self):
+        log = GroupCommitLog(self.path)
+        writing = threading.Event()
+        release = threading.Event()
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            # Segurar o primeiro commit para que os demais entrem na fila
+            writing.set()
+            release.wait(5)
+            real_fsync(fd)
+
+        with mock.patch.object(safe_io.os, 'fsync', side_effect=slow_fsync):
+            first = threading.Thread(target=log.append, args=('linha 0\n',))
+            first.start()
+            writing.wait(5)
+            others = [threading.Thread(target=log.append, args=(f'linha {i}\n',)) for i in range(1, 20)]
+            for thread in others:
+                thread.start()
+            while len(log._pending) < len(others):
+                time.sleep(0.001)
+            release.set()
+            for thread in [first] + others:
+                thread.join(5)
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sorted(lines), sorted(f'linha {i}' for i in range(20)))
+        self.assertEqual(log.commits, 2)
+
+    def test_failed_commit_is_raised_without_blocking_the_log(self):
+        log = GroupCommitLog(self.path)
+        with mock.patch.object(safe_io.os, 'fsync', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                log.append('linha\n')
+        log.append('linha 2\n')
+        self.assertEqual(log.commits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
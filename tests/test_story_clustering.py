@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from helpers import news_item
+from story_clustering import cluster_stories, normalize_text, simhash, strip_source_suffix
+
+
+def _item(title, link, source, **extra):
+    return news_item(link, f"{title} - {source}", source=source, description='', **extra)
+
+
+class NormalizationTest(unittest.TestCase):
+    def test_source_suffix_is_stripped(self):
+        self.assertEqual(strip_source_suffix('Petrobras sobe 3% - Valor Econômico', 'Valor Econômico'), 'Petrobras sobe 3%')
+        self.assertEqual(strip_source_suffix('Petrobras sobe 3% - InfoMoney'), 'Petrobras sobe 3%')
+        self.assertEqual(strip_source_suffix('Petrobras sobe 3%'), 'Petrobras sobe 3%')
+
+    def test_accents_html_case_and_stopwords_are_ignored(self):
+        self.assertEqual(normalize_text('<b>Ação</b> da PETROBRAS &amp; Vale'), ['acao', 'petrobras', 'vale'])
+
+    def test_simhash_is_stable_and_empty_input_has_no_fingerprint(self):
+        tokens = normalize_text('Petrobras anuncia dividendos extraordinários')
+        self.assertEqual(simhash(tokens), simhash(list(tokens)))
+        self.assertLess(simhash(tokens), 1 << 64)
+        self.assertIsNone(simhash([]))
+
+
+class ClusterStoriesTest(unittest.TestCase):
+    TITLE = 'Petrobras anuncia pagamento de dividendos extraordinários de R$ 20 bilhões aos acionistas'
+
+    def test_same_story_from_several_publishers_is_grouped(self):
+        items = [
+            _item(self.TITLE, 'https://a/1', 'Valor'),
+            _item('Conselho aprova compra de navios pela Vale', 'https://b/1', 'Globo', keyword='Vale'),
+            _item(self.TITLE, 'https://c/1', 'InfoMoney', language='Inglês'),
+            _item(self.TITLE + ' hoje', 'https://d/1', 'Exame', keyword='Dividendos')
+        ]
+
+        stories = cluster_stories(items)
+        self.assertEqual([story['link'] for story in stories], ['https://a/1', 'https://b/1'])
+        story = stories[0]
+        self.assertEqual(story['story_size'], 3)
+        self.assertEqual(story['sources'], ['Valor', 'InfoMoney', 'Exame'])
+        self.assertEqual(story['keywords'], ['Petrobras', 'Dividendos'])
+        self.assertEqual(story['languages'], ['Português', 'Inglês'])
+        self.assertEqual([related['link'] for related in story['related']], ['https://c/1', 'https://d/1'])
+        self.assertEqual(stories[1]['story_size'], 1)
+
+    def test_different_stories_stay_apart(self):
+        items = [
+            _item('Petrobras anuncia dividendos extraordinários', 'https://a/1', 'Valor'),
+            _item('Vale conclui venda de participação em mina de níquel', 'https://b/1', 'Valor'),
+            _item('Itaú registra lucro recorde no quarto trimestre', 'https://c/1', 'Valor')
+        ]
+        self.assertEqual([story['story_size'] for story in cluster_stories(items)], [1, 1, 1])
+
+    def test_max_distance_zero_only_groups_identical_fingerprints(self):
+        items = [
+            _item(self.TITLE, 'https://a/1', 'Valor'),
+            _item(self.TITLE, 'https://b/1', 'Globo'),
+            _item(self.TITLE + ' nesta segunda', 'https://c/1', 'Exame')
+        ]
+        self.assertEqual([story['story_size'] for story in cluster_stories(items, max_distance=0)], [2, 1])
+
+    def test_items_without_text_are_kept_alone(self):
+        items = [
+            {'title': '', 'link': 'https://a/1', 'source': 'Valor', 'keyword': 'Petrobras', 'language': 'Português'},
+            {'title': '', 'link': 'https://b/1', 'source': 'Globo', 'keyword': 'Petrobras', 'language': 'Português'}
+        ]
+        self.assertEqual([story['story_size'] for story in cluster_stories(items)], [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()